@@ -0,0 +1,83 @@
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.runner import (
+    BASELINES_PATH,
+    DEFAULT_MEMORY_TICKS,
+    DEFAULT_SEED,
+    DEFAULT_TICKS,
+    DEFAULT_TOLERANCE,
+    find_regressions,
+    load_baselines,
+    run_scenario,
+    save_baselines,
+)
+from benchmarks.scenarios import SCENARIOS
+
+parser = argparse.ArgumentParser(
+    prog="python -m benchmarks",
+    description="Measure the speed and the memory of the referee.",
+)
+parser.add_argument(
+    "scenarios",
+    nargs="*",
+    help=f"Scenarios to run, all of them by default: {', '.join(SCENARIOS)}",
+)
+parser.add_argument(
+    "--ticks", type=int, default=DEFAULT_TICKS, help="Ticks to measure"
+)
+parser.add_argument(
+    "--memory-ticks",
+    type=int,
+    default=DEFAULT_MEMORY_TICKS,
+    help="Ticks to measure the memory over",
+)
+parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+parser.add_argument(
+    "--baselines", type=Path, default=BASELINES_PATH, help="Baselines file"
+)
+parser.add_argument(
+    "--tolerance",
+    type=float,
+    default=DEFAULT_TOLERANCE,
+    help="Relative slowdown or memory growth considered a regression",
+)
+parser.add_argument(
+    "--update-baselines",
+    action="store_true",
+    help="Store the results as the new baselines",
+)
+args = parser.parse_args()
+for name in args.scenarios:
+    if name not in SCENARIOS:
+        parser.error(f"Unknown scenario {name}")
+
+results = {}
+print(
+    f"{'scenario':>24} {'ticks/s':>10} {'relative':>8} "
+    f"{'peak KiB':>9} {'B/tick':>8}"
+)
+for name in args.scenarios or SCENARIOS:
+    result = run_scenario(
+        name, ticks=args.ticks, memory_ticks=args.memory_ticks, seed=args.seed
+    )
+    results[name] = result
+    print(
+        f"{name:>24} {result['ticks_per_second']:10.0f} "
+        f"{result['relative_speed']:8.3f} "
+        f"{result['peak_memory_kib']:9.1f} "
+        f"{result['retained_bytes_per_tick']:8.1f}"
+    )
+
+if args.update_baselines:
+    save_baselines(results, args.baselines)
+    print(f"Baselines stored in {args.baselines}")
+    sys.exit(0)
+
+regressions = find_regressions(
+    results, load_baselines(args.baselines), args.tolerance
+)
+for regression in regressions:
+    print(f"Regression: {regression}")
+sys.exit(1 if regressions else 0)
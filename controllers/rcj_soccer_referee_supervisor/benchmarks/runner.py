@@ -0,0 +1,182 @@
+"""Running of the scenarios and comparing the results to the baselines.
+
+Every scenario is run twice: once for the speed, in ticks per second, and
+once, shorter, under tracemalloc for the memory. The speed is the best of a
+few runs, so that a hiccup of the machine does not count. Since tracemalloc
+only knows the memory allocated at a given moment, the memory is reported
+as the peak during the run and as the memory left allocated per tick, which
+grows with any state the referee keeps for good.
+
+The ticks per second depend on the machine, so the baselines store the
+speed relative to a reference workload, timed in the same process in turns
+with the scenario, which holds across the machines far better.
+"""
+
+import gc
+import json
+import math
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from benchmarks.scenarios import SCENARIOS
+from referee.consts import N_OBJECTS
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+# Measures stored in the baselines
+BASELINE_KEYS = (
+    "relative_speed",
+    "peak_memory_kib",
+    "retained_bytes_per_tick",
+)
+
+DEFAULT_TICKS = 5000
+DEFAULT_MEMORY_TICKS = 500
+DEFAULT_SEED = 1
+# Relative slowdown or memory growth considered a regression
+DEFAULT_TOLERANCE = 0.25
+# Absolute memory growth (in KiB or bytes per tick) always tolerated, for
+# the values close to zero
+MEMORY_SLACK = 16
+
+# Number of the timed runs the ticks are split into
+SPEED_RUNS = 5
+# Rounds of the reference workload timed along each run of the scenario
+REFERENCE_ROUNDS = 200
+
+
+def reference_workload(rounds: int) -> float:
+    """Plain Python work standing for the speed of the machine: the float
+    math, the list access and the calls the referee mostly consists of.
+    A round takes about as long as a tick of an idle match."""
+    positions = [[0.1 * i, -0.05 * i, 0.0] for i in range(N_OBJECTS)]
+    total = 0.0
+    for _ in range(rounds * 100):
+        for position in positions:
+            position[0] = -position[0]
+            total += math.hypot(position[0], position[1])
+    return total
+
+
+def run_ticks(workload, ticks: int):
+    for _ in range(ticks):
+        workload.tick()
+
+
+def timed(function: Callable, *args) -> float:
+    """Return the seconds the call took."""
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def run_scenario(
+    name: str,
+    ticks: int = DEFAULT_TICKS,
+    memory_ticks: int = DEFAULT_MEMORY_TICKS,
+    seed: int = DEFAULT_SEED,
+) -> dict:
+    """Run the scenario and measure it.
+
+    Args:
+        name (str): Name of the scenario, see SCENARIOS
+        ticks (int): Number of the ticks to measure the speed over
+        memory_ticks (int): Number of the ticks to measure the memory over
+        seed (int): Seed of the scenario
+
+    Returns:
+        dict: ticks_per_second, relative_speed (the ticks per round of the
+            reference workload), peak_memory_kib, retained_bytes_per_tick
+            and the numbers of the events of each type
+    """
+    setup = SCENARIOS[name].setup
+
+    workload = setup(seed)
+    gc.collect()
+    run_length = max(1, ticks // SPEED_RUNS)
+    elapsed = reference = math.inf
+    for _ in range(SPEED_RUNS):
+        reference = min(reference, timed(reference_workload, REFERENCE_ROUNDS))
+        elapsed = min(elapsed, timed(run_ticks, workload, run_length))
+    ticks_per_second = run_length / elapsed
+
+    workload = setup(seed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start_memory, _ = tracemalloc.get_traced_memory()
+        for _ in range(memory_ticks):
+            workload.tick()
+        gc.collect()
+        memory, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ticks_per_second": ticks_per_second,
+        "relative_speed": ticks_per_second * reference / REFERENCE_ROUNDS,
+        "peak_memory_kib": peak / 1024,
+        "retained_bytes_per_tick": (memory - start_memory) / memory_ticks,
+        "events": dict(workload.events.counts),
+    }
+
+
+def run_scenarios(names: Iterable[str], **kwargs) -> Dict[str, dict]:
+    """Run the scenarios, see run_scenario."""
+    return {name: run_scenario(name, **kwargs) for name in names}
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    with path.open() as f:
+        return json.load(f)
+
+
+def save_baselines(results: Dict[str, dict], path: Path = BASELINES_PATH):
+    """Store the results as the new baselines, without the measures which
+    depend on the machine."""
+    baselines = load_baselines(path)
+    for name, result in results.items():
+        baselines[name] = {key: round(result[key], 3) for key in BASELINE_KEYS}
+    with path.open("w") as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(
+    results: Dict[str, dict],
+    baselines: Dict[str, dict],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Compare the results to the baselines.
+
+    Args:
+        results (dict): Scenario name -> result of run_scenario
+        baselines (dict): Scenario name -> stored result
+        tolerance (float): Relative slowdown or memory growth allowed
+
+    Returns:
+        list: Descriptions of the regressions, empty if there are none
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+
+        speed = result["relative_speed"]
+        expected = baseline["relative_speed"]
+        if speed < expected * (1 - tolerance):
+            regressions.append(
+                f"{name}: relative speed {speed:.3f}, baseline {expected:.3f}"
+            )
+
+        for key in ("peak_memory_kib", "retained_bytes_per_tick"):
+            value, expected = result[key], baseline[key]
+            if value > expected * (1 + tolerance) + MEMORY_SLACK:
+                regressions.append(
+                    f"{name}: {key} {value:.2f}, baseline {expected:.2f}"
+                )
+    return regressions
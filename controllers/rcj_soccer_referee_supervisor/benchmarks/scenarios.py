@@ -0,0 +1,342 @@
+"""Scripted workloads for the benchmarks.
+
+Each scenario sets up a workload, whose `tick` is one unit of work: a whole
+tick of the referee in the match scenarios (with the Webots step replaced
+by the headless world), or a call of one of the hot functions of the
+referee for all the objects in the micro scenarios.
+"""
+
+import math
+import random
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from headless import install
+
+install()
+
+from headless import controller
+from headless.match import attacking_drivers, create_referee, REFEREE_DEFAULTS
+from headless.world import Driver, idle, World
+from referee.consts import (
+    BALL_DEPTH,
+    N_OBJECTS,
+    OBJECT_NAMES,
+    ROBOT_NAMES,
+    TIME_STEP,
+)
+from referee.enums import NeutralSpotDistanceType, Team
+from referee.event_handlers import EventHandler
+from referee.penalty_area_checker import PenaltyAreaChecker
+from referee.progress_checker import ProgressCheckerBank
+from referee.supervisor import RCJSoccerSupervisor
+
+# Long enough for the match never to finish during a benchmark
+BENCHMARK_MATCH_TIME = 10**6
+
+# Number of the precomputed random frames the micro scenarios cycle over
+N_FRAMES = 1024
+
+# Ticks between two goals in the goal storm, enough for the post-goal wait
+GOAL_STORM_INTERVAL = 125
+
+# Called with the world and the tick number before every step
+Script = Callable[[World, int], None]
+
+
+class ScriptedWorld(World):
+    """Headless world which runs a script before every step."""
+
+    def __init__(
+        self,
+        drivers: Optional[Dict[str, Driver]] = None,
+        script: Optional[Script] = None,
+    ):
+        super().__init__(drivers)
+        self.script = script
+        self.ticks = 0
+
+    def step(self, time_step: int):
+        if self.script is not None:
+            self.script(self, self.ticks)
+        self.ticks += 1
+        super().step(time_step)
+
+
+class EventCounter(EventHandler):
+    def __init__(self):
+        super().__init__()
+        self.counts: Counter = Counter()
+
+    def handle(self, referee, type: str, payload: Optional[dict] = None):
+        self.counts[type] += 1
+
+
+class Workload:
+    """A scenario set up and ready to be run, tick by tick."""
+
+    def __init__(self):
+        self.events = EventCounter()
+
+    def tick(self):
+        raise NotImplementedError
+
+
+class MatchWorkload(Workload):
+    """A match played in the headless world."""
+
+    def __init__(
+        self,
+        seed: int,
+        drivers: Dict[str, Driver],
+        script: Optional[Script] = None,
+    ):
+        super().__init__()
+        controller.use_world(ScriptedWorld(drivers, script))
+        self.supervisor = RCJSoccerSupervisor(render_labels=False)
+        self.referee = create_referee(
+            self.supervisor, BENCHMARK_MATCH_TIME, seed=seed
+        )
+        self.referee.add_event_subscriber(self.events)
+        self.referee.kickoff()
+
+    def tick(self):
+        self.supervisor.step(TIME_STEP)
+        self.referee.tick()
+
+
+def go_to(x: float, y: float) -> Driver:
+    """Driver which drives the robot to the point and keeps it there."""
+
+    def drive(world: World, robot: str) -> Tuple[float, float]:
+        translation = world.bodies[robot].translation
+        dx, dy = x - translation[0], y - translation[1]
+        distance = math.hypot(dx, dy)
+        if distance < 0.01:
+            return 0.0, 0.0
+        return dx / distance, dy / distance
+
+    return drive
+
+
+def patrol(x1: float, x2: float, y: float) -> Driver:
+    """Driver which drives the robot back and forth between two points."""
+    targets = [(x1, y), (x2, y)]
+
+    def drive(world: World, robot: str) -> Tuple[float, float]:
+        translation = world.bodies[robot].translation
+        x, y = targets[0]
+        dx, dy = x - translation[0], y - translation[1]
+        distance = math.hypot(dx, dy)
+        if distance < 0.02:
+            targets.reverse()
+            return 0.0, 0.0
+        return dx / distance, dy / distance
+
+    return drive
+
+
+def push(vx: float, vy: float) -> Driver:
+    """Driver which keeps driving in the same direction."""
+
+    def drive(world: World, robot: str) -> Tuple[float, float]:
+        return vx, vy
+
+    return drive
+
+
+def goal_storm_script(world: World, tick: int):
+    """Put the ball into one of the goals, each time into the other one."""
+    if tick % GOAL_STORM_INTERVAL != GOAL_STORM_INTERVAL // 2:
+        return
+    goal = tick // GOAL_STORM_INTERVAL % 2
+    world.ball.translation = [0.0, 0.8 if goal else -0.8, BALL_DEPTH]
+    world.ball.stop()
+
+
+def idle_match(seed: int) -> Workload:
+    return MatchWorkload(seed, {robot: idle() for robot in ROBOT_NAMES})
+
+
+def attacking_match(seed: int) -> Workload:
+    return MatchWorkload(seed, attacking_drivers())
+
+
+def goal_storm(seed: int) -> Workload:
+    return MatchWorkload(seed, attacking_drivers(), goal_storm_script)
+
+
+def stuck_robots(seed: int) -> Workload:
+    # Both teams pinned against the side walls
+    drivers = {
+        robot: push(1.0 if robot[0] == Team.BLUE.value else -1.0, 0.0)
+        for robot in ROBOT_NAMES
+    }
+    return MatchWorkload(seed, drivers)
+
+
+def penalty_camping(seed: int) -> Workload:
+    # Every robot patrols inside the penalty area of its own goal, moving
+    # enough not to be called for the lack of progress
+    drivers = {}
+    for robot in ROBOT_NAMES:
+        y = 0.57 + int(robot[1]) * 0.05
+        if robot[0] == Team.YELLOW.value:
+            y = -y
+        drivers[robot] = patrol(-0.3, 0.3, y)
+    return MatchWorkload(seed, drivers)
+
+
+def neutral_spot_contention(seed: int) -> Workload:
+    # Everybody crowds the center, where the ball is, and gets stuck at once
+    return MatchWorkload(
+        seed, {robot: go_to(0.0, 0.0) for robot in ROBOT_NAMES}
+    )
+
+
+def random_frames(seed: int, n_objects: int) -> List[List[float]]:
+    """Return N_FRAMES random (x, y) positions of each object, flattened."""
+    rng = random.Random(seed)
+    return [
+        [rng.uniform(-0.7, 0.7) for _ in range(2 * n_objects)]
+        for _ in range(N_FRAMES)
+    ]
+
+
+class ProgressCheckerWorkload(Workload):
+    """Tracking of the progress of all the objects."""
+
+    def __init__(self, seed: int):
+        super().__init__()
+        checks = {
+            robot: (
+                REFEREE_DEFAULTS["progress_check_steps"],
+                REFEREE_DEFAULTS["progress_check_threshold"],
+            )
+            for robot in ROBOT_NAMES
+        }
+        checks[OBJECT_NAMES[-1]] = (
+            REFEREE_DEFAULTS["ball_progress_check_steps"],
+            REFEREE_DEFAULTS["ball_progress_check_threshold"],
+        )
+        self.bank = ProgressCheckerBank(checks)
+        # Small random moves, so that the checks are on the edge
+        self.frames = [
+            [value * 0.01 for value in frame]
+            for frame in random_frames(seed, N_OBJECTS)
+        ]
+        self.ticks = 0
+
+    def tick(self):
+        frame = self.frames[self.ticks % N_FRAMES]
+        self.ticks += 1
+        bank = self.bank
+        for object_id in range(N_OBJECTS):
+            bank.track(
+                object_id, frame[2 * object_id], frame[2 * object_id + 1]
+            )
+            bank.is_progress(object_id)
+
+
+class PenaltyAreaCheckerWorkload(Workload):
+    """Tracking of the robots in the penalty areas."""
+
+    def __init__(self, seed: int):
+        super().__init__()
+        self.checkers = [
+            PenaltyAreaChecker(
+                REFEREE_DEFAULTS["penalty_area_allowed_time"],
+                REFEREE_DEFAULTS["penalty_area_reset_after"],
+            )
+            for _ in ROBOT_NAMES
+        ]
+        # Close to the goals, so that the robots keep entering and leaving
+        self.frames = [
+            [
+                (
+                    value
+                    if i % 2 == 0
+                    else math.copysign(0.45 + abs(value) / 2, value)
+                )
+                for i, value in enumerate(frame)
+            ]
+            for frame in random_frames(seed, len(ROBOT_NAMES))
+        ]
+        self.ticks = 0
+
+    def tick(self):
+        frame = self.frames[self.ticks % N_FRAMES]
+        time = BENCHMARK_MATCH_TIME - self.ticks * TIME_STEP / 1000
+        self.ticks += 1
+        for i, checker in enumerate(self.checkers):
+            start = 2 * i
+            end = start + 2
+            checker.track(frame[start:end], time)
+            checker.is_violating()
+
+
+class NeutralSpotsWorkload(Workload):
+    """Sorting of the unoccupied neutral spots for all the objects, with the
+    objects moving every tick."""
+
+    def __init__(self, seed: int):
+        super().__init__()
+        world = World()
+        controller.use_world(world)
+        self.world = world
+        self.bodies = world.robots + [world.ball]
+        self.supervisor = RCJSoccerSupervisor(render_labels=False)
+        self.frames = random_frames(seed, N_OBJECTS)
+        self.ticks = 0
+
+    def tick(self):
+        frame = self.frames[self.ticks % N_FRAMES]
+        distance_type = (
+            NeutralSpotDistanceType.NEAREST
+            if self.ticks % 2
+            else NeutralSpotDistanceType.FURTHEST
+        )
+        self.ticks += 1
+
+        for i, body in enumerate(self.bodies):
+            body.translation[0] = frame[2 * i]
+            body.translation[1] = frame[2 * i + 1]
+        self.supervisor.update_positions()
+        for name in OBJECT_NAMES:
+            self.supervisor.get_unoccupied_neutral_spots_sorted(
+                distance_type.value, name
+            )
+
+
+class Scenario(NamedTuple):
+    description: str
+    setup: Callable[[int], Workload]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "idle": Scenario("Match with all the robots standing still", idle_match),
+    "attack": Scenario("Match with all the robots attacking", attacking_match),
+    "goal_storm": Scenario(
+        f"Goal every {GOAL_STORM_INTERVAL} ticks", goal_storm
+    ),
+    "stuck": Scenario("All six robots stuck at the walls", stuck_robots),
+    "penalty_camping": Scenario(
+        "All the robots patrolling their penalty areas", penalty_camping
+    ),
+    "neutral_spot_contention": Scenario(
+        "All the objects stuck at the center at once",
+        neutral_spot_contention,
+    ),
+    "progress_checker": Scenario(
+        "ProgressCheckerBank tracking all the objects",
+        ProgressCheckerWorkload,
+    ),
+    "penalty_area_checker": Scenario(
+        "PenaltyAreaChecker tracking all the robots",
+        PenaltyAreaCheckerWorkload,
+    ),
+    "neutral_spots": Scenario(
+        "get_unoccupied_neutral_spots_sorted for all the objects",
+        NeutralSpotsWorkload,
+    ),
+}
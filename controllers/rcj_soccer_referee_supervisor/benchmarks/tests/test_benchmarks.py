@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from benchmarks.runner import (
+    BASELINES_PATH,
+    find_regressions,
+    load_baselines,
+    reference_workload,
+    run_scenario,
+    save_baselines,
+)
+from benchmarks.scenarios import GOAL_STORM_INTERVAL, SCENARIOS
+from referee.enums import GameEvents
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_scenario_runs(name):
+    result = run_scenario(name, ticks=20, memory_ticks=10)
+
+    assert result["ticks_per_second"] > 0
+    assert result["relative_speed"] > 0
+    assert result["peak_memory_kib"] > 0
+
+
+def test_baselines_cover_all_scenarios():
+    assert set(load_baselines()) == set(SCENARIOS)
+
+
+def test_goal_storm_scores_goals():
+    result = run_scenario(
+        "goal_storm", ticks=1, memory_ticks=3 * GOAL_STORM_INTERVAL
+    )
+
+    assert result["events"][GameEvents.GOAL.value] == 3
+
+
+def test_reference_workload_is_deterministic():
+    assert reference_workload(3) == reference_workload(3)
+
+
+def test_find_regressions():
+    baselines = {
+        "idle": {
+            "relative_speed": 1.0,
+            "peak_memory_kib": 100,
+            "retained_bytes_per_tick": 0,
+        }
+    }
+    result = {
+        "ticks_per_second": 900,
+        "relative_speed": 0.9,
+        "peak_memory_kib": 110,
+        "retained_bytes_per_tick": 10,
+    }
+    assert find_regressions({"idle": result}, baselines) == []
+    assert find_regressions({"attack": result}, baselines) == []
+
+    # Slower than the baseline, but so is the machine
+    busy = dict(result, ticks_per_second=500)
+    assert find_regressions({"idle": busy}, baselines) == []
+
+    slow = dict(result, relative_speed=0.7)
+    assert find_regressions({"idle": slow}, baselines) == [
+        "idle: relative speed 0.700, baseline 1.000"
+    ]
+
+    leaking = dict(result, retained_bytes_per_tick=100)
+    assert len(find_regressions({"idle": leaking}, baselines)) == 1
+
+
+def test_save_baselines_keeps_other_scenarios(tmp_path):
+    path = tmp_path / BASELINES_PATH.name
+    path.write_text(json.dumps({"idle": {"relative_speed": 1}}))
+
+    save_baselines(
+        {
+            "attack": {
+                "ticks_per_second": 2000.0,
+                "relative_speed": 2.0,
+                "peak_memory_kib": 3.0,
+                "retained_bytes_per_tick": 4.0,
+                "events": {"GOAL": 1},
+            }
+        },
+        path,
+    )
+
+    # Without the ticks per second, which depend on the machine
+    assert json.loads(path.read_text()) == {
+        "attack": {
+            "relative_speed": 2.0,
+            "peak_memory_kib": 3.0,
+            "retained_bytes_per_tick": 4.0,
+        },
+        "idle": {"relative_speed": 1},
+    }
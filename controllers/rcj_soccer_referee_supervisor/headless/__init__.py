@@ -0,0 +1,12 @@
+import sys
+
+
+def install():
+    """Register the stand-in so that ``import controller`` resolves to it.
+
+    This needs to be called before any module importing ``controller`` (such
+    as referee.supervisor) gets imported.
+    """
+    from headless import controller
+
+    sys.modules["controller"] = controller
@@ -0,0 +1,85 @@
+import argparse
+import time
+from pathlib import Path
+
+from headless.match import run_match
+from referee.consts import DEFAULT_MATCH_TIME, TIME_STEP
+from referee.event_handlers import JSONLoggerHandler
+from referee.profiler import TickProfiler
+from referee.reflog import BinaryLoggerHandler
+from telemetry.publisher import TelemetryPublisher
+
+parser = argparse.ArgumentParser(
+    prog="python -m headless",
+    description="Play a match of the soccer referee without Webots.",
+)
+parser.add_argument(
+    "--match-time",
+    type=int,
+    default=DEFAULT_MATCH_TIME,
+    help="Length of the match in seconds",
+)
+parser.add_argument("--seed", type=int, help="Seed of the referee")
+parser.add_argument("--reflog", type=Path, help="Where to write the reflog")
+parser.add_argument(
+    "--binary-reflog", type=Path, help="Where to write the binary reflog"
+)
+parser.add_argument(
+    "--trajectory", type=Path, help="Where to record the trajectories"
+)
+parser.add_argument(
+    "--analytics", type=Path, help="Where to write the statistics of the match"
+)
+parser.add_argument(
+    "--telemetry", help="Name of the shared memory block of the telemetry"
+)
+parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Time the phases of the ticks and print the stats",
+)
+args = parser.parse_args()
+
+subscribers = []
+if args.reflog:
+    subscribers.append(JSONLoggerHandler(args.reflog))
+if args.binary_reflog:
+    subscribers.append(BinaryLoggerHandler(args.binary_reflog))
+
+publisher = None
+if args.telemetry:
+    publisher = TelemetryPublisher(args.telemetry)
+
+start = time.perf_counter()
+referee = run_match(
+    match_time=args.match_time,
+    seed=args.seed,
+    subscribers=subscribers,
+    trajectory=args.trajectory,
+    analytics=args.analytics,
+    telemetry=publisher,
+    profiler=TickProfiler() if args.profile else None,
+)
+elapsed = time.perf_counter() - start
+
+ticks = args.match_time * 1000 / TIME_STEP
+print(f"Score (blue:yellow): {referee.score_blue}:{referee.score_yellow}")
+print(f"Simulated {ticks:.0f} ticks in {elapsed:.2f}s", end=" ")
+print(f"({ticks / elapsed:.0f} ticks/s)")
+
+if args.profile:
+    stats = referee.profiler.stats()
+    print(f"Real-time factor: {stats['real_time_factor']:.1f}")
+    phases = {"webots_step": stats["step"], "dispatch": stats["dispatch"]}
+    phases.update(stats["phases"])
+    for phase, summary in phases.items():
+        print(
+            f"{phase:>30}: {summary['total_ms']:9.1f} ms total, "
+            f"p50 {summary['p50_ms']:.3f} ms, p99 {summary['p99_ms']:.3f} ms, "
+            f"max {summary['max_ms']:.3f} ms"
+        )
+
+if publisher is not None:
+    if publisher.has_readers:
+        print(f"Keeping the telemetry for {publisher.finish_grace:.0f}s")
+    publisher.close()
@@ -0,0 +1,216 @@
+"""Stand-in for the Webots ``controller`` module.
+
+Only the subset of the API used by the referee supervisor is implemented.
+All the nodes live in a :class:`headless.world.World`, which replaces the
+physics engine of Webots.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+from headless.world import (
+    Body,
+    CHANNEL_BALL,
+    CHANNEL_SUPERVISOR,
+    CHANNEL_TEAM,
+    World,
+)
+
+_world: Optional[World] = None
+
+
+def use_world(world: World):
+    """Make the newly created robots and supervisors live in the world.
+
+    Args:
+        world (World): The world to be simulated
+    """
+    global _world
+    _world = world
+
+
+def get_world() -> World:
+    """Return the simulated world, creating an empty one if there is none."""
+    if _world is None:
+        use_world(World())
+    return _world
+
+
+def _device_channel(owner: str, name: str) -> int:
+    if name.startswith("team"):
+        return CHANNEL_TEAM.get(owner[:1], CHANNEL_SUPERVISOR)
+    if name.startswith("ball"):
+        return CHANNEL_BALL
+    return CHANNEL_SUPERVISOR
+
+
+class Field:
+    def __init__(self, body: Body, name: str):
+        self.body = body
+        self.name = name
+
+    def getSFVec3f(self) -> List[float]:
+        return list(self.body.translation)
+
+    def setSFVec3f(self, value: List[float]):
+        self.body.translation = [float(v) for v in value]
+
+    def getSFRotation(self) -> List[float]:
+        return list(self.body.rotation)
+
+    def setSFRotation(self, value: List[float]):
+        self.body.rotation = [float(v) for v in value]
+
+
+class Node:
+    def __init__(self, body: Body):
+        self.body = body
+        self.fields = {
+            "translation": Field(body, "translation"),
+            "rotation": Field(body, "rotation"),
+        }
+
+    def getDef(self) -> str:
+        return self.body.name
+
+    def getField(self, name: str) -> Optional[Field]:
+        return self.fields.get(name)
+
+    def getVelocity(self) -> List[float]:
+        return list(self.body.velocity)
+
+    def setVelocity(self, velocity: List[float]):
+        self.body.velocity = [float(v) for v in velocity]
+
+    def resetPhysics(self):
+        self.body.stop()
+
+
+class Emitter:
+    def __init__(self, world: World, owner: str, name: str):
+        self.world = world
+        self.owner = owner
+        self.name = name
+        self.channel = _device_channel(owner, name)
+
+    def getChannel(self) -> int:
+        return self.channel
+
+    def setChannel(self, channel: int):
+        self.channel = channel
+
+    def send(self, data: Union[str, bytes]) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.world.emit(self, bytes(data))
+        return 1
+
+
+class Receiver:
+    def __init__(self, world: World, owner: str, name: str):
+        self.world = world
+        self.owner = owner
+        self.name = name
+        self.channel = _device_channel(owner, name)
+        self.enabled = False
+        self.queue = deque()
+        world.add_receiver(self)
+
+    def enable(self, sampling_period: int):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def getChannel(self) -> int:
+        return self.channel
+
+    def setChannel(self, channel: int):
+        self.channel = channel
+
+    def getQueueLength(self) -> int:
+        return len(self.queue)
+
+    def nextPacket(self):
+        self.queue.popleft()
+
+    def getBytes(self) -> bytes:
+        return self.queue[0][0]
+
+    def getString(self) -> str:
+        return self.queue[0][0].decode("utf-8")
+
+    def getEmitterDirection(self) -> List[float]:
+        return list(self.queue[0][1])
+
+    def getSignalStrength(self) -> float:
+        return self.queue[0][2]
+
+
+class Robot:
+    def __init__(self, name: str = "supervisor"):
+        self.world = get_world()
+        self.name = name
+        self.devices: Dict[str, Union[Emitter, Receiver]] = {}
+
+    def getName(self) -> str:
+        return self.name
+
+    def getTime(self) -> float:
+        return self.world.time
+
+    def getDevice(self, name: str) -> Optional[Union[Emitter, Receiver]]:
+        if name not in self.devices:
+            if "emitter" in name:
+                self.devices[name] = Emitter(self.world, self.name, name)
+            elif "receiver" in name:
+                self.devices[name] = Receiver(self.world, self.name, name)
+            else:
+                return None
+        return self.devices[name]
+
+    def step(self, duration: int) -> int:
+        if self.world.quit_status is not None:
+            return -1
+        self.world.step(duration)
+        return 0
+
+
+class Supervisor(Robot):
+    SIMULATION_MODE_PAUSE = 0
+    SIMULATION_MODE_REAL_TIME = 1
+    SIMULATION_MODE_FAST = 2
+
+    def __init__(self):
+        super().__init__()
+        self.simulation_mode = self.SIMULATION_MODE_REAL_TIME
+        # Label ID -> (text, x, y, size, color, transparency, font)
+        self.labels: Dict[int, tuple] = {}
+
+    def getFromDef(self, name: str) -> Optional[Node]:
+        body = self.world.bodies.get(name)
+        if body is None:
+            return None
+        return Node(body)
+
+    def simulationGetMode(self) -> int:
+        return self.simulation_mode
+
+    def simulationSetMode(self, mode: int):
+        self.simulation_mode = mode
+
+    def simulationQuit(self, status: int):
+        self.world.quit_status = status
+
+    def setLabel(
+        self,
+        id: int,
+        label: str,
+        x: float,
+        y: float,
+        size: float,
+        color: int,
+        transparency: float = 0.0,
+        font: str = "Arial",
+    ):
+        self.labels[id] = (label, x, y, size, color, transparency, font)
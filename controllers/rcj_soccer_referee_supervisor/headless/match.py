@@ -0,0 +1,160 @@
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from headless import install
+
+install()
+
+from headless import controller
+from headless.world import attacker, Driver, World
+from recorder.recorder import BaseVideoRecordAssistant
+from recorder.trajectory import TrajectoryRecordAssistant
+from referee.analytics import MatchAnalytics
+from referee.consts import (
+    BALL_PROGRESS_CHECK_STEPS,
+    BALL_PROGRESS_CHECK_THRESHOLD,
+    DEFAULT_MATCH_TIME,
+    PENALTY_AREA_ALLOWED_TIME,
+    PENALTY_AREA_RESET_AFTER,
+    PROGRESS_CHECK_STEPS,
+    PROGRESS_CHECK_THRESHOLD,
+    ROBOT_NAMES,
+    TIME_STEP,
+)
+from referee.event_handlers import EventHandler
+from referee.referee import RCJSoccerReferee
+from referee.supervisor import RCJSoccerSupervisor
+from telemetry.publisher import TelemetryPublisher
+
+# The same rule configuration as in rcj_soccer_referee_supervisor.py
+REFEREE_DEFAULTS = {
+    "match_id": 1,
+    "half_id": 1,
+    "progress_check_steps": PROGRESS_CHECK_STEPS,
+    "progress_check_threshold": PROGRESS_CHECK_THRESHOLD,
+    "ball_progress_check_steps": BALL_PROGRESS_CHECK_STEPS,
+    "ball_progress_check_threshold": BALL_PROGRESS_CHECK_THRESHOLD,
+    "team_name_blue": "The Blues",
+    "team_name_yellow": "The Yellows",
+    "initial_score_blue": 0,
+    "initial_score_yellow": 0,
+    "penalty_area_allowed_time": PENALTY_AREA_ALLOWED_TIME,
+    "penalty_area_reset_after": PENALTY_AREA_RESET_AFTER,
+}
+
+
+def attacking_drivers() -> Dict[str, Driver]:
+    """Return drivers making all the robots attack the opposing goal."""
+    return {robot: attacker() for robot in ROBOT_NAMES}
+
+
+def create_referee(
+    supervisor: RCJSoccerSupervisor,
+    match_time: int = DEFAULT_MATCH_TIME,
+    **kwargs,
+) -> RCJSoccerReferee:
+    """Create the referee configured the same way as in Webots.
+
+    Args:
+        supervisor (RCJSoccerSupervisor): Supervisor of the match
+        match_time (int): Length of the match in seconds
+        kwargs: Overrides of REFEREE_DEFAULTS
+
+    Returns:
+        RCJSoccerReferee: The referee, ready to kick off
+    """
+    options = dict(REFEREE_DEFAULTS)
+    options.update(kwargs)
+    return RCJSoccerReferee(
+        supervisor=supervisor, match_time=match_time, **options
+    )
+
+
+def run_match(
+    match_time: int = DEFAULT_MATCH_TIME,
+    drivers: Optional[Dict[str, Driver]] = None,
+    seed: Optional[int] = None,
+    subscribers: Iterable[EventHandler] = (),
+    trajectory: Optional[Path] = None,
+    analytics: Optional[Path] = None,
+    telemetry: Optional[TelemetryPublisher] = None,
+    **kwargs,
+) -> RCJSoccerReferee:
+    """Play a whole match without Webots.
+
+    Args:
+        match_time (int): Length of the match in seconds
+        drivers (dict, optional): Robot name -> driver. All the robots attack
+            if not specified.
+        seed (int, optional): Seed of the referee's random choices
+        subscribers (list): Event subscribers to be added to the referee
+        trajectory (Path, optional): Where to record the trajectories of the
+            objects
+        analytics (Path, optional): Where to write the statistics of the
+            match to
+        telemetry (TelemetryPublisher, optional): Publisher of the live
+            telemetry, which is left to the caller to close
+        kwargs: Overrides of REFEREE_DEFAULTS
+
+    Returns:
+        RCJSoccerReferee: The referee after the match has finished
+    """
+    if drivers is None:
+        drivers = attacking_drivers()
+    controller.use_world(World(drivers))
+
+    supervisor = RCJSoccerSupervisor()
+    referee = create_referee(supervisor, match_time, seed=seed, **kwargs)
+    for subscriber in subscribers:
+        referee.add_event_subscriber(subscriber)
+    if analytics is not None:
+        match_analytics = MatchAnalytics(analytics)
+        referee.add_tick_subscriber(match_analytics)
+        referee.add_event_subscriber(match_analytics)
+    if telemetry is not None:
+        referee.add_tick_subscriber(telemetry)
+        referee.add_event_subscriber(telemetry)
+
+    recorders = []
+    if trajectory is not None:
+        recorders.append(
+            TrajectoryRecordAssistant(
+                supervisor,
+                referee,
+                output_path=str(trajectory),
+                match_time=match_time,
+            )
+        )
+
+    play(supervisor, referee, recorders)
+    return referee
+
+
+def play(
+    supervisor: RCJSoccerSupervisor,
+    referee: RCJSoccerReferee,
+    recorders: Iterable[BaseVideoRecordAssistant] = (),
+):
+    """Kick off and run the event loop until the match is over, the same
+    way as rcj_soccer_referee_supervisor.py does.
+
+    Args:
+        supervisor (RCJSoccerSupervisor): Supervisor of the match
+        referee (RCJSoccerReferee): Referee of the match
+        recorders (list): Recorders to record the whole match
+    """
+    for recorder in recorders:
+        recorder.start_recording()
+
+    referee.kickoff()
+
+    while supervisor.step(TIME_STEP) != -1:
+        if not referee.tick():
+            break
+
+        for recorder in recorders:
+            recorder.record_tick(referee)
+        referee.profiler.lap("record")
+
+    for recorder in recorders:
+        recorder.stop_recording()
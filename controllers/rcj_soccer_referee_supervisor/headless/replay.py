@@ -0,0 +1,231 @@
+"""Replay of recorded matches.
+
+The referee is run over the poses recorded by the trajectory recorder
+instead of simulated physics, seeded the same way as in the original match.
+Unless the rules have changed since, it produces the very same events as
+the original reflog, so the differences show what a change of the rules
+does to real matches.
+"""
+
+import argparse
+import difflib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from headless import install
+
+install()
+
+from headless import controller
+from headless.match import create_referee, play
+from headless.world import BALL_DEF, World
+from recorder.trajectory import TrajectoryReader
+from referee.consts import TIME_STEP
+from referee.enums import GameEvents, ReflogFileSuffix
+from referee.event_handlers import EventHandler
+from referee.reflog import ReflogReader
+from referee.supervisor import RCJSoccerSupervisor
+
+# (tick, event type, payload)
+Event = Tuple[int, str, Optional[dict]]
+
+
+def to_tick(matchtime: float) -> int:
+    return round(matchtime * 1000 / TIME_STEP)
+
+
+class PlaybackWorld(World):
+    """World in which the objects follow the recorded trajectories.
+
+    Every step moves all the objects to the poses recorded for the next
+    tick, regardless of where the referee put them. Once the recording
+    runs out, the objects stay where they are.
+    """
+
+    def __init__(self, trajectory: TrajectoryReader):
+        super().__init__()
+        self.trajectory = trajectory
+        self.tick = 0
+
+        # Flat views of the recorded poses, indexed by OBJECT_IDS
+        self._translations = trajectory.translations.cast("B").cast("d")
+        self._rotations = trajectory.rotations.cast("B").cast("d")
+        self._objects = self.robots + [self.bodies[BALL_DEF]]
+
+    def step(self, time_step: int):
+        if self.tick < len(self.trajectory):
+            self._load(self.tick)
+        self.tick += 1
+
+        self._deliver_packets()
+        self.time += time_step / 1000.0
+
+    def _load(self, tick: int):
+        translations, rotations = self._translations, self._rotations
+
+        start = tick * len(self._objects) * 3
+        for body in self._objects:
+            end = start + 3
+            body.translation = translations[start:end].tolist()
+            start = end
+
+        start = tick * len(self.robots) * 4
+        for body in self.robots:
+            end = start + 4
+            body.rotation = rotations[start:end].tolist()
+            start = end
+
+    def close(self):
+        self._translations.release()
+        self._rotations.release()
+
+
+class EventCollector(EventHandler):
+    """Handler keeping all the events in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.events: List[Event] = []
+
+    def handle(self, referee, type: str, payload: Optional[dict] = None):
+        matchtime = referee.match_time - referee.time
+        self.events.append((to_tick(matchtime), type, payload))
+
+
+def load_reflog(path: Path) -> List[Event]:
+    """Load the events of a JSON Lines or a binary reflog.
+
+    Args:
+        path (Path): Path to the reflog
+
+    Returns:
+        list: (tick, event type, payload) of each event
+    """
+    if path.suffix == f".{ReflogFileSuffix.BINARY.value}":
+        with ReflogReader(path) as reader:
+            return [
+                (record.tick, record.event, record.payload)
+                for record in reader
+            ]
+
+    events = []
+    with path.open() as f:
+        for line in f:
+            data = json.loads(line)
+            events.append(
+                (
+                    to_tick(data["matchtime"]),
+                    data["event"],
+                    data.get("payload"),
+                )
+            )
+    return events
+
+
+def replay(trajectory: Path, events: List[Event], **kwargs) -> List[Event]:
+    """Run the referee over the recorded trajectories.
+
+    The referee is configured from the MATCH_START event of the original
+    match, including the seed of its random choices and the rules, unless
+    the reflog is older than their logging.
+
+    Args:
+        trajectory (Path): Trajectory file of the match
+        events (list): Events of the original match, see load_reflog
+        kwargs: Overrides of REFEREE_DEFAULTS, e.g. changed rules
+
+    Returns:
+        list: (tick, event type, payload) of each event of the replay
+    """
+    start = next(
+        payload
+        for _, type, payload in events
+        if type == GameEvents.MATCH_START.value
+    )
+    if "seed" not in start:
+        raise ValueError("The reflog does not contain the seed")
+
+    options = {
+        "match_time": start["total_match_time"],
+        "match_id": start["match_id"],
+        "half_id": start["halftime"],
+        "team_name_blue": start["team_name_blue"],
+        "team_name_yellow": start["team_name_yellow"],
+        "initial_score_blue": start["score_blue"],
+        "initial_score_yellow": start["score_yellow"],
+        "seed": start["seed"],
+    }
+    options.update(start.get("rules", {}))
+    options.update(kwargs)
+
+    collector = EventCollector()
+    with TrajectoryReader(trajectory) as reader:
+        world = PlaybackWorld(reader)
+        controller.use_world(world)
+
+        supervisor = RCJSoccerSupervisor(render_labels=False)
+        referee = create_referee(supervisor, **options)
+        referee.add_event_subscriber(collector)
+        play(supervisor, referee)
+        world.close()
+
+    return collector.events
+
+
+def diff_events(expected: List[Event], actual: List[Event]) -> List[str]:
+    """Return the differences of the event streams as a unified diff.
+
+    Args:
+        expected (list): Events of the original match
+        actual (list): Events of the replay
+
+    Returns:
+        list: Lines of the diff, empty if the streams are the same
+    """
+
+    def lines(events: List[Event]) -> List[str]:
+        # The timing differs from run to run
+        return [
+            f"{tick * TIME_STEP / 1000:.3f} {type} {json.dumps(payload)}"
+            for tick, type, payload in events
+            if type != GameEvents.STATS.value
+        ]
+
+    return list(
+        difflib.unified_diff(
+            lines(expected),
+            lines(actual),
+            fromfile="original",
+            tofile="replay",
+            lineterm="",
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m headless.replay",
+        description="Replay a recorded match and compare the events.",
+    )
+    parser.add_argument("trajectory", type=Path, help="Trajectory file")
+    parser.add_argument("reflog", type=Path, help="Original reflog")
+    args = parser.parse_args()
+
+    expected = load_reflog(args.reflog)
+    started = time.perf_counter()
+    actual = replay(args.trajectory, expected)
+    elapsed = time.perf_counter() - started
+
+    diff = diff_events(expected, actual)
+    for line in diff:
+        print(line)
+    print(f"Replayed {len(actual)} events in {elapsed:.2f}s", end=" ")
+    print("(same as the original)" if not diff else "(differences above)")
+    sys.exit(1 if diff else 0)
+
+
+if __name__ == "__main__":
+    main()
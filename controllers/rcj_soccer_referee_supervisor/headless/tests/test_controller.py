@@ -0,0 +1,51 @@
+from headless.controller import Supervisor, use_world
+from headless.world import CHANNEL_SUPERVISOR, World
+
+
+def test_fields_copy_values():
+    world = World()
+    use_world(world)
+    supervisor = Supervisor()
+    field = supervisor.getFromDef("B1").getField("translation")
+
+    position = field.getSFVec3f()
+    position[0] = 42
+    assert world.bodies["B1"].translation[0] != 42
+
+    field.setSFVec3f([0.1, 0.2, 0.3])
+    assert world.bodies["B1"].translation == [0.1, 0.2, 0.3]
+
+
+def test_unknown_def():
+    use_world(World())
+    assert Supervisor().getFromDef("B4") is None
+
+
+def test_packets_delivered_on_next_step():
+    world = World()
+    use_world(world)
+    supervisor = Supervisor()
+    emitter = supervisor.getDevice("emitter")
+    receiver = supervisor.getDevice("supervisor receiver")
+    receiver.owner = "B1"
+    receiver.enable(32)
+
+    emitter.send("hello")
+    assert emitter.getChannel() == CHANNEL_SUPERVISOR
+    assert receiver.getQueueLength() == 0
+
+    supervisor.step(32)
+    assert receiver.getQueueLength() == 1
+    assert receiver.getString() == "hello"
+    assert receiver.getSignalStrength() > 0
+    receiver.nextPacket()
+    assert receiver.getQueueLength() == 0
+
+
+def test_quit_stops_stepping():
+    use_world(World())
+    supervisor = Supervisor()
+    assert supervisor.step(32) == 0
+
+    supervisor.simulationQuit(0)
+    assert supervisor.step(32) == -1
@@ -0,0 +1,86 @@
+from headless.match import run_match
+from headless.world import idle
+from referee.consts import N_OBJECTS, NEUTRAL_SPOTS, ROBOT_NAMES
+from referee.enums import GameEvents
+from referee.event_handlers import EventHandler
+from referee.profiler import TickProfiler
+
+
+class Collector(EventHandler):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def handle(self, referee, type, payload=None):
+        self.events.append((round(referee.time, 3), type, payload))
+
+
+def test_match_is_deterministic():
+    first, second = Collector(), Collector()
+    run_match(match_time=60, seed=7, subscribers=[first])
+    run_match(match_time=60, seed=7, subscribers=[second])
+
+    assert first.events == second.events
+    assert first.events[0][1] == GameEvents.KICKOFF.value
+    assert first.events[-1][1] == GameEvents.MATCH_FINISH.value
+
+
+def test_idle_robots_lack_progress():
+    collector = Collector()
+    run_match(
+        match_time=20,
+        seed=1,
+        drivers={robot: idle() for robot in ROBOT_NAMES},
+        subscribers=[collector],
+    )
+
+    lack_of_progress = [
+        payload["robot_name"]
+        for _, type, payload in collector.events
+        if type == GameEvents.LACK_OF_PROGRESS.value
+        and payload["type"] == "robot"
+    ]
+    assert sorted(lack_of_progress) == sorted(ROBOT_NAMES)
+
+
+def test_idle_robots_are_moved_to_distinct_spots():
+    # All the robots lack progress in the same tick
+    referee = run_match(
+        match_time=16,
+        seed=1,
+        drivers={robot: idle() for robot in ROBOT_NAMES},
+    )
+
+    translations = referee.sv.translations
+    spots = {
+        (round(translations[i, 0], 3), round(translations[i, 1], 3))
+        for i in range(N_OBJECTS)
+    }
+    assert spots <= {tuple(spot) for spot in NEUTRAL_SPOTS.values()}
+    assert len(spots) == N_OBJECTS
+
+
+def test_profiled_match_logs_stats():
+    collector = Collector()
+    run_match(
+        match_time=5, seed=1, subscribers=[collector], profiler=TickProfiler()
+    )
+
+    (_, stats_type, stats), (_, finish_type, _) = collector.events[-2:]
+    assert (stats_type, finish_type) == (
+        GameEvents.STATS.value,
+        GameEvents.MATCH_FINISH.value,
+    )
+    assert 5 <= stats["simulated_time"] < 5.1
+    assert stats["real_time_factor"] > 0
+    assert "check_progress" in stats["phases"]
+    assert "update_positions" in stats["phases"]
+
+
+def test_unprofiled_match_does_not_log_stats():
+    collector = Collector()
+    run_match(match_time=5, seed=1, subscribers=[collector])
+
+    assert GameEvents.STATS.value not in [
+        type for _, type, _ in collector.events
+    ]
@@ -0,0 +1,67 @@
+from headless.match import run_match
+from headless.replay import diff_events, EventCollector, load_reflog, replay
+from referee.event_handlers import JSONLoggerHandler
+from referee.reflog import BinaryLoggerHandler
+
+
+def test_replay_matches_original(tmp_path):
+    trajectory = tmp_path / "match.traj"
+    jsonl, binary = tmp_path / "match.jsonl", tmp_path / "match.rlog"
+    collector = EventCollector()
+    json_logger = JSONLoggerHandler(jsonl)
+    run_match(
+        match_time=90,
+        seed=1,
+        subscribers=[collector, json_logger, BinaryLoggerHandler(binary)],
+        trajectory=trajectory,
+    )
+    json_logger.close()
+
+    assert load_reflog(jsonl) == collector.events
+    assert load_reflog(binary) == collector.events
+
+    events = replay(trajectory, load_reflog(jsonl))
+    assert events == collector.events
+    assert diff_events(collector.events, events) == []
+
+
+def test_replay_with_changed_rules(tmp_path):
+    trajectory = tmp_path / "match.traj"
+    collector = EventCollector()
+    run_match(
+        match_time=30, seed=2, subscribers=[collector], trajectory=trajectory
+    )
+
+    events = replay(
+        trajectory, collector.events, ball_progress_check_threshold=5
+    )
+
+    diff = diff_events(collector.events, events)
+    assert diff[:2] == ["--- original", "+++ replay"]
+    # The ball lacks progress way more often
+    assert any(
+        line.startswith("+") and "LACK_OF_PROGRESS" in line
+        for line in diff[2:]
+    )
+
+
+def test_replay_with_logged_rules(tmp_path):
+    trajectory = tmp_path / "match.traj"
+    collector = EventCollector()
+    run_match(
+        match_time=30,
+        seed=2,
+        subscribers=[collector],
+        trajectory=trajectory,
+        ball_progress_check_threshold=5,
+    )
+    (start,) = [
+        payload
+        for _, type, payload in collector.events
+        if type == "MATCH_START"
+    ]
+    assert start["rules"]["ball_progress_check_threshold"] == 5
+
+    # Played with the rules of the original match, not the defaults
+    events = replay(trajectory, collector.events)
+    assert diff_events(collector.events, events) == []
@@ -0,0 +1,77 @@
+import pytest
+
+from headless.world import (
+    attacker,
+    BALL_RADIUS,
+    idle,
+    ROBOT_RADIUS,
+    WALL_X,
+    World,
+)
+
+
+@pytest.fixture
+def world() -> World:
+    return World()
+
+
+def test_idle_robots_do_not_move():
+    world = World({"B1": idle()})
+    before = list(world.bodies["B1"].translation)
+    world.step(32)
+
+    assert world.bodies["B1"].translation == before
+    assert world.time == pytest.approx(0.032)
+
+
+def test_robot_moves_with_velocity(world: World):
+    robot = world.bodies["B1"]
+    x = robot.translation[0]
+    robot.velocity[0] = 0.1
+    world.step(1000)
+
+    assert robot.translation[0] == pytest.approx(x + 0.1)
+
+
+def test_robot_stays_inside_walls(world: World):
+    robot = world.bodies["B1"]
+    robot.velocity[0] = 0.3
+    for _ in range(100):
+        world.step(32)
+
+    assert robot.translation[0] == pytest.approx(WALL_X - ROBOT_RADIUS)
+
+
+def test_robot_kicks_ball(world: World):
+    robot = world.bodies["Y3"]
+    robot.translation = [0.0, -0.1, robot.translation[2]]
+    robot.velocity[1] = 0.3
+    for _ in range(10):
+        world.step(32)
+
+    ball = world.ball
+    assert ball.velocity[1] > 0
+    distance = ball.translation[1] - robot.translation[1]
+    assert distance >= ROBOT_RADIUS + BALL_RADIUS - 1e-9
+
+
+def test_robots_do_not_overlap(world: World):
+    world.bodies["B1"].translation[:2] = [0.0, 0.0]
+    world.bodies["B2"].translation[:2] = [0.01, 0.0]
+    world.step(32)
+
+    dx = world.bodies["B2"].translation[0] - world.bodies["B1"].translation[0]
+    assert dx == pytest.approx(2 * ROBOT_RADIUS)
+
+
+def test_attacker_scores_into_yellow_goal():
+    world = World({"B3": attacker()})
+    world.bodies["B3"].translation[:2] = [0.0, 0.1]
+    # Get the goalkeeper out of the way
+    world.bodies["Y3"].translation[:2] = [0.5, -0.5]
+    for _ in range(1000):
+        world.step(32)
+        if world.ball.translation[1] < -0.75:
+            break
+
+    assert world.ball.translation[1] < -0.75
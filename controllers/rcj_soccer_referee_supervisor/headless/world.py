@@ -0,0 +1,284 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+from referee.consts import (
+    BALL_INITIAL_TRANSLATION,
+    GOAL_X_UPPER_LIMIT,
+    ROBOT_INITIAL_ROTATION,
+    ROBOT_INITIAL_TRANSLATION,
+    ROBOT_NAMES,
+)
+from referee.enums import Team
+
+BALL_DEF = "BALL"
+
+BALL_RADIUS = 0.021
+ROBOT_RADIUS = 0.0375
+
+# Inner faces of the walls and goals, taken from the bounding boxes in
+# worlds/soccer.wbt
+WALL_X = 0.65
+WALL_Y = 0.75
+GOAL_BACK_WALL_Y = 0.85
+
+MAX_ROBOT_SPEED = 0.3  # m/s
+# Fraction of the ball velocity that remains after one second of rolling
+BALL_ROLLING_DAMPING = 0.5
+# Fraction of the normal velocity kept when bouncing off a wall or a robot
+RESTITUTION = 0.6
+
+CHANNEL_SUPERVISOR = 1
+CHANNEL_TEAM = {Team.BLUE.value: 2, Team.YELLOW.value: 3}
+CHANNEL_BALL = 4
+
+# (x, y) velocity the robot wants to drive with
+Driver = Callable[["World", str], Tuple[float, float]]
+
+
+class Body:
+    """A rigid body moving on the field plane."""
+
+    def __init__(
+        self,
+        name: str,
+        radius: float,
+        translation: List[float],
+        rotation: List[float],
+    ):
+        self.name = name
+        self.radius = radius
+        self.translation = list(translation)
+        self.rotation = list(rotation)
+        self.velocity = [0.0] * 6
+
+    def stop(self):
+        self.velocity = [0.0] * 6
+
+
+class World:
+    """Deterministic 2D stand-in for the Webots soccer world.
+
+    Robots and the ball are discs moving on the field plane. Robots move
+    with the velocity returned by their driver (or the one set through the
+    supervisor), are kept inside the walls and push each other apart. The
+    ball rolls with damping, bounces off the walls and gets kicked by the
+    robots touching it.
+    """
+
+    def __init__(self, drivers: Optional[Dict[str, Driver]] = None):
+        self.time = 0.0
+        self.quit_status: Optional[int] = None
+        self.drivers = dict(drivers or {})
+
+        self.bodies: Dict[str, Body] = {
+            BALL_DEF: Body(
+                BALL_DEF, BALL_RADIUS, BALL_INITIAL_TRANSLATION, [0, 0, 1, 0]
+            )
+        }
+        for robot in ROBOT_NAMES:
+            self.bodies[robot] = Body(
+                robot,
+                ROBOT_RADIUS,
+                ROBOT_INITIAL_TRANSLATION[robot],
+                ROBOT_INITIAL_ROTATION[robot],
+            )
+        self.robots = [self.bodies[robot] for robot in ROBOT_NAMES]
+        self.ball = self.bodies[BALL_DEF]
+
+        # Emitters and Receivers from the stand-in controller module
+        self.receivers = []
+        self.in_flight = []
+
+    def add_receiver(self, receiver):
+        self.receivers.append(receiver)
+
+    def emit(self, emitter, data: bytes):
+        """Queue a packet which gets delivered on the next step."""
+        self.in_flight.append((emitter, data))
+
+    def step(self, time_step: int):
+        """Advance the world by the given number of milliseconds.
+
+        Args:
+            time_step (int): Duration of the step in milliseconds
+        """
+        dt = time_step / 1000.0
+
+        for robot in self.robots:
+            driver = self.drivers.get(robot.name)
+            if driver is not None:
+                vx, vy = driver(self, robot.name)
+                robot.velocity[0], robot.velocity[1] = vx, vy
+            self._move_robot(robot, dt)
+
+        self._separate_robots()
+        self._move_ball(dt)
+        self._deliver_packets()
+
+        self.time += dt
+
+    def _move_robot(self, robot: Body, dt: float):
+        vx, vy = robot.velocity[0], robot.velocity[1]
+        speed = math.hypot(vx, vy)
+        if speed > MAX_ROBOT_SPEED:
+            vx *= MAX_ROBOT_SPEED / speed
+            vy *= MAX_ROBOT_SPEED / speed
+            robot.velocity[0], robot.velocity[1] = vx, vy
+
+        if speed > 0:
+            robot.rotation = [0, 0, 1, math.atan2(vy, vx)]
+
+        robot.translation[0] += vx * dt
+        robot.translation[1] += vy * dt
+        self._keep_inside(robot)
+
+    def _move_ball(self, dt: float):
+        ball = self.ball
+        damping = BALL_ROLLING_DAMPING**dt
+        ball.velocity[0] *= damping
+        ball.velocity[1] *= damping
+        ball.translation[0] += ball.velocity[0] * dt
+        ball.translation[1] += ball.velocity[1] * dt
+
+        for robot in self.robots:
+            self._kick(robot, ball)
+
+        self._keep_inside(ball)
+
+    def _kick(self, robot: Body, ball: Body):
+        dx = ball.translation[0] - robot.translation[0]
+        dy = ball.translation[1] - robot.translation[1]
+        distance = math.hypot(dx, dy)
+        contact = robot.radius + ball.radius
+        if distance >= contact:
+            return
+
+        if distance == 0:
+            nx, ny = 1.0, 0.0
+        else:
+            nx, ny = dx / distance, dy / distance
+
+        ball.translation[0] = robot.translation[0] + nx * contact
+        ball.translation[1] = robot.translation[1] + ny * contact
+
+        # The robot is way heavier than the ball, so only the relative normal
+        # velocity matters
+        rel_vx = robot.velocity[0] - ball.velocity[0]
+        rel_vy = robot.velocity[1] - ball.velocity[1]
+        approach = rel_vx * nx + rel_vy * ny
+        if approach > 0:
+            ball.velocity[0] += (1 + RESTITUTION) * approach * nx
+            ball.velocity[1] += (1 + RESTITUTION) * approach * ny
+
+    def _separate_robots(self):
+        robots = self.robots
+        contact = 2 * ROBOT_RADIUS
+        for i, first in enumerate(robots, start=1):
+            for second in robots[i:]:
+                dx = second.translation[0] - first.translation[0]
+                dy = second.translation[1] - first.translation[1]
+                distance = math.hypot(dx, dy)
+                if distance >= contact:
+                    continue
+
+                if distance == 0:
+                    nx, ny = 1.0, 0.0
+                else:
+                    nx, ny = dx / distance, dy / distance
+
+                overlap = (contact - distance) / 2
+                first.translation[0] -= nx * overlap
+                first.translation[1] -= ny * overlap
+                second.translation[0] += nx * overlap
+                second.translation[1] += ny * overlap
+
+        for robot in robots:
+            self._keep_inside(robot)
+
+    def _keep_inside(self, body: Body):
+        """Keep the body inside the walls and the goals. The ball bounces off
+        them, the robots keep pushing against them."""
+        t, v, r = body.translation, body.velocity, body.radius
+        bounce = body is self.ball
+
+        in_goal_mouth = abs(t[0]) < GOAL_X_UPPER_LIMIT - r
+        y_limit = (GOAL_BACK_WALL_Y if in_goal_mouth else WALL_Y) - r
+        if abs(t[1]) > y_limit:
+            t[1] = math.copysign(y_limit, t[1])
+            if bounce:
+                v[1] = -v[1] * RESTITUTION
+
+        if abs(t[1]) > WALL_Y - r:
+            # Inside the goal, the side walls of the goal are the limit
+            x_limit = GOAL_X_UPPER_LIMIT - r
+        else:
+            x_limit = WALL_X - r
+        if abs(t[0]) > x_limit:
+            t[0] = math.copysign(x_limit, t[0])
+            if bounce:
+                v[0] = -v[0] * RESTITUTION
+
+    def _deliver_packets(self):
+        in_flight, self.in_flight = self.in_flight, []
+        for emitter, data in in_flight:
+            source = self.bodies.get(emitter.owner)
+            for receiver in self.receivers:
+                if receiver.channel != emitter.channel:
+                    continue
+                if receiver.owner == emitter.owner:
+                    continue
+                if not receiver.enabled:
+                    continue
+
+                target = self.bodies.get(receiver.owner)
+                direction, strength = [1.0, 0.0, 0.0], 1.0
+                if source is not None and target is not None:
+                    dx = source.translation[0] - target.translation[0]
+                    dy = source.translation[1] - target.translation[1]
+                    distance = math.hypot(dx, dy) or 1e-6
+                    direction = [dx / distance, dy / distance, 0.0]
+                    strength = 1 / distance**2
+
+                receiver.queue.append((data, direction, strength))
+
+
+def idle() -> Driver:
+    """Driver which keeps the robot in place."""
+
+    def drive(world: World, robot: str) -> Tuple[float, float]:
+        return 0.0, 0.0
+
+    return drive
+
+
+def attacker(speed: float = MAX_ROBOT_SPEED) -> Driver:
+    """Driver which gets behind the ball and pushes it towards the goal of
+    the opposing team.
+
+    Args:
+        speed (float): Speed the robot drives with in m/s
+    """
+
+    def drive(world: World, robot: str) -> Tuple[float, float]:
+        body = world.bodies[robot]
+        ball = world.ball.translation
+
+        # The blue team attacks the goal with the negative y coordinate
+        goal_y = GOAL_BACK_WALL_Y
+        if robot[0] == Team.BLUE.value:
+            goal_y = -GOAL_BACK_WALL_Y
+        gx, gy = -ball[0], goal_y - ball[1]
+        norm = math.hypot(gx, gy) or 1e-6
+        gx, gy = gx / norm, gy / norm
+
+        # Aim at the spot right behind the ball and, once there, push it
+        behind = ROBOT_RADIUS + BALL_RADIUS
+        tx, ty = ball[0] - gx * behind, ball[1] - gy * behind
+        dx, dy = tx - body.translation[0], ty - body.translation[1]
+        if math.hypot(dx, dy) < behind / 2:
+            dx, dy = gx, gy
+
+        norm = math.hypot(dx, dy) or 1e-6
+        return dx / norm * speed, dy / norm * speed
+
+    return drive
@@ -1,7 +1,6 @@
 import logging
 import os
 from datetime import datetime
-from math import ceil
 from pathlib import Path, PosixPath
 
 from recorder.consts import RecordingFormat
@@ -10,19 +9,46 @@ from recorder.recorder import (
     MP4VideoRecordAssistant,
     X3DVideoRecordAssistant,
 )
-from referee.consts import DEFAULT_MATCH_TIME, TIME_STEP
-from referee.event_handlers import DrawMessageHandler, JSONLoggerHandler
+from recorder.trajectory import TrajectoryRecordAssistant
+from referee.analytics import ANALYTICS_SUFFIX, MatchAnalytics
+from referee.consts import (
+    BALL_PROGRESS_CHECK_STEPS,
+    BALL_PROGRESS_CHECK_THRESHOLD,
+    DEFAULT_MATCH_TIME,
+    PENALTY_AREA_ALLOWED_TIME,
+    PENALTY_AREA_RESET_AFTER,
+    PROGRESS_CHECK_STEPS,
+    PROGRESS_CHECK_THRESHOLD,
+    TIME_STEP,
+)
+from referee.enums import ReflogFileSuffix, ReflogFormat, SupervisorPacketMode
+from referee.event_handlers import (
+    DrawMessageHandler,
+    EventHandler,
+    JSONLoggerHandler,
+)
+from referee.profiler import TickProfiler
 from referee.referee import RCJSoccerReferee
+from referee.reflog import BinaryLoggerHandler
 from referee.supervisor import RCJSoccerSupervisor
+from telemetry.publisher import TelemetryPublisher
 
 
 def get_video_recorder_class(rec_format: str) -> BaseVideoRecordAssistant:
     return {
         RecordingFormat.MP4.value: MP4VideoRecordAssistant,
         RecordingFormat.X3D.value: X3DVideoRecordAssistant,
+        RecordingFormat.TRAJECTORY.value: TrajectoryRecordAssistant,
     }[rec_format]
 
 
+def get_reflog_handler_class(reflog_format: str) -> EventHandler:
+    return {
+        ReflogFormat.JSONL.value: JSONLoggerHandler,
+        ReflogFormat.BINARY.value: BinaryLoggerHandler,
+    }[reflog_format]
+
+
 def output_path(
     directory: Path,
     team_blue_id: str,
@@ -58,9 +84,19 @@ HALF_ID = int(os.environ.get("RCJ_SIM_HALF_ID", 1))
 
 REC_FORMATS_RAW = os.environ.get("RCJ_SIM_REC_FORMATS", "").split(",")
 REC_FORMATS = [f for f in REC_FORMATS_RAW if f]
+REFLOG_FORMATS_RAW = os.environ.get("RCJ_SIM_REFLOG_FORMATS", "jsonl")
+REFLOG_FORMATS = [f for f in REFLOG_FORMATS_RAW.split(",") if f]
 MATCH_TIME = int(os.environ.get("RCJ_SIM_MATCH_TIME", DEFAULT_MATCH_TIME))
+SEED = os.environ.get("RCJ_SIM_SEED")
+TELEMETRY = os.environ.get("RCJ_SIM_TELEMETRY")
+SUPERVISOR_PACKETS = os.environ.get(
+    "RCJ_SIM_SUPERVISOR_PACKETS", SupervisorPacketMode.EVERY_TICK.value
+)
 
 automatic_mode = True if "RCJ_SIM_AUTO_MODE" in os.environ.keys() else False
+render_labels = False if "RCJ_SIM_HEADLESS" in os.environ.keys() else True
+profile = True if "RCJ_SIM_PROFILE" in os.environ.keys() else False
+analytics = True if "RCJ_SIM_ANALYTICS" in os.environ.keys() else False
 
 REFLOG_OUTPUT_PATH = os.environ.get("RCJ_SIM_OUTPUT_PATH", "reflog")
 directory = Path(REFLOG_OUTPUT_PATH)
@@ -71,24 +107,26 @@ output_prefix = output_path(
     MATCH_ID,
     HALF_ID,
 )
-reflog_path = output_prefix.with_suffix(".jsonl")
 
-supervisor = RCJSoccerSupervisor()
+supervisor = RCJSoccerSupervisor(render_labels=render_labels)
 referee = RCJSoccerReferee(
     supervisor=supervisor,
     match_time=MATCH_TIME,
-    progress_check_steps=ceil(15 / (TIME_STEP / 1000.0)),
-    progress_check_threshold=0.5,
-    ball_progress_check_steps=ceil(10 / (TIME_STEP / 1000.0)),
-    ball_progress_check_threshold=0.5,
+    progress_check_steps=PROGRESS_CHECK_STEPS,
+    progress_check_threshold=PROGRESS_CHECK_THRESHOLD,
+    ball_progress_check_steps=BALL_PROGRESS_CHECK_STEPS,
+    ball_progress_check_threshold=BALL_PROGRESS_CHECK_THRESHOLD,
     team_name_blue=TEAM_BLUE,
     team_name_yellow=TEAM_YELLOW,
     initial_score_blue=TEAM_BLUE_INITIAL_SCORE,
     initial_score_yellow=TEAM_YELLOW_INITIAL_SCORE,
-    penalty_area_allowed_time=15,
-    penalty_area_reset_after=2,
+    penalty_area_allowed_time=PENALTY_AREA_ALLOWED_TIME,
+    penalty_area_reset_after=PENALTY_AREA_RESET_AFTER,
     match_id=MATCH_ID,
     half_id=HALF_ID,
+    seed=int(SEED) if SEED else None,
+    supervisor_packets=SUPERVISOR_PACKETS,
+    profiler=TickProfiler() if profile else None,
 )
 
 recorders = []
@@ -100,11 +138,17 @@ for rec_format in REC_FORMATS:
     recorder_class = get_video_recorder_class(rec_format)
     rec_suffix = recorder_class.output_suffix
 
+    rec_options = {}
+    if rec_format == RecordingFormat.TRAJECTORY.value:
+        rec_options["referee"] = referee
+        rec_options["match_time"] = MATCH_TIME
+
     recorders.append(
         recorder_class(
             supervisor=supervisor,
             output_path=str(output_prefix.with_suffix(f".{rec_suffix}")),
             resolution="720p",
+            **rec_options,
         )
     )
 
@@ -113,8 +157,29 @@ if automatic_mode:
     for recorder in recorders:
         recorder.start_recording()
 
-referee.add_event_subscriber(JSONLoggerHandler(reflog_path))
-referee.add_event_subscriber(DrawMessageHandler())
+available_reflog_formats = ReflogFormat.all()
+for reflog_format in REFLOG_FORMATS:
+    if reflog_format not in available_reflog_formats:
+        raise ValueError(f"Unexpected reflog format {reflog_format}")
+
+    reflog_suffix = ReflogFileSuffix[ReflogFormat(reflog_format).name].value
+    reflog_path = output_prefix.with_suffix(f".{reflog_suffix}")
+    handler_class = get_reflog_handler_class(reflog_format)
+    referee.add_event_subscriber(handler_class(reflog_path))
+
+if render_labels:
+    referee.add_event_subscriber(DrawMessageHandler())
+
+if analytics:
+    analytics_path = output_prefix.with_suffix(f".{ANALYTICS_SUFFIX}")
+    match_analytics = MatchAnalytics(analytics_path)
+    referee.add_tick_subscriber(match_analytics)
+    referee.add_event_subscriber(match_analytics)
+
+if TELEMETRY:
+    publisher = TelemetryPublisher(TELEMETRY)
+    referee.add_tick_subscriber(publisher)
+    referee.add_event_subscriber(publisher)
 
 referee.kickoff()
 
@@ -125,6 +190,10 @@ while supervisor.step(TIME_STEP) != -1:
     if not referee.tick():
         break
 
+    for recorder in recorders:
+        recorder.record_tick(referee)
+    referee.profiler.lap("record")
+
 # When end of match, pause simulator immediately
 supervisor.simulationSetMode(supervisor.SIMULATION_MODE_PAUSE)
 
@@ -134,5 +203,9 @@ for recorder in recorders:
         logging.info(f"Processing {recorder.output_suffix} video...")
         recorder.wait_processing()
 
+if TELEMETRY:
+    # Kept for a while for the readers to see the final score
+    publisher.close()
+
 if automatic_mode:
     supervisor.simulationQuit(0)
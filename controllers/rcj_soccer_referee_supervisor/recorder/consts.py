@@ -4,6 +4,7 @@ from enum import Enum
 class RecordingFormat(Enum):
     MP4 = "mp4"
     X3D = "x3d"
+    TRAJECTORY = "trajectory"
 
     @classmethod
     def all(cls):
@@ -13,3 +14,4 @@ class RecordingFormat(Enum):
 class RecordingFileSuffix(Enum):
     MP4 = "mp4"
     X3D = "html"
+    TRAJECTORY = "traj"
@@ -58,6 +58,11 @@ class BaseVideoRecordAssistant:
     def is_recording(self):
         return self._is_recording
 
+    def record_tick(self, referee):
+        """Record the state of the match after a tick of the referee. Only
+        needed by the recorders which do not rely on Webots."""
+        pass
+
     def wait_processing(self):
         raise NotImplementedError
 
@@ -0,0 +1,103 @@
+import pytest
+
+from headless import controller
+from headless.match import attacking_drivers, create_referee, run_match
+from headless.world import idle, World
+from recorder.trajectory import TrajectoryReader, TrajectoryRecordAssistant
+from referee.consts import (
+    BALL_ID,
+    N_OBJECTS,
+    N_ROBOTS,
+    OBJECT_IDS,
+    ROBOT_INITIAL_TRANSLATION,
+    ROBOT_NAMES,
+    TIME_STEP,
+)
+from referee.enums import GameEvents, RefereePhase
+from referee.event_handlers import EventHandler
+from referee.supervisor import RCJSoccerSupervisor
+
+
+def test_trajectory(tmp_path):
+    path = tmp_path / "match.traj"
+    run_match(match_time=20, seed=3, trajectory=path)
+
+    with TrajectoryReader(path) as reader:
+        n_ticks = len(reader)
+        assert abs(n_ticks - 20 * 1000 / TIME_STEP) <= 1
+        assert reader.translations.shape == (n_ticks, N_OBJECTS, 3)
+        assert reader.rotations.shape == (n_ticks, N_ROBOTS, 4)
+        assert reader.phases.shape == (n_ticks,)
+        assert reader.translations.readonly
+
+        ball_y = [reader.translations[i, BALL_ID, 1] for i in range(n_ticks)]
+        assert max(map(abs, ball_y)) > 0.1
+        assert reader.matchtime(0) == TIME_STEP / 1000
+        assert reader.matchtime(n_ticks - 1) == n_ticks * TIME_STEP / 1000
+
+
+class GoalTimes(EventHandler):
+    event_types = (GameEvents.GOAL.value,)
+
+    def __init__(self):
+        super().__init__()
+        self.matchtimes = []
+
+    def handle(self, referee, type, payload=None):
+        self.matchtimes.append(referee.match_time - referee.time)
+
+
+def test_goal_phase(tmp_path):
+    path = tmp_path / "match.traj"
+    goals = GoalTimes()
+    referee = run_match(
+        match_time=90, seed=1, trajectory=path, subscribers=[goals]
+    )
+    assert referee.score_blue + referee.score_yellow > 0
+
+    with TrajectoryReader(path) as reader:
+        phases = reader.phases.tolist()
+        # The goal is scored within its tick, the phase changes with the
+        # poses of the next one
+        goal = round(goals.matchtimes[0] * 1000 / TIME_STEP) - 1
+        assert reader.matchtime(goal) == pytest.approx(goals.matchtimes[0])
+    assert set(phases) == {
+        RefereePhase.PLAYING.value,
+        RefereePhase.GOAL_SCORED.value,
+    }
+    assert phases[goal] == RefereePhase.PLAYING.value
+    assert phases[goal + 1] == RefereePhase.GOAL_SCORED.value
+    assert RefereePhase.GOAL_SCORED.value not in phases[:goal]
+
+
+def test_idle_robots(tmp_path):
+    path = tmp_path / "match.traj"
+    run_match(
+        match_time=1,
+        drivers={robot: idle() for robot in ROBOT_NAMES},
+        trajectory=path,
+    )
+
+    with TrajectoryReader(path) as reader:
+        # The robots stay where the initial noise put them
+        y1 = reader.translations[0, OBJECT_IDS["Y1"], 1]
+        assert abs(y1 - ROBOT_INITIAL_TRANSLATION["Y1"][1]) < 0.075
+        assert reader.translations[len(reader) - 1, OBJECT_IDS["Y1"], 1] == y1
+
+
+def test_freshly_started_recording(tmp_path):
+    path = tmp_path / "match.traj"
+    controller.use_world(World(attacking_drivers()))
+    supervisor = RCJSoccerSupervisor()
+    referee = create_referee(supervisor)
+    recorder = TrajectoryRecordAssistant(
+        supervisor, referee, output_path=str(path)
+    )
+    recorder.start_recording()
+
+    with TrajectoryReader(path) as reader:
+        assert len(reader) == 0
+        assert len(reader.translations) == 0
+        assert len(reader.rotations) == 0
+        assert len(reader.phases) == 0
+    recorder.stop_recording()
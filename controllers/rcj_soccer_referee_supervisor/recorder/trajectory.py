@@ -0,0 +1,230 @@
+"""Trajectories of all the objects, recorded on every tick.
+
+The poses are the ones the referee works with on each tick, i.e. as read
+from Webots at the beginning of the tick. Together with the seed of the
+referee, they are enough to replay the match (see headless.replay).
+
+The file starts with a fixed-size header, followed by three columns sized
+for the whole match upfront:
+
+    translations: capacity x N_OBJECTS x 3 float64, indexed by OBJECT_IDS
+    rotations:    capacity x N_ROBOTS x 4 float64
+    phases:       capacity x uint8 RefereePhase values
+
+Row N holds the poses and the phase at the start of tick N, both taken from
+the same snapshot of the referee.
+
+The number of ticks recorded so far is kept up to date in the header, so
+the file can be read while the match is still being played. The columns
+can be mapped directly, e.g. with numpy.frombuffer, without copying.
+"""
+
+import mmap
+import struct
+from math import ceil
+from pathlib import Path
+from typing import List, Tuple
+
+from controller import Supervisor
+
+from recorder.consts import RecordingFileSuffix
+from recorder.recorder import BaseVideoRecordAssistant
+from referee.consts import DEFAULT_MATCH_TIME, N_OBJECTS, N_ROBOTS, TIME_STEP
+from referee.snapshot import TickSubscriber, WorldSnapshot
+
+MAGIC = b"RCJTRJ"
+VERSION = 1
+
+# magic, version, time step, objects, robots, capacity, recorded ticks
+HEADER = struct.Struct("<6sHHBBII")
+N_TICKS = struct.Struct("<I")
+N_TICKS_OFFSET = 16
+# The columns start 8-byte aligned
+HEADER_SIZE = 64
+
+TRANSLATIONS_SIZE = N_OBJECTS * 3 * 8
+ROTATIONS_SIZE = N_ROBOTS * 4 * 8
+
+
+def _layout(capacity: int) -> Tuple[int, int, int, int]:
+    """Return the offsets of the columns and the size of the file."""
+    translations_offset = HEADER_SIZE
+    rotations_offset = translations_offset + capacity * TRANSLATIONS_SIZE
+    phases_offset = rotations_offset + capacity * ROTATIONS_SIZE
+    return (
+        translations_offset,
+        rotations_offset,
+        phases_offset,
+        phases_offset + capacity,
+    )
+
+
+def _cast(view: memoryview, shape: List[int]) -> memoryview:
+    """Cast the bytes to float64 of the shape, flat if there are none."""
+    if not len(view):
+        return view.cast("d")
+    return view.cast("d", shape)
+
+
+class TrajectoryRecordAssistant(BaseVideoRecordAssistant, TickSubscriber):
+    """Recorder of the poses of the robots and the ball on every tick.
+
+    Unlike the other recorders, it does not rely on Webots, so it needs
+    record_tick to be called after every tick of the referee. The poses are
+    recorded from the snapshot the referee hands to its tick subscribers.
+    """
+
+    output_suffix = RecordingFileSuffix.TRAJECTORY.value
+
+    def __init__(
+        self,
+        supervisor: Supervisor,
+        referee,  # Referee from referee.py
+        output_path: str = "",
+        fastforward_rate: int = 1,
+        resolution: str = "720p",
+        match_time: int = DEFAULT_MATCH_TIME,
+    ):
+        super().__init__(supervisor, output_path, fastforward_rate, resolution)
+        self.referee = referee
+        # One more tick for the rounding of the match time
+        self.capacity = ceil(match_time * 1000 / TIME_STEP) + 1
+        self.n_ticks = 0
+
+    def start_recording(self):
+        (
+            self._translations_offset,
+            self._rotations_offset,
+            self._phases_offset,
+            size,
+        ) = _layout(self.capacity)
+
+        self._file = open(self.create_title(), "w+b")
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(
+            self._mmap,
+            0,
+            MAGIC,
+            VERSION,
+            TIME_STEP,
+            N_OBJECTS,
+            N_ROBOTS,
+            self.capacity,
+            0,
+        )
+
+        # Byte views of the pose buffers behind the snapshot of the referee,
+        # which get copied as they are
+        snapshot = self.referee.snapshot
+        self._translations = snapshot.translations.cast("B")
+        self._rotations = snapshot.rotations.cast("B")
+
+        self.n_ticks = 0
+        self.referee.add_tick_subscriber(self)
+        self._is_recording = True
+
+    def handle_tick(self, snapshot: WorldSnapshot):
+        tick, buffer = self.n_ticks, self._mmap
+        if tick >= self.capacity:
+            return
+
+        start = self._translations_offset + tick * TRANSLATIONS_SIZE
+        end = start + TRANSLATIONS_SIZE
+        buffer[start:end] = self._translations
+
+        start = self._rotations_offset + tick * ROTATIONS_SIZE
+        end = start + ROTATIONS_SIZE
+        buffer[start:end] = self._rotations
+
+        buffer[self._phases_offset + tick] = snapshot.phase
+
+    def record_tick(self, referee):
+        if not self._is_recording or self.n_ticks >= self.capacity:
+            return
+
+        # The tick has already been recorded from the snapshot, it only
+        # gets counted once the referee is done with it
+        self.n_ticks += 1
+        N_TICKS.pack_into(self._mmap, N_TICKS_OFFSET, self.n_ticks)
+
+    def stop_recording(self):
+        self.referee.remove_tick_subscriber(self)
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+        self._is_recording = False
+
+    def wait_processing(self):
+        pass
+
+
+class TrajectoryReader:
+    """Zero-copy reader of the trajectory files.
+
+    translations, rotations and phases are read-only views of the mapped
+    file, shaped (ticks, objects, 3), (ticks, robots, 4) and (ticks,). The
+    ticks are the ones recorded by the time the file is opened. As views
+    cannot have zeros in their shape, they are empty and flat until the
+    first tick has been recorded.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER_SIZE:
+            raise ValueError(f"{path} is not a trajectory file")
+        (
+            magic,
+            version,
+            self.time_step,
+            self.n_objects,
+            self.n_robots,
+            self.capacity,
+            self.n_ticks,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trajectory version {version}")
+
+        translations_offset, rotations_offset, phases_offset, _ = _layout(
+            self.capacity
+        )
+        view = memoryview(self._mmap)
+        n = self.n_ticks
+
+        end = translations_offset + n * TRANSLATIONS_SIZE
+        self.translations = _cast(
+            view[translations_offset:end], [n, self.n_objects, 3]
+        )
+        end = rotations_offset + n * ROTATIONS_SIZE
+        self.rotations = _cast(
+            view[rotations_offset:end], [n, self.n_robots, 4]
+        )
+        end = phases_offset + n
+        self.phases = view[phases_offset:end]
+        view.release()
+
+    def __enter__(self) -> "TrajectoryReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_ticks
+
+    def matchtime(self, tick: int) -> float:
+        """Convert the tick to the match time in seconds."""
+        return (tick + 1) * self.time_step / 1000
+
+    def close(self):
+        """Release the views and unmap the file."""
+        self.translations.release()
+        self.rotations.release()
+        self.phases.release()
+        self._mmap.close()
+        self._file.close()
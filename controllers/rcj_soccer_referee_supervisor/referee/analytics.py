@@ -0,0 +1,227 @@
+"""Statistics of the match, computed as it is played.
+
+The statistics are updated from the snapshot the referee hands to its tick
+subscribers, with a constant amount of work per tick, in accumulators
+allocated upfront:
+
+    possession: ticks each robot was the closest one to the ball, within
+                POSSESSION_DISTANCE, while the ball was in play
+    distance:   meters covered by each robot, without the moves made by
+                the referee (neutral spots, kickoffs)
+    halves:     ticks each robot spent in the blue and the yellow half
+    penalty:    ticks each robot spent in the blue and the yellow penalty
+                area
+    heatmaps:   ticks the ball and the robots of each team spent in each
+                cell of a grid of HEATMAP_CELL_SIZE over the field
+
+The summary is written as JSON once the match is finished.
+"""
+
+import json
+import math
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from referee.consts import (
+    BALL_ID,
+    FIELD_X_LOWER_LIMIT,
+    FIELD_X_UPPER_LIMIT,
+    FIELD_Y_LOWER_LIMIT,
+    FIELD_Y_UPPER_LIMIT,
+    N_ROBOTS,
+    ROBOT_NAMES,
+    TIME_STEP,
+)
+from referee.enums import GameEvents, Team, Zone
+from referee.event_handlers import EventHandler
+from referee.events import Event
+from referee.snapshot import TickSubscriber, WorldSnapshot
+from referee.zones import zone_mask
+
+# Suffix of the summary, next to the reflog
+ANALYTICS_SUFFIX = "analytics.json"
+
+# Farthest the ball can be from a robot to be in its possession, in meters
+POSSESSION_DISTANCE = 0.1
+# Longest move of a robot within a tick counted as covered distance, the
+# longer ones are made by the referee
+MAX_TICK_DISTANCE = 0.05
+
+HEATMAP_CELL_SIZE = 0.05
+HEATMAP_COLUMNS = math.ceil(
+    (FIELD_X_UPPER_LIMIT - FIELD_X_LOWER_LIMIT) / HEATMAP_CELL_SIZE
+)
+HEATMAP_ROWS = math.ceil(
+    (FIELD_Y_UPPER_LIMIT - FIELD_Y_LOWER_LIMIT) / HEATMAP_CELL_SIZE
+)
+HEATMAP_CELLS = HEATMAP_ROWS * HEATMAP_COLUMNS
+# Order of the heatmaps in the accumulator
+HEATMAPS = (Team.BLUE.value, Team.YELLOW.value, "ball")
+BALL_HEATMAP = 2
+
+BLUE_HALF, YELLOW_HALF = 0, 1
+IN_BLUE_PENALTY = Zone.BLUE_PENALTY.value
+IN_YELLOW_PENALTY = Zone.YELLOW_PENALTY.value
+
+
+def _seconds(ticks: int) -> float:
+    return round(ticks * TIME_STEP / 1000, 3)
+
+
+def heatmap_cell(x: float, y: float) -> int:
+    """Return the index of the heatmap cell of the position, the positions
+    outside of the field count into the nearest cell."""
+    column = int((x - FIELD_X_LOWER_LIMIT) / HEATMAP_CELL_SIZE)
+    row = int((y - FIELD_Y_LOWER_LIMIT) / HEATMAP_CELL_SIZE)
+    column = min(max(column, 0), HEATMAP_COLUMNS - 1)
+    row = min(max(row, 0), HEATMAP_ROWS - 1)
+    return row * HEATMAP_COLUMNS + column
+
+
+class MatchAnalytics(EventHandler, TickSubscriber):
+    """Subscriber computing the statistics of the match.
+
+    It is to be added as both a tick subscriber, following the match from
+    its snapshots, and an event subscriber, writing the summary once the
+    match is finished.
+    """
+
+    event_types = (GameEvents.MATCH_FINISH.value,)
+
+    def __init__(self, summary_path: Optional[Path] = None):
+        """
+        Args:
+            summary_path (Path, optional): Where to write the summary to
+                once the match is finished
+        """
+        super().__init__()
+        self.summary_path = summary_path
+        self.ticks = 0
+        self.in_play = False
+        self.score = {Team.BLUE.value: 0, Team.YELLOW.value: 0}
+
+        self.possession = array("Q", [0]) * N_ROBOTS
+        self.distance = array("d", [0.0]) * N_ROBOTS
+        # Two counters per robot: blue and yellow half (or penalty area)
+        self.halves = array("Q", [0]) * (2 * N_ROBOTS)
+        self.penalty = array("Q", [0]) * (2 * N_ROBOTS)
+        self.heatmaps = array("Q", [0]) * (len(HEATMAPS) * HEATMAP_CELLS)
+
+        # Flat view of the translations of the snapshot, set on the first
+        # tick along with the previous positions of the robots
+        self._translations: Optional[memoryview] = None
+        self._previous = array("d", [0.0]) * (2 * N_ROBOTS)
+
+    def handle_tick(self, snapshot: WorldSnapshot):
+        """Update the statistics with the snapshot of the tick."""
+        t = self._translations
+        if t is None:
+            t = self._translations = snapshot.translations.cast("B").cast("d")
+            for robot_id in range(N_ROBOTS):
+                self._previous[robot_id * 2] = t[robot_id * 3]
+                self._previous[robot_id * 2 + 1] = t[robot_id * 3 + 1]
+
+        self.ticks += 1
+        self.in_play = not snapshot.waiting_for_kickoff
+        self.score[Team.BLUE.value] = snapshot.score_blue
+        self.score[Team.YELLOW.value] = snapshot.score_yellow
+
+        ball_offset = BALL_ID * 3
+        ball_x, ball_y = t[ball_offset], t[ball_offset + 1]
+        cell = heatmap_cell(ball_x, ball_y)
+        self.heatmaps[BALL_HEATMAP * HEATMAP_CELLS + cell] += 1
+
+        nearest, nearest_distance = None, POSSESSION_DISTANCE
+        for robot_id in range(N_ROBOTS):
+            offset = robot_id * 3
+            x, y = t[offset], t[offset + 1]
+            self._track_robot(robot_id, x, y)
+
+            distance = math.hypot(x - ball_x, y - ball_y)
+            if distance < nearest_distance:
+                nearest, nearest_distance = robot_id, distance
+
+        if nearest is not None and self.in_play:
+            self.possession[nearest] += 1
+
+    def _track_robot(self, robot_id: int, x: float, y: float):
+        previous, offset = self._previous, robot_id * 2
+        moved = math.hypot(x - previous[offset], y - previous[offset + 1])
+        if moved <= MAX_TICK_DISTANCE:
+            self.distance[robot_id] += moved
+        previous[offset], previous[offset + 1] = x, y
+
+        self.halves[offset + (BLUE_HALF if y > 0 else YELLOW_HALF)] += 1
+
+        mask = zone_mask(x, y)
+        if mask & IN_BLUE_PENALTY:
+            self.penalty[offset + BLUE_HALF] += 1
+        elif mask & IN_YELLOW_PENALTY:
+            self.penalty[offset + YELLOW_HALF] += 1
+
+        # Blue robots come first
+        team = 0 if robot_id < N_ROBOTS // 2 else 1
+        self.heatmaps[team * HEATMAP_CELLS + heatmap_cell(x, y)] += 1
+
+    def handle_event(self, referee, event: Event):
+        # Only subscribed to MATCH_FINISH
+        referee.remove_tick_subscriber(self)
+        self.close()
+
+    def summary(self) -> dict:
+        """Return the statistics, with the times in seconds."""
+        possession_ticks = sum(self.possession)
+        team_possession = {Team.BLUE.value: 0, Team.YELLOW.value: 0}
+        robots = {}
+        for robot_id, robot in enumerate(ROBOT_NAMES):
+            offset = robot_id * 2
+            team_possession[robot[0]] += self.possession[robot_id]
+            robots[robot] = {
+                "distance": round(self.distance[robot_id], 3),
+                "possession_time": _seconds(self.possession[robot_id]),
+                "time_in_half": {
+                    Team.BLUE.value: _seconds(self.halves[offset]),
+                    Team.YELLOW.value: _seconds(self.halves[offset + 1]),
+                },
+                "time_in_penalty_area": {
+                    Team.BLUE.value: _seconds(self.penalty[offset]),
+                    Team.YELLOW.value: _seconds(self.penalty[offset + 1]),
+                },
+            }
+
+        heatmaps = {}
+        for i, name in enumerate(HEATMAPS):
+            start = i * HEATMAP_CELLS
+            rows = []
+            for row_start in range(
+                start, start + HEATMAP_CELLS, HEATMAP_COLUMNS
+            ):
+                row_end = row_start + HEATMAP_COLUMNS
+                rows.append(self.heatmaps[row_start:row_end].tolist())
+            heatmaps[name] = rows
+
+        return {
+            "time": _seconds(self.ticks),
+            "score": dict(self.score),
+            # Share of the time the ball was in the possession of the team
+            "possession": {
+                team: (ticks / possession_ticks if possession_ticks else 0.0)
+                for team, ticks in team_possession.items()
+            },
+            "robots": robots,
+            "heatmaps": {
+                "cell_size": HEATMAP_CELL_SIZE,
+                # Position of the corner of the first cell
+                "origin": [FIELD_X_LOWER_LIMIT, FIELD_Y_LOWER_LIMIT],
+                # Rows along the y axis, columns along the x axis, in ticks
+                **heatmaps,
+            },
+        }
+
+    def close(self):
+        """Write the summary."""
+        if self.summary_path is None:
+            return
+        with self.summary_path.open("w") as f:
+            json.dump(self.summary(), f)
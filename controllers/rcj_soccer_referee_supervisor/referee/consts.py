@@ -1,3 +1,6 @@
+import struct
+from math import ceil
+
 from referee.enums import Team
 
 DEFAULT_MATCH_TIME = 10 * 60  # 10 minutes
@@ -15,9 +18,29 @@ FIELD_X_UPPER_LIMIT = 0.655
 FIELD_X_LOWER_LIMIT = -0.655
 
 TIME_STEP = 32
+
+# Rules of the matches, the same in Webots and in the headless matches. The
+# ones a match is played with are logged in its MATCH_START event.
+PROGRESS_CHECK_STEPS = ceil(15 / (TIME_STEP / 1000.0))
+PROGRESS_CHECK_THRESHOLD = 0.5
+BALL_PROGRESS_CHECK_STEPS = ceil(10 / (TIME_STEP / 1000.0))
+BALL_PROGRESS_CHECK_THRESHOLD = 0.5
+PENALTY_AREA_ALLOWED_TIME = 15
+PENALTY_AREA_RESET_AFTER = 2
+POST_GOAL_WAIT_TIME = 3
+INITIAL_POSITION_NOISE = 0.15
+
 ROBOT_NAMES = ["B1", "B2", "B3", "Y1", "Y2", "Y3"]
 N_ROBOTS = len(ROBOT_NAMES)
 
+# Fixed IDs used to index the pose buffers: robots first, ball last, so that
+# the robot IDs index both the translations and the rotations.
+BALL_NAME = "ball"
+OBJECT_NAMES = ROBOT_NAMES + [BALL_NAME]
+N_OBJECTS = len(OBJECT_NAMES)
+OBJECT_IDS = {name: object_id for object_id, name in enumerate(OBJECT_NAMES)}
+BALL_ID = OBJECT_IDS[BALL_NAME]
+
 BALL_DEPTH = 0
 BALL_INITIAL_TRANSLATION = [0, 0, BALL_DEPTH]
 
@@ -75,3 +98,13 @@ MAX_EVENT_MESSAGES_IN_QUEUE = 10
 DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT = 0.08
 
 LACK_OF_PROGRESS_NUMBER_OF_NEUTRAL_SPOTS = 3
+
+# Packet sent from the supervisor to the robots: version, flags, sequence
+# number of the packet. Keep in sync with rcj_soccer_robot.py of the teams.
+SUPERVISOR_PACKET = struct.Struct("<BBI")
+SUPERVISOR_PACKET_VERSION = 1
+# Bits of the flags
+WAITING_FOR_KICKOFF_FLAG = 1
+# Number of ticks after which the state is sent again even if it has not
+# changed, when sending the changes only (about a second)
+SUPERVISOR_PACKET_HEARTBEAT = 32
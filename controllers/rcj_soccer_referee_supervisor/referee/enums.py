@@ -25,6 +25,79 @@ class GameEvents(Enum):
     INSIDE_PENALTY_FOR_TOO_LONG = "INSIDE_PENALTY_FOR_TOO_LONG"
     KICKOFF = "KICKOFF"
     GOAL = "GOAL"
+    # Timing of the match, logged right before MATCH_FINISH when profiling
+    STATS = "STATS"
+
+
+class RefereePhase(Enum):
+    PLAYING = 0
+    # Waiting for the kickoff after a goal
+    GOAL_SCORED = 1
+
+
+class ReflogFormat(Enum):
+    JSONL = "jsonl"
+    BINARY = "binary"
+
+    @classmethod
+    def all(cls):
+        return list(map(lambda member: member.value, cls))
+
+
+class SupervisorPacketMode(Enum):
+    # A packet on every tick, robots acting on every new packet rely on it
+    EVERY_TICK = "every_tick"
+    # A packet only when the state changes, plus a periodic heartbeat
+    CHANGES = "changes"
+
+    @classmethod
+    def all(cls):
+        return list(map(lambda member: member.value, cls))
+
+
+class EventDelivery(Enum):
+    # Handled right away, within the tick of the referee
+    SYNC = "sync"
+    # Queued and handled by a worker thread of the subscriber
+    ASYNC = "async"
+
+    @classmethod
+    def all(cls):
+        return list(map(lambda member: member.value, cls))
+
+
+class BackpressurePolicy(Enum):
+    """What to do with a new event when the queue of an asynchronous
+    subscriber is full."""
+
+    # Wait until the subscriber handles an event
+    BLOCK = "block"
+    # Drop the oldest event in the queue
+    DROP_OLDEST = "drop_oldest"
+    # Replace the queued event of the same state, if any, with the new one
+    # in its place (even if the queue is not full), otherwise wait. The
+    # state is the type of the event along with its robot, team or ball,
+    # GOAL and MATCH_* events are never replaced.
+    COALESCE = "coalesce"
+
+    @classmethod
+    def all(cls):
+        return list(map(lambda member: member.value, cls))
+
+
+class ReflogFileSuffix(Enum):
+    JSONL = "jsonl"
+    BINARY = "rlog"
+
+
+class Zone(Enum):
+    """Bits of the zone masks computed for every object on each tick."""
+
+    OUTSIDE = 1
+    BLUE_GOAL = 2
+    YELLOW_GOAL = 4
+    BLUE_PENALTY = 8
+    YELLOW_PENALTY = 16
 
 
 class NeutralSpotDistanceType(Enum):
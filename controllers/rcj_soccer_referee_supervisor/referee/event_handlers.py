@@ -1,13 +1,33 @@
+import atexit
 import json
-from datetime import datetime
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional
+
+from referee.enums import GameEvents
+from referee.events import Event
 
 
 class EventHandler:
+    # GameEvents values of the events to be handled, all of them if None
+    event_types: Optional[Iterable[str]] = None
+
     def __init__(self):
         pass
 
+    def handle_event(self, referee, event: Event):
+        """Handle the typed event, see referee.events.
+
+        By default, the event is handled as its type and payload by
+        `handle`. The event is reused once handled, so it must not be kept
+        around, see Event.copy.
+        """
+        self.handle(referee, event.event_type, event.payload())
+
     def handle(
         self,
         referee,  # Referee from referee.py
@@ -25,31 +45,167 @@ class EventHandler:
 
 
 class JSONLoggerHandler(EventHandler):
-    """Handler for writing data to json file."""
+    """Handler for writing data to json file.
 
-    def __init__(self, logfile: Path):
+    The events are serialized and written by a background thread, in
+    batches every flush_interval seconds, so that the referee does not wait
+    for the disk. The events in durable_events (as well as closing the
+    handler) make the referee wait until everything logged so far is
+    written and synced to the disk. The handler gets closed at exit at the
+    latest.
+
+    If writing fails, the error is logged and the writer thread stops, after
+    which handling the events, flushing and closing raise OSError.
+    """
+
+    def __init__(
+        self,
+        logfile: Path,
+        flush_interval: float = 1.0,
+        durable_events: Iterable[str] = (
+            GameEvents.GOAL.value,
+            GameEvents.MATCH_FINISH.value,
+        ),
+    ):
+        """
+        Args:
+            logfile (Path): Where to append the events to
+            flush_interval (float): Longest time in seconds an event waits
+                for being written
+            durable_events (list): Event types to wait for being synced to
+                the disk
+        """
         super().__init__()
         self.logfile = logfile
+        self.flush_interval = flush_interval
+        self.durable_events = frozenset(durable_events)
+
+        # (timestamp, matchtime, type, payload) of the events to be written
+        self._pending: List[tuple] = []
+        self._queued = 0
+        self._written = 0
+        self._sync_requested = False
+        self._closed = False
+        self._error: Optional[Exception] = None
+        self._condition = threading.Condition()
+
+        self._file = self.logfile.open("a")
+        self._thread = threading.Thread(
+            target=self._run, name="JSONLoggerHandler", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
 
     def handle(self, referee, type: str, payload: Optional[dict] = None):
         matchtime = referee.match_time - referee.time
-        data = {
-            "datetime": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-            "matchtime": matchtime,
-            "event": type,
-        }
+        # The payloads are built for each event and never changed, so they
+        # can be serialized later on
+        entry = (time.time(), matchtime, type, payload)
+
+        with self._condition:
+            self._check_writer()
+            # The writer thread is gone, nothing would write the event
+            if self._closed:
+                raise ValueError(f"{self.logfile} is closed")
+            self._pending.append(entry)
+            self._queued += 1
+
+        if type in self.durable_events:
+            self.flush()
+
+    def flush(self):
+        """Wait until all the events handled so far are written and synced
+        to the disk."""
+        with self._condition:
+            queued = self._queued
+            self._sync_requested = True
+            self._condition.notify_all()
+            while self._written < queued and self._thread.is_alive():
+                if self._error is not None:
+                    break
+                self._condition.wait(self.flush_interval)
+            self._check_writer()
+
+    def close(self):
+        """Write the remaining events and close the file."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._sync_requested = True
+            self._condition.notify_all()
+
+        self._thread.join()
+        atexit.unregister(self.close)
+        with self._condition:
+            self._check_writer()
+
+    def _check_writer(self):
+        """Raise OSError if the writer thread has failed."""
+        if self._error is not None:
+            raise OSError(
+                f"Writing the events to {self.logfile} failed"
+            ) from self._error
+
+    def _run(self):
+        try:
+            self._write_batches()
+        except Exception as error:
+            logging.exception(f"Writing the events to {self.logfile} failed")
+            with self._condition:
+                self._error = error
+                self._condition.notify_all()
+        finally:
+            self._file.close()
+
+    def _write_batches(self):
+        closed = False
+        while not closed:
+            with self._condition:
+                if not self._sync_requested:
+                    self._condition.wait(self.flush_interval)
+                entries, self._pending = self._pending, []
+                sync, self._sync_requested = self._sync_requested, False
+                closed = self._closed
+
+            self._write(entries, sync)
+            with self._condition:
+                self._written += len(entries)
+                self._condition.notify_all()
+
+    def _write(self, entries: List[tuple], sync: bool):
+        outfile = self._file
+        for timestamp, matchtime, type, payload in entries:
+            data = {
+                "datetime": datetime.fromtimestamp(
+                    timestamp, timezone.utc
+                ).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "matchtime": matchtime,
+                "event": type,
+            }
+
+            if payload is not None:
+                data["payload"] = payload
 
-        if payload is not None:
-            data["payload"] = payload
-
-        with self.logfile.open("a") as outfile:
             json.dump(data, outfile)
             outfile.write("\n")
 
+        outfile.flush()
+        if sync:
+            os.fsync(outfile.fileno())
+
 
 class DrawMessageHandler(EventHandler):
     """Handler for creating the message which is drawn onto world window."""
 
+    def __init__(self):
+        super().__init__()
+        # Event type -> formatter of its message
+        self.formatters: Dict[str, Callable[..., str]] = {
+            event.value: getattr(self, f"create_{event.value.lower()}_msg")
+            for event in GameEvents
+        }
+
     def create_inside_penalty_for_too_long_msg(
         self,
         robot_name: str,
@@ -79,9 +235,11 @@ class DrawMessageHandler(EventHandler):
     def create_match_finish_msg(self, total_match_time: int, **kwargs) -> str:
         return f"The match time {total_match_time}s is over."
 
+    def create_stats_msg(self, real_time_factor: float, **kwargs) -> str:
+        return f"The match ran at {real_time_factor:.1f}x real time."
+
     def handle(self, referee, type: str, payload: Optional[dict] = None):
         # Call formatter based on event type.
-        msg_formatter = getattr(self, f"create_{type.lower()}_msg")
         data = payload if payload is not None else {}
-        message = msg_formatter(**data)
+        message = self.formatters[type](**data)
         referee.add_event_message_to_queue(message)
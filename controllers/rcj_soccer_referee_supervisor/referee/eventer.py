@@ -1,13 +1,295 @@
+"""Dispatch of the events of the referee to its subscribers.
+
+The synchronous subscribers handle each event right away, within the tick
+of the referee. The asynchronous ones get the events through a bounded
+queue, emptied by a worker thread of their own in the order the events
+were sent, so that a slow subscriber does not slow the ticks down. What
+happens when the queue is full is up to the BackpressurePolicy of the
+subscriber. The queues are drained once the match is finished.
+
+The referee sends typed events (see referee.events) taken from a pool by
+`emit`, which hands each of them to the subscribers of its type only: the
+subscribers are indexed by the event types they declare. `event`, which
+sends the events as their type and payload to every subscriber, is kept
+for the callers not using the typed events.
+
+The asynchronous subscribers get the referee along with the events, but
+they handle the events later on, when its state may have moved on. The
+subscribers reading the state of the referee (such as DrawMessageHandler)
+should therefore stay synchronous.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Type, Union
+
+from referee.enums import BackpressurePolicy, EventDelivery, GameEvents
 from referee.event_handlers import EventHandler
+from referee.events import Event, EventPool, MatchFinish
+from referee.profiler import NullTickProfiler
+
+DEFAULT_QUEUE_SIZE = 256
+
+# Events of a moment of the match rather than of its state, which a newer
+# event does not stand for, so they are never coalesced
+NOT_COALESCED = frozenset(
+    (
+        GameEvents.GOAL.value,
+        GameEvents.MATCH_START.value,
+        GameEvents.MATCH_FINISH.value,
+    )
+)
+# Fields telling apart the state of different robots, teams or the ball
+STATE_FIELDS = ("type", "robot_name", "team_name")
+
+
+def state_key(
+    event_type: Optional[str], get_field: Callable
+) -> Optional[tuple]:
+    """Return the key of the state the event reports, the events with the
+    same key can be coalesced. None if the event is never coalesced."""
+    if event_type is None or event_type in NOT_COALESCED:
+        return None
+    return (event_type,) + tuple(get_field(name) for name in STATE_FIELDS)
+
+
+class AsyncSubscription:
+    """Queue of the events of an asynchronous subscriber, handled by a
+    worker thread."""
+
+    def __init__(
+        self,
+        subscriber: EventHandler,
+        policy: str = BackpressurePolicy.BLOCK.value,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        """
+        Args:
+            subscriber (EventHandler): The subscriber to handle the events
+            policy (str): BackpressurePolicy value
+            queue_size (int): Largest number of the queued events
+        """
+        self.subscriber = subscriber
+        self.policy = policy
+        self.queue_size = queue_size
+        # Number of the events dropped or replaced by the newer ones
+        self.dropped = 0
+
+        # (state key, handle, args, kwargs) of the queued events
+        self._queue: Deque[tuple] = deque()
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"Eventer-{type(subscriber).__name__}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def handle(self, *args, **kwargs):
+        """Queue the event, or handle it right away once closed."""
+        payload = kwargs.get("payload")
+        if not isinstance(payload, dict):
+            payload = {}
+        key = state_key(kwargs.get("type"), payload.get)
+        self._put(key, self.subscriber.handle, args, kwargs)
+
+    def handle_event(self, referee, event: Event):
+        """Queue a copy of the typed event, the event itself gets reused."""
+        key = state_key(
+            event.event_type, lambda name: getattr(event, name, None)
+        )
+        self._put(
+            key, self.subscriber.handle_event, (referee, event.copy()), {}
+        )
+
+    def _put(
+        self,
+        key: Optional[tuple],
+        handle: Callable,
+        args: tuple,
+        kwargs: dict,
+    ):
+        entry = (key, handle, args, kwargs)
+        with self._condition:
+            closed = self._closed
+            if not closed:
+                if not self._coalesce(entry):
+                    self._make_room()
+                    self._queue.append(entry)
+                self._condition.notify_all()
+
+        if closed:
+            handle(*args, **kwargs)
+
+    def _coalesce(self, entry: tuple) -> bool:
+        """Put the entry in the place of the queued event of the same
+        state, if the policy is to coalesce.
+
+        Returns:
+            bool: Whether the entry replaced a queued event
+        """
+        key = entry[0]
+        if self.policy != BackpressurePolicy.COALESCE.value or key is None:
+            return False
+        queue = self._queue
+        for i, pending in enumerate(queue):
+            if pending[0] == key:
+                queue[i] = entry
+                self.dropped += 1
+                return True
+        return False
+
+    def _make_room(self):
+        queue = self._queue
+        if self.policy == BackpressurePolicy.DROP_OLDEST.value:
+            while len(queue) >= self.queue_size:
+                queue.popleft()
+                self.dropped += 1
+
+        while len(queue) >= self.queue_size and self._thread.is_alive():
+            self._condition.wait()
+
+    def drain(self):
+        """Wait until all the queued events are handled."""
+        with self._condition:
+            while (self._queue or self._busy) and self._thread.is_alive():
+                self._condition.wait()
+
+    def close(self):
+        """Handle the queued events and stop the worker thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._queue and not self._closed:
+                    condition.wait()
+                if not self._queue:
+                    condition.notify_all()
+                    return
+                _, handle, args, kwargs = self._queue.popleft()
+                self._busy = True
+                condition.notify_all()
+
+            try:
+                handle(*args, **kwargs)
+            except Exception:
+                logging.exception(f"{self._thread.name} failed")
+            finally:
+                with condition:
+                    self._busy = False
+                    condition.notify_all()
 
 
 class Eventer:
     def __init__(self):
-        self.subscribers = []
+        self.subscribers: List[EventHandler] = []
+        self.async_subscriptions: List[AsyncSubscription] = []
+        self.profiler = NullTickProfiler()
+        # The synchronous subscribers and the subscriptions of the
+        # asynchronous ones, in the order of subscribing
+        self._targets: List[Union[EventHandler, AsyncSubscription]] = []
+        # Event type -> handle_event of the targets interested in it
+        self._index: Dict[str, List[Callable]] = {
+            event.value: [] for event in GameEvents
+        }
+        self.pool = EventPool()
+
+    def subscribe(
+        self,
+        subscriber: EventHandler,
+        delivery: str = EventDelivery.SYNC.value,
+        policy: str = BackpressurePolicy.BLOCK.value,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        """Add the subscriber.
+
+        Args:
+            subscriber (EventHandler): Instance inheriting EventHandler
+            delivery (str): EventDelivery value
+            policy (str): BackpressurePolicy value of the asynchronous
+                subscribers
+            queue_size (int): Largest number of the events queued for the
+                asynchronous subscribers
+        """
+        if delivery not in EventDelivery.all():
+            raise ValueError(f"Unexpected event delivery {delivery}")
+        if policy not in BackpressurePolicy.all():
+            raise ValueError(f"Unexpected backpressure policy {policy}")
+        if queue_size < 1:
+            raise ValueError(f"Unexpected queue size {queue_size}")
+        event_types = self._event_types(subscriber)
 
-    def subscribe(self, subscriber: EventHandler):
         self.subscribers.append(subscriber)
+        if delivery == EventDelivery.SYNC.value:
+            target = subscriber
+        else:
+            target = AsyncSubscription(subscriber, policy, queue_size)
+            self.async_subscriptions.append(target)
+        self._targets.append(target)
+        for event_type in event_types:
+            self._index[event_type].append(target.handle_event)
+
+    def _event_types(self, subscriber: EventHandler) -> List[str]:
+        if subscriber.event_types is None:
+            return list(self._index)
+        for event_type in subscriber.event_types:
+            if event_type not in self._index:
+                raise ValueError(f"Unexpected event type {event_type}")
+        return list(subscriber.event_types)
+
+    def emit(self, referee, cls: Type[Event], **fields):
+        """Send an event of the class, filled in with the fields.
+
+        Args:
+            referee (RCJSoccerReferee): The referee sending the event
+            cls (type): Class of the event, see referee.events
+            **fields: Arguments of the `set` method of the class
+        """
+        event = self.pool.acquire(cls).set(**fields)
+        try:
+            self.dispatch(referee, event)
+        finally:
+            self.pool.release(event)
+
+    def dispatch(self, referee, event: Event):
+        """Hand the event to the subscribers of its type."""
+        self.profiler.dispatch_started()
+        try:
+            for handle_event in self._index[event.event_type]:
+                handle_event(referee, event)
+            if type(event) is MatchFinish:
+                self.close()
+        finally:
+            self.profiler.dispatch_finished()
 
     def event(self, *args, **kwargs):
-        for subscriber in self.subscribers:
-            subscriber.handle(*args, **kwargs)
+        """Send the event to all the subscribers, as it is."""
+        self.profiler.dispatch_started()
+        try:
+            for target in self._targets:
+                target.handle(*args, **kwargs)
+            if kwargs.get("type") == GameEvents.MATCH_FINISH.value:
+                self.close()
+        finally:
+            self.profiler.dispatch_finished()
+
+    def drain(self):
+        """Wait until the asynchronous subscribers handle all the events."""
+        for subscription in self.async_subscriptions:
+            subscription.drain()
+
+    def close(self):
+        """Drain the asynchronous subscribers and stop their threads.
+
+        The events sent later on are handled right away.
+        """
+        for subscription in self.async_subscriptions:
+            subscription.close()
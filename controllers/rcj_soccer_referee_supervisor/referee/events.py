@@ -0,0 +1,234 @@
+"""Typed events of the referee.
+
+There is a class for each of the GameEvents, with the fields of its payload
+as slots. The referee takes the events from a pool and puts them back once
+they are dispatched, so the subscribers must not keep them around (or
+should copy them). `payload` builds the dict the events used to be sent
+as, which is what the reflogs contain.
+"""
+
+from typing import Dict, List, Optional, Type
+
+from referee.enums import GameEvents
+
+
+class Event:
+    __slots__ = ()
+
+    # GameEvents value of the event
+    event_type: str = ""
+
+    def payload(self) -> Optional[dict]:
+        raise NotImplementedError
+
+    def copy(self) -> "Event":
+        """Return a copy of the event outside of the pool."""
+        event = type(self)()
+        for name in self.__slots__:
+            setattr(event, name, getattr(self, name))
+        return event
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.payload()})"
+
+
+class MatchStart(Event):
+    __slots__ = (
+        "score_yellow",
+        "score_blue",
+        "total_match_time",
+        "team_name_yellow",
+        "team_name_blue",
+        "match_id",
+        "halftime",
+        "seed",
+        "rules",
+    )
+    event_type = GameEvents.MATCH_START.value
+
+    def set(
+        self,
+        score_yellow: int,
+        score_blue: int,
+        total_match_time: int,
+        team_name_yellow: str,
+        team_name_blue: str,
+        match_id: int,
+        halftime: int,
+        seed: Optional[int],
+        rules: dict,
+    ) -> "MatchStart":
+        self.score_yellow = score_yellow
+        self.score_blue = score_blue
+        self.total_match_time = total_match_time
+        self.team_name_yellow = team_name_yellow
+        self.team_name_blue = team_name_blue
+        self.match_id = match_id
+        self.halftime = halftime
+        self.seed = seed
+        self.rules = rules
+        return self
+
+    def payload(self) -> Optional[dict]:
+        return {
+            "score_yellow": self.score_yellow,
+            "score_blue": self.score_blue,
+            "total_match_time": self.total_match_time,
+            "team_name_yellow": self.team_name_yellow,
+            "team_name_blue": self.team_name_blue,
+            "match_id": self.match_id,
+            "halftime": self.halftime,
+            "seed": self.seed,
+            # The options of the referee, see RCJSoccerReferee.rules
+            "rules": self.rules,
+        }
+
+
+class MatchFinish(Event):
+    __slots__ = (
+        "total_match_time",
+        "score_yellow",
+        "score_blue",
+        "team_name_yellow",
+        "team_name_blue",
+    )
+    event_type = GameEvents.MATCH_FINISH.value
+
+    def set(
+        self,
+        total_match_time: int,
+        score_yellow: int,
+        score_blue: int,
+        team_name_yellow: str,
+        team_name_blue: str,
+    ) -> "MatchFinish":
+        self.total_match_time = total_match_time
+        self.score_yellow = score_yellow
+        self.score_blue = score_blue
+        self.team_name_yellow = team_name_yellow
+        self.team_name_blue = team_name_blue
+        return self
+
+    def payload(self) -> Optional[dict]:
+        return {
+            "total_match_time": self.total_match_time,
+            "score_yellow": self.score_yellow,
+            "score_blue": self.score_blue,
+            "team_name_yellow": self.team_name_yellow,
+            "team_name_blue": self.team_name_blue,
+        }
+
+
+class LackOfProgress(Event):
+    __slots__ = ("type", "robot_name")
+    event_type = GameEvents.LACK_OF_PROGRESS.value
+
+    def set(
+        self, type: str, robot_name: Optional[str] = None
+    ) -> "LackOfProgress":
+        """
+        Args:
+            type (str): "robot" or "ball"
+            robot_name (str): Name of the robot, None for the ball
+        """
+        self.type = type
+        self.robot_name = robot_name
+        return self
+
+    def payload(self) -> Optional[dict]:
+        if self.robot_name is None:
+            return {"type": self.type}
+        return {"type": self.type, "robot_name": self.robot_name}
+
+
+class InsidePenaltyForTooLong(Event):
+    __slots__ = ("type", "robot_name")
+    event_type = GameEvents.INSIDE_PENALTY_FOR_TOO_LONG.value
+
+    def set(self, type: str, robot_name: str) -> "InsidePenaltyForTooLong":
+        self.type = type
+        self.robot_name = robot_name
+        return self
+
+    def payload(self) -> Optional[dict]:
+        return {"type": self.type, "robot_name": self.robot_name}
+
+
+class Kickoff(Event):
+    __slots__ = ("robot_name", "team_name")
+    event_type = GameEvents.KICKOFF.value
+
+    def set(self, robot_name: str, team_name: str) -> "Kickoff":
+        self.robot_name = robot_name
+        self.team_name = team_name
+        return self
+
+    def payload(self) -> Optional[dict]:
+        return {"robot_name": self.robot_name, "team_name": self.team_name}
+
+
+class Goal(Event):
+    __slots__ = ("team_name", "score_yellow", "score_blue")
+    event_type = GameEvents.GOAL.value
+
+    def set(
+        self, team_name: str, score_yellow: int, score_blue: int
+    ) -> "Goal":
+        self.team_name = team_name
+        self.score_yellow = score_yellow
+        self.score_blue = score_blue
+        return self
+
+    def payload(self) -> Optional[dict]:
+        return {
+            "team_name": self.team_name,
+            "score_yellow": self.score_yellow,
+            "score_blue": self.score_blue,
+        }
+
+
+class Stats(Event):
+    __slots__ = ("stats",)
+    event_type = GameEvents.STATS.value
+
+    def set(self, stats: dict) -> "Stats":
+        """
+        Args:
+            stats (dict): The stats of TickProfiler, logged as they are
+        """
+        self.stats = stats
+        return self
+
+    def payload(self) -> Optional[dict]:
+        return self.stats
+
+
+# GameEvents value -> class of the events
+EVENT_CLASSES: Dict[str, Type[Event]] = {
+    cls.event_type: cls
+    for cls in (
+        MatchStart,
+        MatchFinish,
+        LackOfProgress,
+        InsidePenaltyForTooLong,
+        Kickoff,
+        Goal,
+        Stats,
+    )
+}
+
+
+class EventPool:
+    """Free events of each class, reused instead of allocating new ones."""
+
+    def __init__(self):
+        self._free: Dict[Type[Event], List[Event]] = {
+            cls: [] for cls in EVENT_CLASSES.values()
+        }
+
+    def acquire(self, cls: Type[Event]) -> Event:
+        free = self._free[cls]
+        return free.pop() if free else cls()
+
+    def release(self, event: Event):
+        self._free[type(event)].append(event)
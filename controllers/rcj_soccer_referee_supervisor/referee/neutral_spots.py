@@ -0,0 +1,170 @@
+import math
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from referee.consts import (
+    DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT,
+    LACK_OF_PROGRESS_NUMBER_OF_NEUTRAL_SPOTS,
+    N_OBJECTS,
+    NEUTRAL_SPOTS,
+)
+
+# Bit i of NeutralSpotIndex.occupied_spots belongs to NEUTRAL_SPOT_NAMES[i]
+NEUTRAL_SPOT_NAMES = list(NEUTRAL_SPOTS)
+N_NEUTRAL_SPOTS = len(NEUTRAL_SPOT_NAMES)
+SPOT_BITS = [1 << spot_index for spot_index in range(N_NEUTRAL_SPOTS)]
+
+
+class NeutralSpotIndex:
+    """Distances between the objects and the neutral spots.
+
+    update() computes the object-by-spot matrix of squared distances and
+    the bitmask of spots blocked by any of the objects in one go. The spots
+    sorted by distance are then computed at most once per object and kept
+    until the next update.
+    """
+
+    def __init__(self):
+        self.spots = [NEUTRAL_SPOTS[name] for name in NEUTRAL_SPOT_NAMES]
+        self.radius_sq = DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT**2
+
+        # Squared distance of object i from spot j at i * N_NEUTRAL_SPOTS + j
+        self.distances_sq = array("d", [0.0]) * (N_OBJECTS * N_NEUTRAL_SPOTS)
+        # Bitmask of the spots blocked by each object, indexed by object ID
+        self.object_spots = array("B", bytes(N_OBJECTS))
+        self.occupied_spots = 0
+
+        # Object ID -> spot indices sorted by ascending distance
+        self._nearest: List[Optional[List[int]]] = [None] * N_OBJECTS
+        # Object ID -> spot indices sorted by descending distance
+        self._furthest: List[Optional[List[int]]] = [None] * N_OBJECTS
+
+    def update(self, translations: Sequence[float]):
+        """Recompute the distances for the new positions of the objects.
+
+        Args:
+            translations (Sequence[float]): Flat N_OBJECTS x 3 block of
+                positions, indexed by object ID
+        """
+        distances_sq = self.distances_sq
+        radius_sq = self.radius_sq
+        occupied_spots = 0
+
+        index = 0
+        for object_id in range(N_OBJECTS):
+            offset = object_id * 3
+            x, y = translations[offset], translations[offset + 1]
+            object_spots = 0
+            for spot_bit, (ns_x, ns_y) in zip(SPOT_BITS, self.spots):
+                distance_sq = (x - ns_x) ** 2 + (y - ns_y) ** 2
+                distances_sq[index] = distance_sq
+                if distance_sq < radius_sq:
+                    object_spots |= spot_bit
+                index += 1
+
+            self.object_spots[object_id] = object_spots
+            occupied_spots |= object_spots
+
+        self.occupied_spots = occupied_spots
+        for object_id in range(N_OBJECTS):
+            self._nearest[object_id] = None
+            self._furthest[object_id] = None
+
+    def is_spot_occupied(self, spot_index: int) -> bool:
+        """Return whether any of the objects blocks the neutral spot.
+
+        Args:
+            spot_index (int): Index into NEUTRAL_SPOT_NAMES
+        """
+        return bool(self.occupied_spots & SPOT_BITS[spot_index])
+
+    def _sorted_spots(self, object_id: int, furthest: bool) -> List[int]:
+        cache = self._furthest if furthest else self._nearest
+        spots = cache[object_id]
+        if spots is None:
+            start = object_id * N_NEUTRAL_SPOTS
+            end = start + N_NEUTRAL_SPOTS
+            distances_sq = self.distances_sq[start:end]
+            spots = sorted(
+                range(N_NEUTRAL_SPOTS),
+                key=distances_sq.__getitem__,
+                reverse=furthest,
+            )
+            cache[object_id] = spots
+        return spots
+
+    def get_unoccupied_sorted(
+        self, object_id: int, furthest: bool = False
+    ) -> List[Tuple[str, float]]:
+        """Return the unoccupied spots sorted by their distance from the
+        object.
+
+        Args:
+            object_id (int): ID of the object
+            furthest (bool): Sort by descending distance if True, by
+                ascending distance otherwise
+
+        Returns:
+            list: sorted pairs of neutral spot names and their distances
+        """
+        start = object_id * N_NEUTRAL_SPOTS
+        return [
+            (
+                NEUTRAL_SPOT_NAMES[spot],
+                math.sqrt(self.distances_sq[start + spot]),
+            )
+            for spot in self._sorted_spots(object_id, furthest)
+            if not self.occupied_spots & SPOT_BITS[spot]
+        ]
+
+    def allocate(
+        self,
+        requests: Sequence[Tuple[int, bool]],
+        choose: Callable[[List[int]], int],
+        n_nearest: int = LACK_OF_PROGRESS_NUMBER_OF_NEUTRAL_SPOTS,
+    ) -> List[Optional[str]]:
+        """Find the neutral spots for all the objects to be moved at once,
+        so that no two of them end up on the same spot.
+
+        The requests are served in order. An object is put on the furthest
+        free spot or on a spot chosen from its n_nearest nearest free spots.
+        A spot is free unless it is blocked by an object staying where it is
+        (including the objects waiting for their own spot) or it has already
+        been given to another object.
+
+        Args:
+            requests (list): Pairs of object ID and whether the object should
+                be put on the furthest spot rather than a near one
+            choose (Callable): Picks one of the nearest spot indices, usually
+                random.choice
+            n_nearest (int): How many of the nearest spots to choose from
+
+        Returns:
+            list: Name of the spot for each of the requests, None if there
+                was no free spot for the object
+        """
+        object_spots = list(self.object_spots)
+        assigned_spots = 0
+        allocated: List[Optional[str]] = []
+
+        for object_id, furthest in requests:
+            blocked = assigned_spots
+            for spots in object_spots:
+                blocked |= spots
+
+            free = [
+                spot
+                for spot in self._sorted_spots(object_id, furthest)
+                if not blocked & SPOT_BITS[spot]
+            ]
+            if not free:
+                allocated.append(None)
+                continue
+
+            spot = free[0] if furthest else choose(free[:n_nearest])
+            allocated.append(NEUTRAL_SPOT_NAMES[spot])
+            assigned_spots |= SPOT_BITS[spot]
+            # The object leaves the spots it has been blocking so far
+            object_spots[object_id] = 0
+
+        return allocated
@@ -46,10 +46,22 @@ class PenaltyAreaChecker:
             position (list): Current position of the object
             time (int): Current game time
         """
-        self.time = time
         x, y = position[0], position[1]
+        in_blue_penalty = self.is_in_blue_penalty(x, y)
+        in_penalty = in_blue_penalty or self.is_in_yellow_penalty(x, y)
+        self.track_zone(in_penalty, time)
+
+    def track_zone(self, in_penalty: bool, time: int):
+        """Make PenaltyAreaChecker react to the object being (or not being)
+        inside one of the penalty areas.
+
+        Args:
+            in_penalty (bool): Whether the object is inside a penalty area
+            time (int): Current game time
+        """
+        self.time = time
 
-        if self.is_in_blue_penalty(x, y) or self.is_in_yellow_penalty(x, y):
+        if in_penalty:
             # the robot enters the penalty area for the first time
             if not self.has_entered:
                 self.time_entered_penalty = self.time
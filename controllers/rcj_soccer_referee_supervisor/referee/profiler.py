@@ -0,0 +1,193 @@
+"""Timing of the event loop of the referee.
+
+Each iteration of the loop consists of the Webots step (the physics and
+the robot controllers) followed by the tick of the referee. The profiler
+keeps a histogram of the Webots steps, of each phase of the tick and of the
+event dispatch, so that a slow match can be told apart as slow physics,
+slow referee logic or slow logging.
+
+The referee uses NullTickProfiler unless a TickProfiler is passed to it,
+so that the timing costs nothing when it is not wanted.
+"""
+
+import time
+from array import array
+from typing import Dict, Optional
+
+from referee.consts import TIME_STEP
+
+# Number of the linear sub-buckets of each power of two, as bits
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Enough for the times up to about 2^40 microseconds (12 days)
+N_BUCKETS = (40 - SUB_BUCKET_BITS + 2) * SUB_BUCKETS
+
+
+class LogLinearHistogram:
+    """Histogram of the times in microseconds.
+
+    The buckets are exact below 16 microseconds and split each power of two
+    into 16 linear sub-buckets above, i.e. they are within about 6 %.
+    """
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * N_BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 1 - SUB_BUCKET_BITS
+        return min(
+            (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS,
+            N_BUCKETS - 1,
+        )
+
+    @staticmethod
+    def bucket_range(bucket: int) -> tuple:
+        """Return the lowest and the highest value of the bucket."""
+        if bucket < SUB_BUCKETS:
+            return bucket, bucket
+        shift = bucket // SUB_BUCKETS - 1
+        low = (bucket % SUB_BUCKETS + SUB_BUCKETS) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value: int):
+        self.counts[self.bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> int:
+        """Return the value below which the given percentage of the values
+        fall, to the precision of the buckets."""
+        if not self.count:
+            return 0
+        rank = max(1, round(self.count * percentile / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = self.bucket_range(bucket)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Return the count, the total, p50, p99 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1000,
+            "p50_ms": self.percentile(50) / 1000,
+            "p99_ms": self.percentile(99) / 1000,
+            "max_ms": self.max / 1000,
+        }
+
+
+class NullTickProfiler:
+    """Profiler doing nothing, used by default."""
+
+    def step_started(self):
+        pass
+
+    def step_finished(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def dispatch_started(self):
+        pass
+
+    def dispatch_finished(self):
+        pass
+
+    def stats(self) -> Optional[dict]:
+        return None
+
+
+class TickProfiler(NullTickProfiler):
+    """Timing of the Webots steps, the phases of the ticks and the event
+    dispatch.
+
+    A phase is the time since the end of the previous phase, or since the
+    end of the Webots step, marked by calling `lap` with its name. The time
+    spent by dispatching the events is left out of the phases.
+    """
+
+    def __init__(self, time_step: int = TIME_STEP):
+        """
+        Args:
+            time_step (int): Length of a step in milliseconds
+        """
+        self.time_step = time_step
+        self.steps = LogLinearHistogram()
+        self.dispatch = LogLinearHistogram()
+        self.phases: Dict[str, LogLinearHistogram] = {}
+
+        self._started: Optional[int] = None
+        self._step_start = 0
+        self._lap_start = 0
+        self._dispatch_start = 0
+
+    def step_started(self):
+        now = time.perf_counter_ns()
+        if self._started is None:
+            self._started = now
+        self._step_start = now
+
+    def step_finished(self):
+        now = time.perf_counter_ns()
+        self.steps.record((now - self._step_start) // 1000)
+        self._lap_start = now
+
+    def lap(self, phase: str):
+        """Record the time since the previous lap as the given phase."""
+        if self._started is None:
+            return
+        now = time.perf_counter_ns()
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LogLinearHistogram()
+        histogram.record((now - self._lap_start) // 1000)
+        self._lap_start = now
+
+    def dispatch_started(self):
+        self._dispatch_start = time.perf_counter_ns()
+
+    def dispatch_finished(self):
+        elapsed = time.perf_counter_ns() - self._dispatch_start
+        self.dispatch.record(elapsed // 1000)
+        # Leave the dispatch out of the current phase
+        self._lap_start += elapsed
+
+    def stats(self) -> Optional[dict]:
+        """Return the aggregated timing.
+
+        The histograms are summarized in milliseconds, the wall time and the
+        simulated time are in seconds. The real-time factor is the simulated
+        time divided by the wall time since the first step, i.e. how many
+        times faster than real time the match is played.
+        """
+        if self._started is None:
+            return None
+
+        wall_time = (time.perf_counter_ns() - self._started) / 1e9
+        simulated_time = self.steps.count * self.time_step / 1000
+        return {
+            "ticks": self.steps.count,
+            "wall_time": wall_time,
+            "simulated_time": simulated_time,
+            "real_time_factor": (
+                simulated_time / wall_time if wall_time else 0.0
+            ),
+            "step": self.steps.summary(),
+            "dispatch": self.dispatch.summary(),
+            "phases": {
+                phase: histogram.summary()
+                for phase, histogram in self.phases.items()
+            },
+        }
@@ -1,5 +1,6 @@
 import math
-from typing import List
+from array import array
+from typing import Dict, List, Tuple
 
 
 class ProgressChecker:
@@ -27,7 +28,7 @@ class ProgressChecker:
         # remember the previous position), store the current position as the
         # previous one
         if not self.prev_position:
-            self.prev_position = position
+            self.prev_position = list(position)
             return
 
         prev_position = self.prev_position
@@ -41,7 +42,8 @@ class ProgressChecker:
         self.samples[self.iterator % self.steps] = delta
         self.iterator += 1
 
-        self.prev_position = position
+        # Copy, the position may be a view the supervisor updates in place
+        self.prev_position = list(position)
 
     def is_progress(self) -> bool:
         """Detect whether the object which is being tracked has made some
@@ -60,3 +62,134 @@ class ProgressChecker:
             return True
 
         return s >= self.threshold
+
+
+class ProgressCheckerBank:
+    """Lack of progress tracking for several objects at once.
+
+    The samples of all the objects live in a single ring buffer and each
+    object keeps a running sum of its window, so that both tracking and
+    checking the progress take constant time. The semantics are the same as
+    the ones of ProgressChecker, including the "benefit of doubt" until the
+    window has been filled.
+
+    Indexing the bank by object name returns an object with the
+    ProgressChecker interface (track, is_progress and reset).
+    """
+
+    def __init__(self, checks: Dict[str, Tuple[int, float]]):
+        """
+        Args:
+            checks (dict): Object name -> (steps, threshold). The objects get
+                IDs in the order of the dictionary.
+        """
+        self.names = list(checks)
+        self.steps = [steps for steps, _ in checks.values()]
+        self.thresholds = [threshold for _, threshold in checks.values()]
+
+        self.offsets = []
+        offset = 0
+        for steps in self.steps:
+            self.offsets.append(offset)
+            offset += steps
+        self.samples = array("d", [0.0]) * offset
+
+        n_objects = len(self.names)
+        self.iterators = [0] * n_objects
+        self.sums = [0.0] * n_objects
+        self.prev_x = [0.0] * n_objects
+        self.prev_y = [0.0] * n_objects
+        self.has_prev = [False] * n_objects
+
+        self.checkers = {
+            name: _BankedProgressChecker(self, object_id)
+            for object_id, name in enumerate(self.names)
+        }
+
+    def __getitem__(self, name: str) -> "_BankedProgressChecker":
+        return self.checkers[name]
+
+    def reset(self, object_id: int):
+        """Forget the samples of the object.
+
+        The samples are not cleared: until the window fills up again, the
+        stale ones are never read.
+        """
+        self.iterators[object_id] = 0
+        self.sums[object_id] = 0.0
+        self.has_prev[object_id] = False
+
+    def track(self, object_id: int, x: float, y: float):
+        """Make the bank react to a new position of the object.
+
+        Args:
+            object_id (int): ID of the object
+            x (float): Current x position of the object
+            y (float): Current y position of the object
+        """
+        if not self.has_prev[object_id]:
+            self.prev_x[object_id] = x
+            self.prev_y[object_id] = y
+            self.has_prev[object_id] = True
+            return
+
+        delta = math.sqrt(
+            (self.prev_x[object_id] - x) ** 2
+            + (self.prev_y[object_id] - y) ** 2
+        )
+        self.prev_x[object_id] = x
+        self.prev_y[object_id] = y
+
+        steps = self.steps[object_id]
+        iterator = self.iterators[object_id]
+        slot = self.offsets[object_id] + iterator % steps
+
+        window_sum = self.sums[object_id] + delta
+        # Until the window is full, the slots hold samples from before the
+        # last reset
+        if iterator >= steps:
+            window_sum -= self.samples[slot]
+        self.samples[slot] = delta
+
+        iterator += 1
+        self.iterators[object_id] = iterator
+
+        # Recompute the sum once per window so that the rounding errors do
+        # not accumulate
+        if iterator % steps == 0:
+            start = self.offsets[object_id]
+            end = start + steps
+            window_sum = sum(self.samples[start:end])
+        self.sums[object_id] = window_sum
+
+    def is_progress(self, object_id: int) -> bool:
+        """Detect whether the object has made some "progress", see
+        ProgressChecker.is_progress.
+
+        Args:
+            object_id (int): ID of the object
+
+        Returns:
+            bool: Whether the object has made some "progress"
+        """
+        if self.iterators[object_id] < self.steps[object_id]:
+            return True
+
+        return self.sums[object_id] >= self.thresholds[object_id]
+
+
+class _BankedProgressChecker:
+    """ProgressChecker interface to a single object of ProgressCheckerBank"""
+
+    def __init__(self, bank: ProgressCheckerBank, object_id: int):
+        self.bank = bank
+        self.object_id = object_id
+
+    def reset(self):
+        self.bank.reset(self.object_id)
+
+    def track(self, position: List[float]):
+        self.bank.track(self.object_id, position[0], position[1])
+
+    def is_progress(self) -> bool:
+        return self.bank.is_progress(self.object_id)
@@ -1,30 +1,44 @@
-import json
 import random
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from controller import Supervisor
 
 from referee.consts import (
+    BALL_ID,
     BALL_INITIAL_TRANSLATION,
+    BALL_NAME,
+    INITIAL_POSITION_NOISE,
     KICKOFF_TRANSLATION,
-    LACK_OF_PROGRESS_NUMBER_OF_NEUTRAL_SPOTS,
     MAX_EVENT_MESSAGES_IN_QUEUE,
+    OBJECT_IDS,
+    POST_GOAL_WAIT_TIME,
     ROBOT_INITIAL_ROTATION,
     ROBOT_INITIAL_TRANSLATION,
     ROBOT_NAMES,
+    SUPERVISOR_PACKET,
+    SUPERVISOR_PACKET_HEARTBEAT,
+    SUPERVISOR_PACKET_VERSION,
     TIME_STEP,
+    WAITING_FOR_KICKOFF_FLAG,
 )
-from referee.enums import GameEvents, NeutralSpotDistanceType, Team
+from referee.enums import NeutralSpotDistanceType, SupervisorPacketMode, Team
 from referee.event_handlers import EventHandler
 from referee.eventer import Eventer
-from referee.penalty_area_checker import PenaltyAreaChecker
-from referee.progress_checker import ProgressChecker
-from referee.utils import (
-    is_in_blue_goal,
-    is_in_yellow_goal,
-    is_outside,
-    time_to_string,
+from referee.events import (
+    Goal,
+    InsidePenaltyForTooLong,
+    Kickoff,
+    LackOfProgress,
+    MatchFinish,
+    MatchStart,
+    Stats,
 )
+from referee.penalty_area_checker import PenaltyAreaChecker
+from referee.profiler import NullTickProfiler
+from referee.progress_checker import ProgressCheckerBank
+from referee.snapshot import TickSubscriber, WorldSnapshot
+from referee.utils import time_to_string
+from referee.zones import BLUE_GOAL, IN_PENALTY, OUTSIDE, YELLOW_GOAL
 
 
 class RCJSoccerReferee:
@@ -44,10 +58,22 @@ class RCJSoccerReferee:
         initial_score_yellow: int,
         penalty_area_allowed_time: int,
         penalty_area_reset_after: int,
-        post_goal_wait_time: int = 3,
-        initial_position_noise: float = 0.15,
+        post_goal_wait_time: int = POST_GOAL_WAIT_TIME,
+        initial_position_noise: float = INITIAL_POSITION_NOISE,
+        seed: Optional[int] = None,
+        supervisor_packets: str = SupervisorPacketMode.EVERY_TICK.value,
+        profiler: Optional[NullTickProfiler] = None,
     ):
         self.sv = supervisor
+
+        # All the random decisions of the referee (initial position noise,
+        # kickoff team, neutral spots) come from this generator, so that a
+        # match can be replayed with the seed logged at its start.
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.random = random.Random(seed)
+
         self.match_time = match_time
         self.time = match_time
         self.match_id = match_id
@@ -58,16 +84,40 @@ class RCJSoccerReferee:
         self.score_yellow = initial_score_yellow
         self.post_goal_wait_time = post_goal_wait_time
         self.initial_position_noise = initial_position_noise
+        # Logged at the start of the match, so that it can be replayed with
+        # the same rules
+        self.rules = {
+            "progress_check_steps": progress_check_steps,
+            "progress_check_threshold": progress_check_threshold,
+            "ball_progress_check_steps": ball_progress_check_steps,
+            "ball_progress_check_threshold": ball_progress_check_threshold,
+            "penalty_area_allowed_time": penalty_area_allowed_time,
+            "penalty_area_reset_after": penalty_area_reset_after,
+            "post_goal_wait_time": post_goal_wait_time,
+            "initial_position_noise": initial_position_noise,
+        }
 
         self.ball_reset_timer = 0
         self.ball_stop = 2
 
+        if supervisor_packets not in SupervisorPacketMode.all():
+            raise ValueError(
+                f"Unexpected supervisor packet mode {supervisor_packets}"
+            )
+        self.supervisor_packets = supervisor_packets
+        # Sequence number of the next packet sent to the robots
+        self.packet_sequence = 0
+        # Flags of the last packet sent and the ticks since then
+        self._sent_flags: Optional[int] = None
+        self._ticks_since_sent = 0
+
         self.robot_in_penalty_counter = {}
-        self.progress_check = {}
         self.penalty_area_check = {}
+        progress_checks = {}
         for robot in ROBOT_NAMES:
-            self.progress_check[robot] = ProgressChecker(
-                progress_check_steps, progress_check_threshold
+            progress_checks[robot] = (
+                progress_check_steps,
+                progress_check_threshold,
             )
 
             self.penalty_area_check[robot] = PenaltyAreaChecker(
@@ -77,32 +127,78 @@ class RCJSoccerReferee:
 
             self.robot_in_penalty_counter[robot] = 0
 
-        self.progress_check["ball"] = ProgressChecker(
-            ball_progress_check_steps, ball_progress_check_threshold
+        progress_checks[BALL_NAME] = (
+            ball_progress_check_steps,
+            ball_progress_check_threshold,
         )
+        self.progress_check = ProgressCheckerBank(progress_checks)
+
+        # Object name -> NeutralSpotDistanceType value of the objects to be
+        # moved to neutral spots at the end of the tick
+        self.neutral_spot_requests: Dict[str, int] = {}
+
+        # Timing of the ticks, see referee.profiler. Shared with the
+        # supervisor and the eventer, which time the steps and the events.
+        self.profiler = profiler or NullTickProfiler()
+        self.sv.profiler = self.profiler
 
         self.eventer = Eventer()
+        self.eventer.profiler = self.profiler
+        # State of the match handed to the tick subscribers on every tick
+        self.snapshot = WorldSnapshot(self.sv)
+        self.tick_subscribers: List[TickSubscriber] = []
         # Event message queue to be drawn from
         # List of Tuples of int (time) and string (message)
         self.event_messages_to_draw: List[Tuple[int, str]] = []
+        # Whether the queue changed since the messages were last drawn
+        self.event_messages_changed = False
 
         self.reset_positions()
         self.sv.update_positions()
         self.sv.draw_team_names(self.team_name_blue, self.team_name_yellow)
         self.sv.draw_scores(self.score_blue, self.score_yellow)
 
-    def _pack_data(self) -> str:
-        """Pack data into json string.
+    def _packet_flags(self) -> int:
+        flags = 0
+        # Add Notification if the goal is scored and we are
+        # waiting for kickoff.
+        if self.ball_reset_timer > 0:
+            flags |= WAITING_FOR_KICKOFF_FLAG
+        return flags
+
+    def _pack_data(self) -> bytes:
+        """Pack data into the binary packet for the robots.
 
         Returns:
-            str: json data encoded into string.
+            bytes: version, flags and sequence number of the packet, see
+                SUPERVISOR_PACKET
         """
-        # Add Notification if the goal is scored and we are
-        # waiting for kickoff. The value is True or False
-        waiting_for_kickoff = self.ball_reset_timer > 0
+        return SUPERVISOR_PACKET.pack(
+            SUPERVISOR_PACKET_VERSION,
+            self._packet_flags(),
+            self.packet_sequence,
+        )
+
+    def emit_data(self):
+        """Send the state to the robots.
+
+        Unless the packets are sent on every tick, the packet is only sent
+        when the state has changed or it has not been sent for
+        SUPERVISOR_PACKET_HEARTBEAT ticks.
+        """
+        flags = self._packet_flags()
+        if (
+            self.supervisor_packets == SupervisorPacketMode.CHANGES.value
+            and flags == self._sent_flags
+            and self._ticks_since_sent < SUPERVISOR_PACKET_HEARTBEAT
+        ):
+            self._ticks_since_sent += 1
+            return
 
-        data = {"waiting_for_kickoff": waiting_for_kickoff}
-        return json.dumps(data)
+        self.sv.emit_data(self._pack_data())
+        self.packet_sequence = (self.packet_sequence + 1) & 0xFFFFFFFF
+        self._sent_flags = flags
+        self._ticks_since_sent = 1
 
     def _add_initial_position_noise(
         self, translation: List[float]
@@ -117,18 +213,46 @@ class RCJSoccerReferee:
         """
         level = self.initial_position_noise
         return [
-            translation[0] + (random.random() - 0.5) * level,
-            translation[1] + (random.random() - 0.5) * level,
+            translation[0] + (self.random.random() - 0.5) * level,
+            translation[1] + (self.random.random() - 0.5) * level,
             translation[2],
         ]
 
-    def add_event_subscriber(self, subscriber: EventHandler):
+    def add_event_subscriber(self, subscriber: EventHandler, **kwargs):
         """Add new event subscriber.
 
         Args:
             subscriber (EventHandler): Instance inheriting EventHandler
+            **kwargs: The delivery, the backpressure policy and the queue
+                size of the subscriber, see Eventer.subscribe
         """
-        self.eventer.subscribe(subscriber)
+        self.eventer.subscribe(subscriber, **kwargs)
+
+    def add_tick_subscriber(self, subscriber: TickSubscriber):
+        """Add new tick subscriber, handed the snapshot of the match on
+        every tick right after the poses are read.
+
+        Args:
+            subscriber (TickSubscriber): Instance inheriting TickSubscriber
+        """
+        self.tick_subscribers.append(subscriber)
+
+    def remove_tick_subscriber(self, subscriber: TickSubscriber):
+        """Remove the tick subscriber, if it has been added."""
+        if subscriber in self.tick_subscribers:
+            self.tick_subscribers.remove(subscriber)
+
+    def publish_snapshot(self):
+        """Update the snapshot and hand it to the tick subscribers."""
+        snapshot = self.snapshot
+        snapshot.update(
+            self.time,
+            self.score_blue,
+            self.score_yellow,
+            self.ball_reset_timer > 0,
+        )
+        for subscriber in self.tick_subscribers:
+            subscriber.handle_tick(snapshot)
 
     def add_event_message_to_queue(self, message: str):
         """Add new message to the message queue.
@@ -140,9 +264,14 @@ class RCJSoccerReferee:
             self.event_messages_to_draw.pop(0)
 
         self.event_messages_to_draw.append((self.time, message))
+        self.event_messages_changed = True
 
     def process_and_draw_event_messages(self):
         """Process and draw event messages from the queue"""
+        if not self.event_messages_changed:
+            return
+        self.event_messages_changed = False
+
         messages = []
         for time, msg in self.event_messages_to_draw:
             messages.append(f"{time_to_string(time)} - {msg}")
@@ -213,32 +342,73 @@ class RCJSoccerReferee:
 
         return robot
 
+    def request_neutral_spot(self, object_name: str, distance_type: int):
+        """Ask for the object to be moved to a neutral spot.
+
+        The objects are moved all at once by move_objects_to_neutral_spots,
+        once all the rules have been checked.
+
+        Args:
+            object_name (str): Either "ball" or the robot's name
+            distance_type (int): NeutralSpotDistanceType value. The nearest
+                spots are used for lack of progress, the furthest one for
+                staying in the penalty area for too long.
+        """
+        self.neutral_spot_requests.setdefault(object_name, distance_type)
+
+    def move_objects_to_neutral_spots(self):
+        """Move all the objects requested this tick to neutral spots, making
+        sure no two of them end up on the same spot."""
+        requests = self.neutral_spot_requests
+        if not requests:
+            return
+
+        furthest = NeutralSpotDistanceType.FURTHEST.value
+        spots = self.sv.get_neutral_spot_index().allocate(
+            [
+                (OBJECT_IDS[name], distance_type == furthest)
+                for name, distance_type in requests.items()
+            ],
+            choose=self.random.choice,
+        )
+
+        for (name, distance_type), spot in zip(requests.items(), spots):
+            if spot is not None:
+                self.sv.move_object_to_neutral_spot(name, spot)
+                if name == BALL_NAME:
+                    self.ball_stop = 2
+            elif distance_type == furthest:
+                # Keep the penalty area violation until there is a free spot
+                continue
+
+            self.reset_checkers(name)
+
+        requests.clear()
+
     def check_robots_in_penalty_area(self):
         """
         Check whether robots are violating rule not to stay in
         penalty area for longer period of time
         """
+        zones = self.sv.get_zone_masks()
         for robot in ROBOT_NAMES:
-            pos = self.sv.get_robot_translation(robot)
-            self.penalty_area_check[robot].track(pos, self.time)
+            # The robot is about to be moved and its checkers reset
+            if robot in self.neutral_spot_requests:
+                continue
+
+            in_penalty = zones[OBJECT_IDS[robot]] & IN_PENALTY
+            self.penalty_area_check[robot].track_zone(in_penalty, self.time)
 
             if self.penalty_area_check[robot].is_violating():
-                self.eventer.event(
-                    referee=self,
-                    type=GameEvents.INSIDE_PENALTY_FOR_TOO_LONG.value,
-                    payload={
-                        "type": "robot",
-                        "robot_name": robot,
-                    },
+                self.eventer.emit(
+                    self,
+                    InsidePenaltyForTooLong,
+                    type="robot",
+                    robot_name=robot,
                 )
-                furthest_spots = self.sv.get_unoccupied_neutral_spots_sorted(
-                    NeutralSpotDistanceType.FURTHEST.value,
-                    robot,
+                self.request_neutral_spot(
+                    robot, NeutralSpotDistanceType.FURTHEST.value
                 )
-                if furthest_spots:
-                    neutral_spot = furthest_spots[0][0]
-                    self.sv.move_object_to_neutral_spot(robot, neutral_spot)
-                    self.reset_checkers(robot)
 
     def check_progress(self):
         """
@@ -246,83 +416,49 @@ class RCJSoccerReferee:
         in their respective time intervals. If they did not, call "Lack of
         Progress".
         """
+        zones = self.sv.get_zone_masks()
         for robot in ROBOT_NAMES:
             pos = self.sv.get_robot_translation(robot)
             self.progress_check[robot].track(pos)
 
-            x, y = pos[0], pos[1]
             if (
-                is_outside(x, y)
+                zones[OBJECT_IDS[robot]] & OUTSIDE
                 or not self.progress_check[robot].is_progress()
             ):
-                self.eventer.event(
-                    referee=self,
-                    type=GameEvents.LACK_OF_PROGRESS.value,
-                    payload={
-                        "type": "robot",
-                        "robot_name": robot,
-                    },
+                self.eventer.emit(
+                    self, LackOfProgress, type="robot", robot_name=robot
                 )
-                nearest_spots = self.sv.get_unoccupied_neutral_spots_sorted(
-                    NeutralSpotDistanceType.NEAREST.value,
-                    robot,
+                self.request_neutral_spot(
+                    robot, NeutralSpotDistanceType.NEAREST.value
                 )
 
-                if nearest_spots:
-                    neutral_spot = random.choice(
-                        nearest_spots[
-                            :LACK_OF_PROGRESS_NUMBER_OF_NEUTRAL_SPOTS
-                        ],
-                    )
-                    self.sv.move_object_to_neutral_spot(robot, neutral_spot[0])
-
-                self.reset_checkers(robot)
-
         bpos = self.sv.get_ball_translation()
         self.progress_check["ball"].track(bpos)
-        bx, by = bpos[0], bpos[1]
 
-        if is_outside(bx, by) or not self.progress_check["ball"].is_progress():
-            self.eventer.event(
-                referee=self,
-                type=GameEvents.LACK_OF_PROGRESS.value,
-                payload={"type": "ball"},
-            )
-            nearest_spots = self.sv.get_unoccupied_neutral_spots_sorted(
-                NeutralSpotDistanceType.NEAREST.value,
-                "ball",
+        ball_outside = zones[BALL_ID] & OUTSIDE
+        if ball_outside or not self.progress_check["ball"].is_progress():
+            self.eventer.emit(self, LackOfProgress, type="ball")
+            self.request_neutral_spot(
+                "ball", NeutralSpotDistanceType.NEAREST.value
             )
 
-            if nearest_spots:
-                neutral_spot = random.choice(
-                    nearest_spots[
-                        :LACK_OF_PROGRESS_NUMBER_OF_NEUTRAL_SPOTS
-                    ],  # noqa
-                )
-
-                self.sv.move_object_to_neutral_spot("ball", neutral_spot[0])
-                self.ball_stop = 2
-
-            self.reset_checkers("ball")
-
     def check_goal(self):
         """Check if goal is scored"""
 
         team_goal = None
         team_kickoff = None
 
-        ball_translation = self.sv.get_ball_translation()
-        ball_x, ball_y = ball_translation[0], ball_translation[1]
+        ball_zones = self.sv.get_zone_masks()[BALL_ID]
 
         # ball in the blue goal
-        if is_in_blue_goal(ball_x, ball_y):
+        if ball_zones & BLUE_GOAL:
             self.score_yellow += 1
 
             team_goal = self.team_name_yellow
             team_kickoff = Team.BLUE.value
 
         # ball in the yellow goal
-        elif is_in_yellow_goal(ball_x, ball_y):
+        elif ball_zones & YELLOW_GOAL:
             self.score_blue += 1
 
             team_goal = self.team_name_blue
@@ -334,14 +470,12 @@ class RCJSoccerReferee:
             self.sv.draw_scores(self.score_blue, self.score_yellow)
             self.ball_reset_timer = self.post_goal_wait_time
 
-            self.eventer.event(
-                referee=self,
-                type=GameEvents.GOAL.value,
-                payload={
-                    "team_name": team_goal,
-                    "score_yellow": self.score_yellow,
-                    "score_blue": self.score_blue,
-                },
+            self.eventer.emit(
+                self,
+                Goal,
+                team_name=team_goal,
+                score_yellow=self.score_yellow,
+                score_blue=self.score_blue,
             )
 
             # Let the team that did not score the goal have a kickoff.
@@ -358,70 +492,74 @@ class RCJSoccerReferee:
         if team not in (Team.BLUE.value, Team.YELLOW.value, None):
             raise ValueError(f"Unexpected team name {team}")
 
-        seed = random.random()
+        seed = self.random.random()
         if not team:
             team = Team.BLUE.value if seed > 0.5 else Team.YELLOW.value
 
         robot_name = self.reset_team_for_kickoff(team)
 
-        self.eventer.event(
-            referee=self,
-            type=GameEvents.KICKOFF.value,
-            payload={
-                "robot_name": robot_name,
-                "team_name": team,
-            },
-        )
+        self.eventer.emit(self, Kickoff, robot_name=robot_name, team_name=team)
 
     def tick(self) -> bool:
-        self.sv.check_reset_physics_counters()
-
         # On the very first tick, note that the match has started
         if self.time == self.match_time:
-            self.eventer.event(
-                referee=self,
-                type=GameEvents.MATCH_START.value,
-                payload={
-                    "score_yellow": self.score_yellow,
-                    "score_blue": self.score_blue,
-                    "total_match_time": self.match_time,
-                    "team_name_yellow": self.team_name_yellow,
-                    "team_name_blue": self.team_name_blue,
-                    "match_id": self.match_id,
-                    "halftime": self.half_id,
-                },
+            self.eventer.emit(
+                self,
+                MatchStart,
+                score_yellow=self.score_yellow,
+                score_blue=self.score_blue,
+                total_match_time=self.match_time,
+                team_name_yellow=self.team_name_yellow,
+                team_name_blue=self.team_name_blue,
+                match_id=self.match_id,
+                halftime=self.half_id,
+                seed=self.seed,
+                rules=self.rules,
             )
 
+        profiler = self.profiler
         self.sv.update_positions()
-        self.sv.emit_data(self._pack_data())
+        profiler.lap("update_positions")
+        self.publish_snapshot()
+        profiler.lap("tick_subscribers")
+        self.emit_data()
+        profiler.lap("emit_data")
         self.time -= TIME_STEP / 1000.0
 
         # On the very last tick, note that the match has finished
         if self.time < 0:
-            self.eventer.event(
-                referee=self,
-                type=GameEvents.MATCH_FINISH.value,
-                payload={
-                    "total_match_time": self.match_time,
-                    "score_yellow": self.score_yellow,
-                    "score_blue": self.score_blue,
-                    "team_name_yellow": self.team_name_yellow,
-                    "team_name_blue": self.team_name_blue,
-                },
+            stats = profiler.stats()
+            if stats is not None:
+                self.eventer.emit(self, Stats, stats=stats)
+
+            self.eventer.emit(
+                self,
+                MatchFinish,
+                total_match_time=self.match_time,
+                score_yellow=self.score_yellow,
+                score_blue=self.score_blue,
+                team_name_yellow=self.team_name_yellow,
+                team_name_blue=self.team_name_blue,
             )
 
             return False
 
         self.sv.draw_time(self.time)
         self.process_and_draw_event_messages()
+        profiler.lap("draw")
 
         # If we are currently not in the post-goal waiting period,
         # check if a goal took place, setup the waiting period and move the
         # robots to proper positions afterwards.
         if self.ball_reset_timer == 0:
             self.check_goal()
+            profiler.lap("check_goal")
             self.check_progress()
+            profiler.lap("check_progress")
             self.check_robots_in_penalty_area()
+            profiler.lap("check_robots_in_penalty_area")
+            self.move_objects_to_neutral_spots()
+            profiler.lap("move_objects_to_neutral_spots")
         else:
             self.ball_reset_timer -= TIME_STEP / 1000.0
             self.sv.draw_goal_sign()
@@ -433,6 +571,7 @@ class RCJSoccerReferee:
                 self.ball_reset_timer = 0
                 self.sv.hide_goal_sign()
                 self.kickoff(self.team_to_kickoff)
+            profiler.lap("post_goal")
 
         # WORKAROUND: The proper way of moving the ball is to set its position
         # and call resetPhysics on the ball. However, the ball has small
@@ -442,5 +581,6 @@ class RCJSoccerReferee:
             if self.ball_stop == 1:
                 self.sv.reset_ball_velocity()
             self.ball_stop -= 1
+            profiler.lap("stop_ball")
 
         return True
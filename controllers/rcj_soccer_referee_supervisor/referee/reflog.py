@@ -0,0 +1,344 @@
+"""Compact binary reflog.
+
+The file starts with a header, followed by a fixed-width record for each
+event and a footer, which holds everything that does not fit into the
+records:
+
+    header:  magic, version, time step in milliseconds
+    records: tick, event type ID, payload ID, timestamp
+    footer:  JSON with the event types, the payloads and the record numbers
+             of each event type
+    trailer: offset of the footer, number of records, magic
+
+The tick is the match time in multiples of the time step and the records
+are sorted by it, so a match time can be found by bisection. The event
+types and payloads are interned: each distinct one is stored only once in
+the footer and the records refer to it by its position.
+
+If the match crashes before the footer is written, the records can still be
+recovered by scanning them, but not the payloads nor the names of the event
+types which are not GameEvents.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from referee.consts import TIME_STEP
+from referee.enums import GameEvents
+from referee.event_handlers import EventHandler
+
+MAGIC = b"RCJREF"
+VERSION = 1
+
+HEADER = struct.Struct("<6sHH")
+RECORD = struct.Struct("<IHxxId")
+TRAILER = struct.Struct("<QI6s")
+
+# Payload ID of the events without any payload
+NO_PAYLOAD = 0xFFFFFFFF
+
+# Number of records read from the disk at once while iterating
+READ_CHUNK = 4096
+
+
+class ReflogRecord(NamedTuple):
+    tick: int
+    event: str
+    payload: Optional[dict]
+    # Seconds since the epoch, when the event was logged
+    timestamp: float
+
+
+class BinaryLoggerHandler(EventHandler):
+    """Handler for writing the events to a binary reflog.
+
+    The footer is written once the match is finished or the handler gets
+    closed, at exit at the latest. Until then, the file can only be read as
+    recovered, see ReflogReader.
+    """
+
+    def __init__(
+        self,
+        logfile: Path,
+        time_step: int = TIME_STEP,
+        durable_events: Iterable[str] = (GameEvents.GOAL.value,),
+    ):
+        """
+        Args:
+            logfile (Path): Where to write the events to
+            time_step (int): Length of a tick in milliseconds
+            durable_events (list): Event types to flush the file after
+        """
+        super().__init__()
+        self.logfile = logfile
+        self.time_step = time_step
+        self.durable_events = frozenset(durable_events)
+
+        # All the GameEvents have fixed IDs, the others get added as seen
+        self.event_types = [event.value for event in GameEvents]
+        self._event_type_ids = {
+            event: event_id for event_id, event in enumerate(self.event_types)
+        }
+        self.payloads: List[str] = []
+        self._payload_ids: Dict[str, int] = {}
+        # Event type -> numbers of the records of that type
+        self.index: Dict[str, List[int]] = {}
+        self.n_records = 0
+
+        self._file: Optional[BinaryIO] = self.logfile.open("wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, time_step))
+        atexit.register(self.close)
+
+    def _event_type_id(self, type: str) -> int:
+        event_id = self._event_type_ids.get(type)
+        if event_id is None:
+            event_id = len(self.event_types)
+            self.event_types.append(type)
+            self._event_type_ids[type] = event_id
+        return event_id
+
+    def _payload_id(self, payload: Optional[dict]) -> int:
+        if payload is None:
+            return NO_PAYLOAD
+
+        serialized = json.dumps(payload)
+        payload_id = self._payload_ids.get(serialized)
+        if payload_id is None:
+            payload_id = len(self.payloads)
+            self.payloads.append(serialized)
+            self._payload_ids[serialized] = payload_id
+        return payload_id
+
+    def handle(self, referee, type: str, payload: Optional[dict] = None):
+        if self._file is None:
+            return
+
+        matchtime = referee.match_time - referee.time
+        tick = round(matchtime * 1000 / self.time_step)
+        self._file.write(
+            RECORD.pack(
+                tick,
+                self._event_type_id(type),
+                self._payload_id(payload),
+                time.time(),
+            )
+        )
+        self.index.setdefault(type, []).append(self.n_records)
+        self.n_records += 1
+
+        if type == GameEvents.MATCH_FINISH.value:
+            self.close()
+        elif type in self.durable_events:
+            self._file.flush()
+
+    def close(self):
+        """Write the footer and close the file."""
+        if self._file is None:
+            return
+
+        outfile, self._file = self._file, None
+        footer_offset = outfile.tell()
+        footer = {
+            "event_types": self.event_types,
+            "payloads": self.payloads,
+            "index": self.index,
+        }
+        outfile.write(json.dumps(footer).encode("utf-8"))
+        outfile.write(TRAILER.pack(footer_offset, self.n_records, MAGIC))
+        outfile.flush()
+        os.fsync(outfile.fileno())
+        outfile.close()
+        atexit.unregister(self.close)
+
+
+class _Ticks:
+    """Sequence of the ticks of the records, read on demand by bisect."""
+
+    def __init__(self, reader: "ReflogReader"):
+        self.reader = reader
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def __getitem__(self, record: int) -> int:
+        return self.reader.read_record(record)[0]
+
+
+class ReflogReader:
+    """Lazy reader of the binary reflogs.
+
+    Only the footer is loaded upfront, the records are read from the file
+    as they are iterated over.
+
+    Files without the footer, e.g. of a crashed match, are recovered by
+    scanning the records which were written out in full. The payloads of
+    the recovered records are None, and the event types other than
+    GameEvents are named by their ID, e.g. "UNKNOWN_12".
+    """
+
+    def __init__(self, logfile: Path):
+        self.logfile = logfile
+        self._file = self.logfile.open("rb")
+
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{logfile} is not a binary reflog")
+        magic, self.version, self.time_step = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{logfile} is not a binary reflog")
+        if self.version != VERSION:
+            raise ValueError(f"Unsupported reflog version {self.version}")
+
+        size = self._file.seek(0, os.SEEK_END)
+        footer_end = size - TRAILER.size
+        magic = None
+        if footer_end >= HEADER.size:
+            self._file.seek(footer_end)
+            footer_offset, self.n_records, magic = TRAILER.unpack(
+                self._file.read(TRAILER.size)
+            )
+
+        # Whether the file has no footer and the records were scanned
+        self.recovered = magic != MAGIC
+        self.event_types: List[str] = [event.value for event in GameEvents]
+        self.payloads: List[str] = []
+        self.index: Dict[str, List[int]] = {}
+        if self.recovered:
+            self._recover(size)
+            return
+
+        self._file.seek(footer_offset)
+        footer = json.loads(self._file.read(footer_end - footer_offset))
+        self.event_types = footer["event_types"]
+        self.payloads = footer["payloads"]
+        self.index = footer["index"]
+
+    def _recover(self, size: int):
+        """Rebuild the index from the records, up to the first one which is
+        cut off or is not a record, e.g. part of an unfinished footer."""
+        self.n_records = 0
+        n_payloads = 0
+        previous_tick = 0
+        self._file.seek(HEADER.size)
+        data = self._file.read(size - HEADER.size)
+        end = len(data) - len(data) % RECORD.size
+        for tick, event_id, payload_id, _ in RECORD.iter_unpack(data[:end]):
+            # The IDs are given out in order, as the events are logged
+            if tick < previous_tick or event_id > len(self.event_types):
+                break
+            if payload_id != NO_PAYLOAD:
+                if payload_id > n_payloads:
+                    break
+                n_payloads = max(n_payloads, payload_id + 1)
+            if event_id == len(self.event_types):
+                self.event_types.append(f"UNKNOWN_{event_id}")
+
+            event_type = self.event_types[event_id]
+            self.index.setdefault(event_type, []).append(self.n_records)
+            self.n_records += 1
+            previous_tick = tick
+
+    def __enter__(self) -> "ReflogReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def __iter__(self) -> Iterator[ReflogRecord]:
+        return self.iter_records()
+
+    def read_record(self, record: int) -> tuple:
+        """Return the raw (tick, event type ID, payload ID, timestamp)
+        fields of the record."""
+        if not 0 <= record < self.n_records:
+            raise IndexError(record)
+        self._file.seek(HEADER.size + record * RECORD.size)
+        return RECORD.unpack(self._file.read(RECORD.size))
+
+    def _decode(self, fields: tuple) -> ReflogRecord:
+        tick, event_id, payload_id, timestamp = fields
+        payload = None
+        # The payloads of the recovered records are lost
+        if payload_id < len(self.payloads):
+            payload = json.loads(self.payloads[payload_id])
+        return ReflogRecord(
+            tick, self.event_types[event_id], payload, timestamp
+        )
+
+    def __getitem__(self, record: int) -> ReflogRecord:
+        return self._decode(self.read_record(record))
+
+    def iter_records(self, start: int = 0) -> Iterator[ReflogRecord]:
+        """Iterate over the records, starting with the given one."""
+        record = start
+        while record < self.n_records:
+            count = min(READ_CHUNK, self.n_records - record)
+            self._file.seek(HEADER.size + record * RECORD.size)
+            chunk = self._file.read(count * RECORD.size)
+            for fields in RECORD.iter_unpack(chunk):
+                yield self._decode(fields)
+            record += count
+
+    def matchtime(self, tick: int) -> float:
+        """Convert the tick to the match time in seconds."""
+        return tick * self.time_step / 1000
+
+    def seek_time(self, matchtime: float) -> int:
+        """Return the number of the first record logged at the match time or
+        later.
+
+        Args:
+            matchtime (float): Match time in seconds
+        """
+        tick = round(matchtime * 1000 / self.time_step)
+        return bisect.bisect_left(_Ticks(self), tick)
+
+    def iter_from_time(self, matchtime: float) -> Iterator[ReflogRecord]:
+        """Iterate over the records logged at the match time or later."""
+        return self.iter_records(self.seek_time(matchtime))
+
+    def iter_events(self, event_type: str) -> Iterator[ReflogRecord]:
+        """Iterate over the records of the given event type only."""
+        for record in self.index.get(event_type, []):
+            yield self[record]
+
+    def to_json(self, record: ReflogRecord) -> dict:
+        """Convert the record to the form written by JSONLoggerHandler."""
+        data = {
+            "datetime": datetime.fromtimestamp(
+                record.timestamp, timezone.utc
+            ).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "matchtime": self.matchtime(record.tick),
+            "event": record.event,
+        }
+        if record.payload is not None:
+            data["payload"] = record.payload
+        return data
+
+    def write_jsonl(self, path: Path):
+        """Convert the whole reflog to JSON Lines."""
+        with path.open("w") as outfile:
+            for record in self:
+                json.dump(self.to_json(record), outfile)
+                outfile.write("\n")
@@ -0,0 +1,106 @@
+"""State of the match handed to the tick subscribers of the referee.
+
+Right after the poses are read from Webots, the referee fills in its one
+WorldSnapshot and hands it to each of the tick subscribers. The poses are
+the read-only views of the pose buffers of the supervisor, so neither
+reading nor copying them again is needed, no matter how many subscribers
+there are. The snapshot is the same object on every tick (with the same
+views), so the subscribers must not keep it, or anything read from its
+views, past the tick without copying it. The sequence number tells the
+ticks apart.
+"""
+
+from referee.enums import RefereePhase
+from referee.supervisor import RCJSoccerSupervisor
+
+
+class WorldSnapshot:
+    """Poses, time, scores and phase of the match on the current tick."""
+
+    __slots__ = (
+        "_translations",
+        "_rotations",
+        "_sequence",
+        "_time",
+        "_score_blue",
+        "_score_yellow",
+        "_waiting_for_kickoff",
+    )
+
+    def __init__(self, supervisor: RCJSoccerSupervisor):
+        """
+        Args:
+            supervisor (RCJSoccerSupervisor): Supervisor of the match,
+                whose pose buffers back the snapshot
+        """
+        self._translations = supervisor.translations
+        self._rotations = supervisor.rotations
+        self._sequence = -1
+        self._time = 0.0
+        self._score_blue = 0
+        self._score_yellow = 0
+        self._waiting_for_kickoff = False
+
+    def update(
+        self,
+        time: float,
+        score_blue: int,
+        score_yellow: int,
+        waiting_for_kickoff: bool,
+    ):
+        """Move the snapshot on to the next tick. Called by the referee."""
+        self._sequence += 1
+        self._time = time
+        self._score_blue = score_blue
+        self._score_yellow = score_yellow
+        self._waiting_for_kickoff = waiting_for_kickoff
+
+    @property
+    def translations(self) -> memoryview:
+        """N_OBJECTS x 3 translations, indexed by OBJECT_IDS"""
+        return self._translations
+
+    @property
+    def rotations(self) -> memoryview:
+        """N_ROBOTS x 4 rotations, indexed by OBJECT_IDS"""
+        return self._rotations
+
+    @property
+    def sequence(self) -> int:
+        """Number of the tick, starting with 0"""
+        return self._sequence
+
+    @property
+    def time(self) -> float:
+        """Remaining time of the match in seconds"""
+        return self._time
+
+    @property
+    def score_blue(self) -> int:
+        return self._score_blue
+
+    @property
+    def score_yellow(self) -> int:
+        return self._score_yellow
+
+    @property
+    def waiting_for_kickoff(self) -> bool:
+        """Whether a goal has been scored and the kickoff is yet to come"""
+        return self._waiting_for_kickoff
+
+    @property
+    def phase(self) -> int:
+        """RefereePhase value of the tick"""
+        if self._waiting_for_kickoff:
+            return RefereePhase.GOAL_SCORED.value
+        return RefereePhase.PLAYING.value
+
+
+class TickSubscriber:
+    def handle_tick(self, snapshot: WorldSnapshot):
+        """Handle the tick, see WorldSnapshot for what may be kept.
+
+        Args:
+            snapshot (WorldSnapshot): State of the match on the tick
+        """
+        raise NotImplementedError
@@ -1,103 +1,278 @@
 import math
-from typing import List, Tuple
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
 
 from controller import Supervisor
 
 from referee.consts import (
     BALL_DEPTH,
+    BALL_ID,
     DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT,
+    N_OBJECTS,
+    N_ROBOTS,
     NEUTRAL_SPOTS,
     OBJECT_DEPTH,
+    OBJECT_IDS,
     ROBOT_INITIAL_ROTATION,
     ROBOT_NAMES,
 )
 from referee.enums import LabelIDs, NeutralSpotDistanceType
+from referee.neutral_spots import NeutralSpotIndex
+from referee.profiler import NullTickProfiler
 from referee.utils import time_to_string
+from referee.zones import ZoneClassifier
+
+
+def _split_rows(view: memoryview, width: int) -> List[memoryview]:
+    """Split a flat view into views of the rows of the given width."""
+    rows = []
+    for start in range(0, len(view), width):
+        end = start + width
+        rows.append(view[start:end])
+    return rows
 
 
 class RCJSoccerSupervisor(Supervisor):
-    def __init__(self):
+    def __init__(self, render_labels: bool = True):
+        """
+        Args:
+            render_labels (bool): Whether to draw the overlay (scores, time,
+                event messages) into the 3D view
+        """
         super().__init__()
 
+        self.render_labels = render_labels
+        # Times the Webots steps, see referee.profiler
+        self.profiler = NullTickProfiler()
+        # Label ID -> arguments of the last setLabel call for that label
+        self._labels: Dict[int, tuple] = {}
+        # Whole seconds of the match time currently drawn
+        self._drawn_time: Optional[int] = None
+
         self.emitter = self.getDevice("emitter")
 
         self.ball = self.getFromDef("BALL")
         self.ball_translation_field = self.ball.getField("translation")
-        self.ball_translation = self.ball_translation_field.getSFVec3f()
 
         self.robot_nodes = {}
         self.robot_translation_fields = {}
         self.robot_rotation_fields = {}
-        self.robot_translation = {}
-        self.robot_rotation = {}
-        self.robot_reset_physics = {}
         for robot in ROBOT_NAMES:
             robot_node = self.getFromDef(robot)
             self.robot_nodes[robot] = robot_node
 
             field = robot_node.getField("translation")
             self.robot_translation_fields[robot] = field
-            self.robot_translation[robot] = field.getSFVec3f()
 
             field = robot_node.getField("rotation")
             self.robot_rotation_fields[robot] = field
-            self.robot_rotation[robot] = field.getSFRotation()
 
-            self.robot_reset_physics[robot] = 0
+        # Nodes and fields indexed by object ID
+        self._nodes = [self.robot_nodes[robot] for robot in ROBOT_NAMES]
+        self._nodes.append(self.ball)
+        self._translation_fields = [
+            self.robot_translation_fields[robot] for robot in ROBOT_NAMES
+        ]
+        self._translation_fields.append(self.ball_translation_field)
+        self._rotation_fields = [
+            self.robot_rotation_fields[robot] for robot in ROBOT_NAMES
+        ]
+
+        # Commands collected during the tick and sent to Webots all at once
+        # right before the next step, keyed by object ID. Setting the same
+        # value twice within a tick only keeps the last one.
+        self._pending_translations: Dict[int, List[float]] = {}
+        self._pending_rotations: Dict[int, List[float]] = {}
+        self._pending_velocity_resets: Set[int] = set()
+        self._pending_physics_resets: Set[int] = set()
+        # Robots which need their physics reset once more after the step
+        # they have been moved in
+        self._deferred_physics_resets: Set[int] = set()
+
+        # Poses of all the objects, indexed by OBJECT_IDS: a N_OBJECTS x 3
+        # block of translations and a N_ROBOTS x 4 block of rotations, filled
+        # in place on every update.
+        self._translations = array("d", [0.0]) * (N_OBJECTS * 3)
+        self._rotations = array("d", [0.0]) * (N_ROBOTS * 4)
+
+        # Fields to read from, in the order of the buffers
+        self._translation_reads = [
+            (OBJECT_IDS[robot] * 3, self.robot_translation_fields[robot])
+            for robot in ROBOT_NAMES
+        ]
+        self._translation_reads.append(
+            (BALL_ID * 3, self.ball_translation_field)
+        )
+        self._rotation_reads = [
+            (OBJECT_IDS[robot] * 4, self.robot_rotation_fields[robot])
+            for robot in ROBOT_NAMES
+        ]
+
+        translations = memoryview(self._translations).toreadonly()
+        rotations = memoryview(self._rotations).toreadonly()
+        self.translations = translations.cast("B").cast("d", [N_OBJECTS, 3])
+        self.rotations = rotations.cast("B").cast("d", [N_ROBOTS, 4])
+        self._object_translations = _split_rows(translations, 3)
+        self._robot_rotations = _split_rows(rotations, 4)
+
+        # Zones of the objects and their distances from the neutral spots,
+        # recomputed lazily once the positions change
+        self.zone_classifier = ZoneClassifier()
+        self.neutral_spot_index = NeutralSpotIndex()
+        self._zones_outdated = True
+        self._spots_outdated = True
+
+        self.update_positions()
+
+    def step(self, duration: int) -> int:
+        """Send the commands collected during the tick and run the next step
+        of the simulation.
+
+        Args:
+            duration (int): Duration of the step in milliseconds
+
+        Returns:
+            int: -1 if the simulation is about to quit, 0 otherwise
+        """
+        self.flush_commands()
+        self.profiler.lap("flush_commands")
+
+        self.profiler.step_started()
+        result = super().step(duration)
+        self.profiler.step_finished()
+        return result
+
+    def flush_commands(self):
+        """Send all the pending commands to Webots."""
+        for object_id, position in self._pending_translations.items():
+            self._translation_fields[object_id].setSFVec3f(position)
+        for object_id, rotation in self._pending_rotations.items():
+            self._rotation_fields[object_id].setSFRotation(rotation)
+
+        nodes = self._nodes
+        for object_id in self._pending_velocity_resets:
+            nodes[object_id].setVelocity([0, 0, 0, 0, 0, 0])
 
-    def check_reset_physics_counters(self):
         # HACK(Richo): Workaround for the following issue
         # https://github.com/RoboCupJuniorTC/rcj-soccersim/issues/130
-        for robot in ROBOT_NAMES:
-            reset_physics_counter = self.robot_reset_physics[robot]
-            if reset_physics_counter > 0:
-                self.robot_nodes[robot].resetPhysics()
-                self.robot_reset_physics[robot] = reset_physics_counter - 1
+        # The robots moved in this step get their physics reset once more in
+        # the next one.
+        physics_resets = self._pending_physics_resets
+        physics_resets |= self._deferred_physics_resets
+        for object_id in physics_resets:
+            nodes[object_id].resetPhysics()
+
+        self._deferred_physics_resets = {
+            object_id
+            for object_id in self._pending_translations
+            if object_id != BALL_ID
+        }
+        self._pending_translations.clear()
+        self._pending_rotations.clear()
+        self._pending_velocity_resets.clear()
+        physics_resets.clear()
 
     def update_positions(self):
         """Update the positions of robots and the ball"""
-        self.ball_translation = self.ball_translation_field.getSFVec3f()
+        t = self._translations
+        for offset, field in self._translation_reads:
+            t[offset], t[offset + 1], t[offset + 2] = field.getSFVec3f()
+
+        r = self._rotations
+        for offset, field in self._rotation_reads:
+            (
+                r[offset],
+                r[offset + 1],
+                r[offset + 2],
+                r[offset + 3],
+            ) = field.getSFRotation()
+
+        # The commands not sent to Webots yet are newer than what it reports
+        for object_id, position in self._pending_translations.items():
+            self._write_translation(object_id, position)
+        for object_id, rotation in self._pending_rotations.items():
+            self._write_rotation(object_id, rotation)
+
+        self._zones_outdated = True
+        self._spots_outdated = True
+
+    def _write_translation(self, object_id: int, position: List[float]):
+        t, offset = self._translations, object_id * 3
+        t[offset], t[offset + 1], t[offset + 2] = position
+        self._zones_outdated = True
+        self._spots_outdated = True
+
+    def _write_rotation(self, object_id: int, rotation: List[float]):
+        r, offset = self._rotations, object_id * 4
+        r[offset], r[offset + 1], r[offset + 2], r[offset + 3] = rotation
+
+    def get_zone_masks(self) -> Sequence[int]:
+        """Return the zones all the objects are located in.
 
-        for robot in ROBOT_NAMES:
-            t = self.robot_translation_fields[robot].getSFVec3f()
-            self.robot_translation[robot] = t
+        Returns:
+            Sequence[int]: Bitmask of Zone values for each object ID
+        """
+        if self._zones_outdated:
+            self.zone_classifier.classify(self._translations)
+            self._zones_outdated = False
+        return self.zone_classifier.masks
 
-            r = self.robot_rotation_fields[robot].getSFRotation()
-            self.robot_rotation[robot] = r
+    def get_neutral_spot_index(self) -> NeutralSpotIndex:
+        """Return the distances of the objects from the neutral spots.
 
-        assert len(self.robot_translation) == len(self.robot_rotation)
+        Returns:
+            NeutralSpotIndex: Index up to date with the current positions
+        """
+        if self._spots_outdated:
+            self.neutral_spot_index.update(self._translations)
+            self._spots_outdated = False
+        return self.neutral_spot_index
 
-    def get_robot_translation(self, robot: str) -> list:
+    def get_robot_translation(self, robot: str) -> Sequence[float]:
         """Return the position of the robot.
 
+        The returned read-only view gets updated in place, so it must not be
+        kept around across ticks.
+
         Args:
             robot (str): The robot whose position is returned
 
         Returns:
-            list: x, y and z coordinates
+            Sequence[float]: x, y and z coordinates
+        """
+        return self._object_translations[OBJECT_IDS[robot]]
+
+    def get_robot_rotation(self, robot: str) -> Sequence[float]:
+        """Return the rotation of the robot.
+
+        Args:
+            robot (str): The robot whose rotation is returned
+
+        Returns:
+            Sequence[float]: axis and angle of the rotation
         """
-        return self.robot_translation[robot]
+        return self._robot_rotations[OBJECT_IDS[robot]]
 
-    def get_ball_translation(self) -> list:
+    def get_ball_translation(self) -> Sequence[float]:
         """Return the position of the ball.
 
         Returns:
-            list: x, y and z coordinates
+            Sequence[float]: x, y and z coordinates
         """
-        return self.ball_translation
+        return self._object_translations[BALL_ID]
 
     def set_robot_position(self, robot_name: str, position: List[float]):
-        """Set the position of a robot.
+        """Set the position of a robot. The robot gets moved right before
+        the next step.
 
         Args:
             robot_name (str): The robot we are moving
             position (list of floats): The actual position
         """
-        tr_field = self.robot_translation_fields[robot_name]
-        tr_field.setSFVec3f(position)
-        self.robot_reset_physics[robot_name] = 1
-        self.robot_nodes[robot_name].resetPhysics()
-        self.robot_translation[robot_name] = position
+        object_id = OBJECT_IDS[robot_name]
+        self._pending_translations[object_id] = list(position)
+        self._pending_physics_resets.add(object_id)
+        self._write_translation(object_id, position)
 
     def set_robot_rotation(self, robot_name: str, rotation: List[float]):
         """Set the rotation of a robot.
@@ -106,9 +281,9 @@ class RCJSoccerSupervisor(Supervisor):
             robot_name (str): The robot we are rotating
             rotation (list of floats): The actual rotation
         """
-        rot_field = self.robot_rotation_fields[robot_name]
-        rot_field.setSFRotation(rotation)
-        self.robot_rotation[robot_name] = rotation
+        object_id = OBJECT_IDS[robot_name]
+        self._pending_rotations[object_id] = list(rotation)
+        self._write_rotation(object_id, rotation)
 
     def set_ball_position(self, position: List[float]):
         """Set the position of the ball.
@@ -116,10 +291,10 @@ class RCJSoccerSupervisor(Supervisor):
         Args:
             position (list of floats): The actual position
         """
-        self.ball_translation_field.setSFVec3f(position)
-        self.reset_ball_velocity()
-        self.ball.resetPhysics()
-        self.ball_translation = position
+        self._pending_translations[BALL_ID] = list(position)
+        self._pending_velocity_resets.add(BALL_ID)
+        self._pending_physics_resets.add(BALL_ID)
+        self._write_translation(BALL_ID, position)
 
     def reset_robot_velocity(self, robot_name: str):
         """Reset the robot's velocity.
@@ -127,11 +302,11 @@ class RCJSoccerSupervisor(Supervisor):
         Args:
             robot_name (str): The robot we set the velocity for
         """
-        self.robot_nodes[robot_name].setVelocity([0, 0, 0, 0, 0, 0])
+        self._pending_velocity_resets.add(OBJECT_IDS[robot_name])
 
     def reset_ball_velocity(self):
         """Reset the ball's velocity."""
-        self.ball.setVelocity([0, 0, 0, 0, 0, 0])
+        self._pending_velocity_resets.add(BALL_ID)
 
     def is_neutral_spot_occupied(self, ns_x: float, ns_y: float) -> bool:
         """Check whether the specific neutral spot is occupied
@@ -143,19 +318,14 @@ class RCJSoccerSupervisor(Supervisor):
         Returns:
             bool: Whether the neutral spot is unoccupied
         """
-        # Check whether any of the robots is blocking the neutral spot
-        for _, pos in self.robot_translation.items():
-            rx, ry = pos[0], pos[1]
-            distance = math.sqrt((rx - ns_x) ** 2 + (ry - ns_y) ** 2)
+        # Check whether any of the robots or the ball is blocking the spot
+        t = self._translations
+        for offset in range(0, N_OBJECTS * 3, 3):
+            x, y = t[offset], t[offset + 1]
+            distance = math.sqrt((x - ns_x) ** 2 + (y - ns_y) ** 2)
             if distance < DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT:
                 return True
 
-        # Check whether the ball is blocking the neutral spot
-        bx, by = self.ball_translation[0], self.ball_translation[1]
-        distance = math.sqrt((bx - ns_x) ** 2 + (by - ns_y) ** 2)
-        if distance < DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT:
-            return True
-
         return False
 
     def get_unoccupied_neutral_spots_sorted(
@@ -175,32 +345,11 @@ class RCJSoccerSupervisor(Supervisor):
         Returns:
             list: sorted pairs of neutral spots and their distances
         """
-        if object_name == "ball":
-            x = self.ball_translation[0]
-            y = self.ball_translation[1]
-        else:
-            x = self.robot_translation[object_name][0]
-            y = self.robot_translation[object_name][1]
-
-        spot_distance_pairs = []
-        for ns, ns_pos in NEUTRAL_SPOTS.items():
-            ns_x, ns_y = ns_pos
-            spot_distance = math.sqrt((x - ns_x) ** 2 + (y - ns_y) ** 2)
-
-            if not self.is_neutral_spot_occupied(ns_x, ns_y):
-                spot_distance_pairs.append((ns, spot_distance))
-
         do_reverse = distance_type == NeutralSpotDistanceType.FURTHEST.value
-        sorted_pairs = list(
-            sorted(
-                spot_distance_pairs,
-                key=lambda pair: pair[1],
-                reverse=do_reverse,
-            ),
+        return self.get_neutral_spot_index().get_unoccupied_sorted(
+            OBJECT_IDS[object_name], furthest=do_reverse
         )
 
-        return sorted_pairs
-
     def move_object_to_neutral_spot(self, object_name: str, neutral_spot: str):
         """Move the robot to the specified neutral spot.
 
@@ -217,14 +366,22 @@ class RCJSoccerSupervisor(Supervisor):
                 object_name, ROBOT_INITIAL_ROTATION[object_name]
             )
 
-    def emit_data(self, data: str):
+    def emit_data(self, data: Union[str, bytes]):
         """Send packet via emitter
 
         Args:
-            data (str): the data to be sent
+            data (str, bytes): the data to be sent
         """
         self.emitter.send(data)
 
+    def _set_label(self, label_id: int, *args):
+        """Call setLabel unless the label already shows the same thing."""
+        if not self.render_labels or self._labels.get(label_id) == args:
+            return
+
+        self._labels[label_id] = args
+        self.setLabel(label_id, *args)
+
     def draw_team_names(self, team_name_blue: str, team_name_yellow: str):
         """Visualize (draw) the names of the teams.
 
@@ -232,7 +389,7 @@ class RCJSoccerSupervisor(Supervisor):
             team_name_blue (str): name of the blue team
             team_name_yellow (str): name of the yellow team
         """
-        self.setLabel(
+        self._set_label(
             LabelIDs.BLUE_TEAM.value,
             team_name_blue,
             0.92 - (len(team_name_blue) * 0.01),  # X position
@@ -243,7 +400,7 @@ class RCJSoccerSupervisor(Supervisor):
             "Tahoma",  # Font
         )
 
-        self.setLabel(
+        self._set_label(
             LabelIDs.YELLOW_TEAM.value,
             team_name_yellow,
             0.05,  # X position
@@ -262,7 +419,7 @@ class RCJSoccerSupervisor(Supervisor):
             blue (int): score of the blue team
             yellow (int): score of the yellow team
         """
-        self.setLabel(
+        self._set_label(
             LabelIDs.BLUE_SCORE.value,
             str(blue),
             0.92,  # X position
@@ -273,7 +430,7 @@ class RCJSoccerSupervisor(Supervisor):
             "Tahoma",  # Font
         )
 
-        self.setLabel(
+        self._set_label(
             LabelIDs.YELLOW_SCORE.value,
             str(yellow),
             0.05,  # X position
@@ -290,7 +447,12 @@ class RCJSoccerSupervisor(Supervisor):
         Args:
             time (int): the current match time
         """
-        self.setLabel(
+        # The label only changes once per second
+        if int(time) == self._drawn_time:
+            return
+        self._drawn_time = int(time)
+
+        self._set_label(
             LabelIDs.TIME.value,
             time_to_string(time),
             0.45,
@@ -308,7 +470,7 @@ class RCJSoccerSupervisor(Supervisor):
             messages: List of string messages to be drawn
         """
         if messages:
-            self.setLabel(
+            self._set_label(
                 LabelIDs.EVENT_MESSAGES.value,
                 "\n".join(messages),
                 0.01,
@@ -327,7 +489,7 @@ class RCJSoccerSupervisor(Supervisor):
                 no transparency and 1 meaning total transparency (the text will
                 not be visible).
         """
-        self.setLabel(
+        self._set_label(
             LabelIDs.GOAL.value,
             "GOAL!",
             0.30,
@@ -340,7 +502,7 @@ class RCJSoccerSupervisor(Supervisor):
 
     def hide_goal_sign(self):
         """Hide the GOAL! once the game is again in progress."""
-        self.setLabel(
+        self._set_label(
             LabelIDs.GOAL.value,
             "",
             0.30,
@@ -0,0 +1,147 @@
+from headless import install
+
+install()
+
+import json
+
+import pytest
+
+from headless.controller import use_world
+from headless.match import run_match
+from headless.world import idle, World
+from referee.analytics import (
+    heatmap_cell,
+    HEATMAP_CELLS,
+    HEATMAP_COLUMNS,
+    HEATMAP_ROWS,
+    MatchAnalytics,
+)
+from referee.consts import (
+    FIELD_X_LOWER_LIMIT,
+    FIELD_Y_UPPER_LIMIT,
+    OBJECT_IDS,
+    ROBOT_NAMES,
+)
+from referee.snapshot import WorldSnapshot
+from referee.supervisor import RCJSoccerSupervisor
+
+
+@pytest.fixture
+def world() -> World:
+    world = World({robot: idle() for robot in ROBOT_NAMES})
+    use_world(world)
+    return world
+
+
+@pytest.fixture
+def supervisor(world: World) -> RCJSoccerSupervisor:
+    return RCJSoccerSupervisor()
+
+
+@pytest.fixture
+def snapshot(supervisor: RCJSoccerSupervisor) -> WorldSnapshot:
+    return WorldSnapshot(supervisor)
+
+
+def tick(
+    analytics: MatchAnalytics,
+    snapshot: WorldSnapshot,
+    supervisor: RCJSoccerSupervisor,
+    score_blue: int = 0,
+    waiting_for_kickoff: bool = False,
+):
+    supervisor.update_positions()
+    snapshot.update(0.0, score_blue, 0, waiting_for_kickoff)
+    analytics.handle_tick(snapshot)
+
+
+def move(world: World, name: str, x, y):
+    body = world.robots[OBJECT_IDS[name]] if name != "ball" else world.ball
+    body.translation[0], body.translation[1] = x, y
+
+
+def test_heatmap_cell():
+    assert heatmap_cell(FIELD_X_LOWER_LIMIT, FIELD_Y_UPPER_LIMIT) == (
+        HEATMAP_CELLS - HEATMAP_COLUMNS
+    )
+    # Outside of the field, into the nearest cell
+    assert heatmap_cell(-5, -5) == 0
+    assert heatmap_cell(5, 5) == HEATMAP_CELLS - 1
+
+
+def test_possession_only_in_play(world, supervisor, snapshot):
+    analytics = MatchAnalytics()
+    move(world, "ball", 0.3, 0.25)
+
+    tick(analytics, snapshot, supervisor)
+    tick(analytics, snapshot, supervisor, 1, waiting_for_kickoff=True)
+
+    # B1 stands at (0.3, 0.3), next to the ball
+    assert list(analytics.possession) == [1, 0, 0, 0, 0, 0]
+    summary = analytics.summary()
+    assert summary["possession"] == {"B": 1.0, "Y": 0.0}
+    assert summary["score"] == {"B": 1, "Y": 0}
+
+
+def test_distance_without_relocations(world, supervisor, snapshot):
+    analytics = MatchAnalytics()
+    tick(analytics, snapshot, supervisor)
+    move(world, "B1", 0.3, 0.29)
+    tick(analytics, snapshot, supervisor)
+    move(world, "B1", 0.3, 0.28)
+    tick(analytics, snapshot, supervisor)
+    # Moved by the referee
+    move(world, "B1", 0.0, 0.0)
+    tick(analytics, snapshot, supervisor)
+
+    assert analytics.distance[0] == pytest.approx(0.02)
+    assert analytics.distance[1] == 0
+
+
+def test_halves_and_penalty_areas(world, supervisor, snapshot):
+    analytics = MatchAnalytics()
+    move(world, "Y1", 0.0, 0.65)
+    tick(analytics, snapshot, supervisor)
+
+    summary = analytics.summary()
+    assert summary["robots"]["Y1"]["time_in_half"] == {"B": 0.032, "Y": 0.0}
+    assert summary["robots"]["Y1"]["time_in_penalty_area"] == {
+        "B": 0.032,
+        "Y": 0.0,
+    }
+    assert summary["robots"]["B1"]["time_in_half"] == {"B": 0.032, "Y": 0.0}
+    assert summary["robots"]["B1"]["time_in_penalty_area"] == {
+        "B": 0.0,
+        "Y": 0.0,
+    }
+
+
+def test_heatmaps(world, supervisor, snapshot):
+    analytics = MatchAnalytics()
+    for _ in range(3):
+        tick(analytics, snapshot, supervisor)
+
+    heatmaps = analytics.summary()["heatmaps"]
+    for name in ("B", "Y", "ball"):
+        assert len(heatmaps[name]) == HEATMAP_ROWS
+        assert len(heatmaps[name][0]) == HEATMAP_COLUMNS
+    assert sum(map(sum, heatmaps["B"])) == 9
+    assert sum(map(sum, heatmaps["ball"])) == 3
+    ball_cell = heatmap_cell(0, 0)
+    row, column = divmod(ball_cell, HEATMAP_COLUMNS)
+    assert heatmaps["ball"][row][column] == 3
+
+
+def test_summary_written_on_match_finish(tmp_path):
+    path = tmp_path / "match.analytics.json"
+    referee = run_match(match_time=30, seed=2, analytics=path)
+
+    summary = json.loads(path.read_text())
+    assert summary["score"] == {
+        "B": referee.score_blue,
+        "Y": referee.score_yellow,
+    }
+    assert summary["time"] == pytest.approx(30, abs=0.1)
+    assert sum(summary["possession"].values()) == pytest.approx(1)
+    assert all(robot["distance"] > 0 for robot in summary["robots"].values())
+    assert referee.tick_subscribers == []
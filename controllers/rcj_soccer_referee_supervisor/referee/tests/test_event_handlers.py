@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from referee.enums import GameEvents
+from referee.event_handlers import DrawMessageHandler, JSONLoggerHandler
+from referee.events import Goal, LackOfProgress
+
+
+@pytest.fixture
+def referee() -> SimpleNamespace:
+    return SimpleNamespace(match_time=600, time=590.5)
+
+
+def read_events(path) -> list:
+    with path.open() as f:
+        return [json.loads(line) for line in f]
+
+
+def test_json_logger_batches_events(tmp_path, referee):
+    logfile = tmp_path / "reflog.jsonl"
+    handler = JSONLoggerHandler(logfile, flush_interval=60)
+
+    handler.handle(referee, GameEvents.KICKOFF.value, {"robot_name": "B3"})
+    handler.handle(referee, GameEvents.LACK_OF_PROGRESS.value)
+    assert logfile.read_text() == ""
+
+    handler.close()
+    events = read_events(logfile)
+    assert [event["event"] for event in events] == [
+        "KICKOFF",
+        "LACK_OF_PROGRESS",
+    ]
+    assert events[0]["matchtime"] == 9.5
+    assert events[0]["payload"] == {"robot_name": "B3"}
+    assert "payload" not in events[1]
+    assert events[0]["datetime"].endswith("Z")
+
+
+def test_json_logger_flushes_on_durable_events(tmp_path, referee):
+    logfile = tmp_path / "reflog.jsonl"
+    handler = JSONLoggerHandler(logfile, flush_interval=60)
+
+    handler.handle(referee, GameEvents.LACK_OF_PROGRESS.value)
+    handler.handle(referee, GameEvents.GOAL.value, {"team_name": "Blues"})
+    assert len(read_events(logfile)) == 2
+
+    handler.handle(referee, GameEvents.LACK_OF_PROGRESS.value)
+    handler.handle(referee, GameEvents.MATCH_FINISH.value)
+    assert len(read_events(logfile)) == 4
+
+    handler.close()
+    handler.close()
+
+
+def test_json_logger_rejects_events_once_closed(tmp_path, referee):
+    logfile = tmp_path / "reflog.jsonl"
+    handler = JSONLoggerHandler(logfile, flush_interval=60)
+    handler.handle(referee, GameEvents.MATCH_FINISH.value)
+    handler.close()
+
+    with pytest.raises(ValueError):
+        handler.handle(referee, GameEvents.LACK_OF_PROGRESS.value)
+    assert len(read_events(logfile)) == 1
+
+
+def test_json_logger_appends(tmp_path, referee):
+    logfile = tmp_path / "reflog.jsonl"
+    for _ in range(2):
+        handler = JSONLoggerHandler(logfile, flush_interval=0.01)
+        handler.handle(referee, GameEvents.MATCH_START.value)
+        handler.close()
+
+    assert len(read_events(logfile)) == 2
+
+
+def test_json_logger_write_fails(tmp_path, referee):
+    logfile = tmp_path / "reflog.jsonl"
+    handler = JSONLoggerHandler(logfile, flush_interval=60)
+
+    def fail(entries, sync):
+        raise OSError("No space left on device")
+
+    handler._write = fail
+    with pytest.raises(OSError):
+        handler.handle(referee, GameEvents.GOAL.value)
+    # The writer thread is gone, the events are not queued up any more
+    with pytest.raises(OSError):
+        handler.handle(referee, GameEvents.LACK_OF_PROGRESS.value)
+    assert handler._pending == []
+
+    with pytest.raises(OSError):
+        handler.close()
+    assert handler._file.closed
+
+
+def test_draw_message_handler(referee):
+    messages = []
+    referee.add_event_message_to_queue = messages.append
+    handler = DrawMessageHandler()
+
+    handler.handle(referee, GameEvents.KICKOFF.value, {"robot_name": "B3"})
+    handler.handle_event(
+        referee, Goal().set(team_name="Blues", score_yellow=0, score_blue=1)
+    )
+    handler.handle_event(referee, LackOfProgress().set(type="ball"))
+
+    assert messages == [
+        "Robot B3 is kicking off.",
+        "A goal was scored by Blues.",
+        "Ball: Lack of progress.",
+    ]
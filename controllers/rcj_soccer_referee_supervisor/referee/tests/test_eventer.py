@@ -1,9 +1,13 @@
-from unittest.mock import MagicMock
+import threading
+from typing import Optional
+from unittest.mock import call, MagicMock
 
 import pytest
 
+from referee.enums import BackpressurePolicy, EventDelivery, GameEvents
 from referee.event_handlers import EventHandler
 from referee.eventer import Eventer
+from referee.events import Event, Goal, Kickoff, LackOfProgress, MatchFinish
 
 
 @pytest.fixture
@@ -36,3 +40,318 @@ def test_event(eventer: Eventer):
 
     subscriber1.handle.assert_called_with("arg", kwarg="test")
     subscriber2.handle.assert_called_with("arg", kwarg="test")
+
+
+class GatedHandler(EventHandler):
+    """Handler recording the events, which can be held up in the handling
+    of the first one."""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.threads = set()
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def handle(self, referee, type: str, payload: Optional[dict] = None):
+        self.started.set()
+        self.gate.wait()
+        self.events.append((type, payload))
+        self.threads.add(threading.current_thread())
+
+
+def hold_up(eventer: Eventer, handler: GatedHandler):
+    """Make the handler busy with an event, so that the next ones queue."""
+    handler.gate.clear()
+    eventer.event(referee=None, type="HELD")
+    assert handler.started.wait(5)
+
+
+def test_async_event(eventer: Eventer):
+    handler = GatedHandler()
+    eventer.subscribe(handler, delivery=EventDelivery.ASYNC.value)
+
+    for i in range(100):
+        eventer.event(referee=None, type="EVENT", payload={"i": i})
+    eventer.drain()
+
+    assert handler.events == [("EVENT", {"i": i}) for i in range(100)]
+    assert threading.current_thread() not in handler.threads
+
+
+def test_async_event_block(eventer: Eventer):
+    handler = GatedHandler()
+    eventer.subscribe(
+        handler, delivery=EventDelivery.ASYNC.value, queue_size=1
+    )
+    hold_up(eventer, handler)
+    eventer.event(referee=None, type="QUEUED")
+
+    blocked = threading.Thread(
+        target=eventer.event, kwargs={"referee": None, "type": "BLOCKED"}
+    )
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    handler.gate.set()
+    blocked.join(5)
+    eventer.drain()
+    assert [type for type, _ in handler.events] == [
+        "HELD",
+        "QUEUED",
+        "BLOCKED",
+    ]
+
+
+def test_async_event_drop_oldest(eventer: Eventer):
+    handler = GatedHandler()
+    eventer.subscribe(
+        handler,
+        delivery=EventDelivery.ASYNC.value,
+        policy=BackpressurePolicy.DROP_OLDEST.value,
+        queue_size=2,
+    )
+    hold_up(eventer, handler)
+    for i in range(5):
+        eventer.event(referee=None, type="EVENT", payload={"i": i})
+
+    handler.gate.set()
+    eventer.drain()
+    assert handler.events == [
+        ("HELD", None),
+        ("EVENT", {"i": 3}),
+        ("EVENT", {"i": 4}),
+    ]
+    assert eventer.async_subscriptions[0].dropped == 3
+
+
+def subscribe_coalesced(eventer: Eventer, handler: EventHandler):
+    eventer.subscribe(
+        handler,
+        delivery=EventDelivery.ASYNC.value,
+        policy=BackpressurePolicy.COALESCE.value,
+    )
+
+
+def test_async_event_coalesce(eventer: Eventer):
+    handler = GatedHandler()
+    subscribe_coalesced(eventer, handler)
+    hold_up(eventer, handler)
+    eventer.event(referee=None, type="A", payload={"i": 0})
+    eventer.event(referee=None, type="B", payload={"i": 1})
+    eventer.event(referee=None, type="A", payload={"i": 2})
+
+    handler.gate.set()
+    eventer.drain()
+    # Replaced in its place in the queue
+    assert handler.events == [
+        ("HELD", None),
+        ("A", {"i": 2}),
+        ("B", {"i": 1}),
+    ]
+    assert eventer.async_subscriptions[0].dropped == 1
+
+
+def test_async_event_coalesce_same_state_only(eventer: Eventer):
+    handler = GatedHandler()
+    subscribe_coalesced(eventer, handler)
+    hold_up(eventer, handler)
+    progress = GameEvents.LACK_OF_PROGRESS.value
+    events = [
+        (progress, {"type": "robot", "robot_name": "B1"}),
+        (progress, {"type": "robot", "robot_name": "Y2"}),
+        (progress, {"type": "ball"}),
+        (progress, {"type": "robot", "robot_name": "B1"}),
+    ]
+    for type, payload in events:
+        eventer.event(referee=None, type=type, payload=payload)
+
+    handler.gate.set()
+    eventer.drain()
+    assert handler.events == [("HELD", None)] + events[:3]
+    assert eventer.async_subscriptions[0].dropped == 1
+
+
+def test_async_event_never_coalesce_goals(eventer: Eventer):
+    handler = GatedHandler()
+    subscribe_coalesced(eventer, handler)
+    hold_up(eventer, handler)
+    goal = GameEvents.GOAL.value
+    for score in range(3):
+        payload = {
+            "team_name": "Blues",
+            "score_yellow": 0,
+            "score_blue": score,
+        }
+        eventer.event(referee=None, type=goal, payload=payload)
+
+    handler.gate.set()
+    eventer.drain()
+    assert [payload["score_blue"] for type, payload in handler.events[1:]] == [
+        0,
+        1,
+        2,
+    ]
+    assert eventer.async_subscriptions[0].dropped == 0
+
+
+def test_async_event_drained_on_match_finish(eventer: Eventer):
+    handler = GatedHandler()
+    eventer.subscribe(handler, delivery=EventDelivery.ASYNC.value)
+    hold_up(eventer, handler)
+    eventer.event(referee=None, type="QUEUED")
+    threading.Timer(0.05, handler.gate.set).start()
+
+    eventer.event(referee=None, type=GameEvents.MATCH_FINISH.value)
+
+    assert [type for type, _ in handler.events] == [
+        "HELD",
+        "QUEUED",
+        GameEvents.MATCH_FINISH.value,
+    ]
+    # Handled right away once the match is finished
+    eventer.event(referee=None, type="LATE")
+    assert handler.events[-1] == ("LATE", None)
+    assert threading.current_thread() in handler.threads
+
+
+def test_async_event_handler_fails(eventer: Eventer):
+    failing = EventHandler()
+    handler = GatedHandler()
+    eventer.subscribe(failing, delivery=EventDelivery.ASYNC.value)
+    eventer.subscribe(handler, delivery=EventDelivery.ASYNC.value)
+
+    eventer.event(referee=None, type="A")
+    eventer.event(referee=None, type="B")
+    eventer.close()
+
+    assert handler.events == [("A", None), ("B", None)]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"delivery": "later"}, {"policy": "ignore"}, {"queue_size": 0}],
+)
+def test_subscribe_invalid(eventer: Eventer, kwargs):
+    with pytest.raises(ValueError):
+        eventer.subscribe(EventHandler(), **kwargs)
+
+
+class TypedHandler(EventHandler):
+    event_types = (GameEvents.GOAL.value,)
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def handle_event(self, referee, event: Event):
+        self.events.append(event.copy())
+
+
+def test_emit(eventer: Eventer):
+    typed = TypedHandler()
+    legacy = EventHandler()
+    legacy.handle = MagicMock()
+    eventer.subscribe(typed)
+    eventer.subscribe(legacy)
+
+    eventer.emit("referee", Kickoff, robot_name="B3", team_name="B")
+    eventer.emit(
+        "referee", Goal, team_name="Blues", score_yellow=0, score_blue=1
+    )
+
+    assert [event.payload() for event in typed.events] == [
+        {"team_name": "Blues", "score_yellow": 0, "score_blue": 1}
+    ]
+    assert legacy.handle.call_args_list == [
+        call("referee", "KICKOFF", {"robot_name": "B3", "team_name": "B"}),
+        call(
+            "referee",
+            "GOAL",
+            {"team_name": "Blues", "score_yellow": 0, "score_blue": 1},
+        ),
+    ]
+
+
+def test_emit_reuses_events(eventer: Eventer):
+    events = []
+    handler = EventHandler()
+    handler.handle_event = lambda referee, event: events.append(event)
+    eventer.subscribe(handler)
+
+    eventer.emit(None, LackOfProgress, type="ball")
+    eventer.emit(None, LackOfProgress, type="robot", robot_name="Y1")
+
+    assert events[0] is events[1]
+
+
+def test_dispatch_finished_when_handler_fails(eventer: Eventer):
+    eventer.profiler = MagicMock()
+    handler = EventHandler()
+    handler.handle = MagicMock(side_effect=RuntimeError)
+    eventer.subscribe(handler)
+
+    with pytest.raises(RuntimeError):
+        eventer.emit(None, LackOfProgress, type="ball")
+    with pytest.raises(RuntimeError):
+        eventer.event(None, "GOAL")
+    assert eventer.profiler.dispatch_finished.call_count == 2
+
+
+def test_emit_async(eventer: Eventer):
+    typed = TypedHandler()
+    eventer.subscribe(typed, delivery=EventDelivery.ASYNC.value)
+
+    for score in range(10):
+        eventer.emit(
+            None, Goal, team_name="Blues", score_yellow=0, score_blue=score
+        )
+    eventer.emit(
+        None,
+        MatchFinish,
+        total_match_time=600,
+        score_yellow=0,
+        score_blue=9,
+        team_name_yellow="Yellows",
+        team_name_blue="Blues",
+    )
+
+    # Copied before being queued, the pooled events get overwritten
+    assert [event.score_blue for event in typed.events] == list(range(10))
+    assert not eventer.async_subscriptions[0]._thread.is_alive()
+
+
+def test_subscribe_unexpected_event_type(eventer: Eventer):
+    handler = EventHandler()
+    handler.event_types = ("OFFSIDE",)
+
+    with pytest.raises(ValueError):
+        eventer.subscribe(handler)
+
+
+def test_emit_async_coalesce(eventer: Eventer):
+    handler = GatedHandler()
+    subscribe_coalesced(eventer, handler)
+    hold_up(eventer, handler)
+
+    eventer.emit(None, Kickoff, robot_name="B1", team_name="B")
+    eventer.emit(None, LackOfProgress, type="robot", robot_name="B1")
+    eventer.emit(None, Goal, team_name="Blues", score_yellow=0, score_blue=1)
+    eventer.emit(None, Kickoff, robot_name="Y1", team_name="Y")
+    eventer.emit(None, LackOfProgress, type="robot", robot_name="B2")
+    eventer.emit(None, Goal, team_name="Blues", score_yellow=0, score_blue=2)
+    eventer.emit(None, Kickoff, robot_name="B1", team_name="B")
+
+    handler.gate.set()
+    eventer.drain()
+    assert handler.events[1:] == [
+        ("KICKOFF", {"robot_name": "B1", "team_name": "B"}),
+        ("LACK_OF_PROGRESS", {"type": "robot", "robot_name": "B1"}),
+        ("GOAL", {"team_name": "Blues", "score_yellow": 0, "score_blue": 1}),
+        ("KICKOFF", {"robot_name": "Y1", "team_name": "Y"}),
+        ("LACK_OF_PROGRESS", {"type": "robot", "robot_name": "B2"}),
+        ("GOAL", {"team_name": "Blues", "score_yellow": 0, "score_blue": 2}),
+    ]
+    assert eventer.async_subscriptions[0].dropped == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from referee.enums import GameEvents
+from referee.events import (
+    EVENT_CLASSES,
+    EventPool,
+    Goal,
+    LackOfProgress,
+    Stats,
+)
+
+
+def test_event_class_for_each_game_event():
+    assert set(EVENT_CLASSES) == {event.value for event in GameEvents}
+
+
+@pytest.mark.parametrize("cls", EVENT_CLASSES.values())
+def test_events_have_slots_only(cls):
+    with pytest.raises(AttributeError):
+        cls().unexpected = 1
+
+
+def test_payload():
+    goal = Goal().set(team_name="Blues", score_yellow=0, score_blue=1)
+    assert goal.payload() == {
+        "team_name": "Blues",
+        "score_yellow": 0,
+        "score_blue": 1,
+    }
+
+    event = LackOfProgress().set(type="robot", robot_name="B1")
+    assert event.payload() == {"type": "robot", "robot_name": "B1"}
+    event.set(type="ball")
+    assert event.payload() == {"type": "ball"}
+
+    stats = {"ticks": 10}
+    assert Stats().set(stats=stats).payload() is stats
+
+
+def test_copy():
+    goal = Goal().set(team_name="Blues", score_yellow=0, score_blue=1)
+    copy = goal.copy()
+    goal.set(team_name="Yellows", score_yellow=1, score_blue=1)
+
+    assert copy is not goal
+    assert copy.payload() == {
+        "team_name": "Blues",
+        "score_yellow": 0,
+        "score_blue": 1,
+    }
+
+
+def test_pool_reuses_events():
+    pool = EventPool()
+    goal = pool.acquire(Goal)
+    assert isinstance(goal, Goal)
+
+    pool.release(goal)
+    assert pool.acquire(Goal) is goal
+    assert pool.acquire(Goal) is not goal
@@ -0,0 +1,151 @@
+import math
+from array import array
+
+from referee.consts import (
+    DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT,
+    N_OBJECTS,
+    NEUTRAL_SPOTS,
+    OBJECT_IDS,
+    OBJECT_NAMES,
+)
+from referee.neutral_spots import NEUTRAL_SPOT_NAMES, NeutralSpotIndex
+
+
+def positions(**objects) -> array:
+    """Flat translations with all the objects far from any neutral spot,
+    apart from the ones specified."""
+    translations = array("d", [0.6, 0.7, 0.0]) * N_OBJECTS
+    for name, (x, y) in objects.items():
+        offset = OBJECT_IDS[name] * 3
+        translations[offset], translations[offset + 1] = x, y
+    return translations
+
+
+def brute_force(translations, object_id, furthest):
+    """The algorithm the index replaced."""
+    x, y = translations[object_id * 3], translations[object_id * 3 + 1]
+    pairs = []
+    for ns, (ns_x, ns_y) in NEUTRAL_SPOTS.items():
+        occupied = False
+        for offset in range(0, N_OBJECTS * 3, 3):
+            ox, oy = translations[offset], translations[offset + 1]
+            distance = math.sqrt((ox - ns_x) ** 2 + (oy - ns_y) ** 2)
+            if distance < DISTANCE_AROUND_UNOCCUPIED_NEUTRAL_SPOT:
+                occupied = True
+        if not occupied:
+            pairs.append((ns, math.sqrt((x - ns_x) ** 2 + (y - ns_y) ** 2)))
+    return sorted(pairs, key=lambda pair: pair[1], reverse=furthest)
+
+
+def test_occupied_spots():
+    index = NeutralSpotIndex()
+    x, y = NEUTRAL_SPOTS["yellow_left_ns"]
+    index.update(positions(ball=(0.01, 0.0), Y2=(x, y - 0.07)))
+
+    occupied = [
+        NEUTRAL_SPOT_NAMES[i]
+        for i in range(len(NEUTRAL_SPOT_NAMES))
+        if index.is_spot_occupied(i)
+    ]
+    assert occupied == ["center_ns", "yellow_left_ns"]
+    assert index.occupied_spots == 3
+
+
+def test_get_unoccupied_sorted_matches_brute_force():
+    translations = positions(
+        ball=(0.01, 0.0),
+        B1=(0.0, 0.18),
+        B2=(-0.3, -0.25),
+        Y1=(0.3, 0.3),
+        Y2=(0.0, -0.4),
+    )
+    index = NeutralSpotIndex()
+    index.update(translations)
+
+    for name in OBJECT_NAMES:
+        object_id = OBJECT_IDS[name]
+        for furthest in (False, True):
+            expected = brute_force(translations, object_id, furthest)
+            result = index.get_unoccupied_sorted(object_id, furthest)
+            assert [ns for ns, _ in result] == [ns for ns, _ in expected]
+            for (_, distance), (_, expected_distance) in zip(result, expected):
+                assert math.isclose(distance, expected_distance)
+
+
+def test_update_invalidates_orderings():
+    index = NeutralSpotIndex()
+    b1 = OBJECT_IDS["B1"]
+
+    index.update(positions(B1=(0.0, 0.5)))
+    assert index.get_unoccupied_sorted(b1)[0][0] == "blue_middle_ns"
+
+    index.update(positions(B1=(0.0, -0.5)))
+    nearest = index.get_unoccupied_sorted(b1)
+    assert nearest[0][0] == "yellow_middle_ns"
+    assert index.get_unoccupied_sorted(b1, furthest=True)[-1] == nearest[0]
+
+
+def test_allocate_gives_distinct_spots():
+    index = NeutralSpotIndex()
+    # Everyone is close to the center, which is blocked by the ball
+    index.update(
+        positions(
+            ball=(0.0, 0.0),
+            B1=(0.02, 0.05),
+            B2=(-0.02, 0.05),
+            Y1=(0.02, -0.05),
+            Y2=(-0.02, -0.05),
+        )
+    )
+    requests = [(OBJECT_IDS[name], False) for name in ("B1", "B2", "Y1")]
+    requests.append((OBJECT_IDS["Y2"], True))
+
+    spots = index.allocate(requests, choose=lambda spots: spots[0])
+
+    assert spots[:3] == [
+        "blue_middle_ns",
+        "yellow_middle_ns",
+        "yellow_right_ns",
+    ]
+    assert spots[3] not in spots[:3]
+    assert "center_ns" not in spots
+    assert len(set(spots)) == len(spots)
+
+
+def test_allocate_frees_spots_of_moved_objects():
+    index = NeutralSpotIndex()
+    x, y = NEUTRAL_SPOTS["blue_middle_ns"]
+    index.update(positions(ball=(x, y), B1=(0.0, 0.3)))
+
+    # The ball leaves its spot before B1 looks for one
+    spots = index.allocate(
+        [(OBJECT_IDS["ball"], False), (OBJECT_IDS["B1"], False)],
+        choose=lambda spots: spots[0],
+    )
+    assert spots == ["center_ns", "blue_middle_ns"]
+
+    # B1 has to wait for the ball to leave
+    spots = index.allocate(
+        [(OBJECT_IDS["B1"], False), (OBJECT_IDS["ball"], False)],
+        choose=lambda spots: spots[0],
+    )
+    assert spots[0] != "blue_middle_ns"
+    assert spots[1] != spots[0]
+
+
+def test_allocate_without_free_spots():
+    index = NeutralSpotIndex()
+    index.update(
+        positions(
+            **{
+                name: NEUTRAL_SPOTS[spot]
+                for name, spot in zip(OBJECT_NAMES, NEUTRAL_SPOT_NAMES)
+            }
+        )
+    )
+
+    # The last object has nowhere to go as all the others stay on spots
+    spots = index.allocate(
+        [(OBJECT_IDS["ball"], True)], choose=lambda spots: spots[0]
+    )
+    assert spots == [None]
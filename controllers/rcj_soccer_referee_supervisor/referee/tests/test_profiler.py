@@ -0,0 +1,80 @@
+from referee import profiler
+from referee.profiler import LogLinearHistogram, TickProfiler
+
+
+def test_histogram_buckets_are_exact_below_sub_buckets():
+    for value in range(profiler.SUB_BUCKETS):
+        bucket = LogLinearHistogram.bucket(value)
+        assert LogLinearHistogram.bucket_range(bucket) == (value, value)
+
+
+def test_histogram_buckets_contain_their_values():
+    for value in (16, 31, 32, 33, 1000, 32000, 123456789):
+        low, high = LogLinearHistogram.bucket_range(
+            LogLinearHistogram.bucket(value)
+        )
+        assert low <= value <= high
+        assert high - low < max(1, value / 8)
+
+
+def test_histogram_percentiles():
+    histogram = LogLinearHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert histogram.count == 1000
+    assert histogram.max == 1000
+    assert abs(histogram.percentile(50) - 500) <= 500 / 16
+    assert abs(histogram.percentile(99) - 990) <= 990 / 16
+    assert histogram.percentile(100) == 1000
+    assert LogLinearHistogram().percentile(50) == 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, microseconds: int):
+        self.now += microseconds * 1000
+
+
+def test_tick_profiler_phases(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(profiler.time, "perf_counter_ns", clock)
+    tick_profiler = TickProfiler(time_step=32)
+
+    # Laps before the first step are ignored
+    tick_profiler.lap("before")
+
+    for _ in range(2):
+        tick_profiler.step_started()
+        clock.advance(500)
+        tick_profiler.step_finished()
+
+        clock.advance(100)
+        tick_profiler.lap("first")
+        clock.advance(20)
+        tick_profiler.dispatch_started()
+        clock.advance(1000)
+        tick_profiler.dispatch_finished()
+        clock.advance(30)
+        tick_profiler.lap("second")
+
+    stats = tick_profiler.stats()
+    assert stats["ticks"] == 2
+    assert stats["simulated_time"] == 0.064
+    assert stats["step"]["total_ms"] == 1.0
+    assert stats["dispatch"]["total_ms"] == 2.0
+    assert list(stats["phases"]) == ["first", "second"]
+    assert stats["phases"]["first"]["p50_ms"] == 0.1
+    # The dispatch is left out of the phase
+    assert stats["phases"]["second"]["max_ms"] == 0.05
+    assert stats["wall_time"] == 0.0033
+    assert stats["real_time_factor"] == 0.064 / 0.0033
+
+
+def test_tick_profiler_without_steps():
+    assert TickProfiler().stats() is None
@@ -1,6 +1,8 @@
+import random
+
 import pytest
 
-from referee.progress_checker import ProgressChecker
+from referee.progress_checker import ProgressChecker, ProgressCheckerBank
 
 
 @pytest.fixture
@@ -69,3 +71,62 @@ def test_progress_ok(checker: ProgressChecker):
 
     checker.track([0.5, 0.0, 0.0])
     assert checker.is_progress()
+
+
+@pytest.fixture
+def bank() -> ProgressCheckerBank:
+    return ProgressCheckerBank({"robot": (235, 0.5), "ball": (10, 0.05)})
+
+
+def test_bank_initialize(bank: ProgressCheckerBank):
+    assert len(bank.samples) == 245
+    assert bank.offsets == [0, 235]
+    assert bank["robot"].is_progress()
+    assert bank["ball"].is_progress()
+
+
+def test_bank_no_progress(bank: ProgressCheckerBank):
+    x = 0.0
+    bank["robot"].track([x, 0.0, 0.0])
+    for _ in range(234):
+        x += 0.002
+        bank["robot"].track([x, 0.0, 0.0])
+        assert bank["robot"].is_progress()
+
+    bank["robot"].track([x + 0.002, 0.0, 0.0])
+    assert not bank["robot"].is_progress()
+    # The other objects are not affected
+    assert bank["ball"].is_progress()
+
+
+def test_bank_reset_gives_benefit_of_doubt(bank: ProgressCheckerBank):
+    for _ in range(20):
+        bank["ball"].track([0.0, 0.0, 0.0])
+    assert not bank["ball"].is_progress()
+
+    bank["ball"].reset()
+    for _ in range(10):
+        bank["ball"].track([0.0, 0.0, 0.0])
+        assert bank["ball"].is_progress()
+
+    bank["ball"].track([0.0, 0.0, 0.0])
+    assert not bank["ball"].is_progress()
+
+
+def test_bank_matches_progress_checker(bank: ProgressCheckerBank):
+    rng = random.Random(42)
+    checker = ProgressChecker(steps=10, threshold=0.05)
+    x, y = 0.0, 0.0
+    for i in range(2000):
+        if i % 300 == 299:
+            checker.reset()
+            bank["ball"].reset()
+
+        step = 0.01 if (i // 50) % 2 else 0.001
+        x += rng.uniform(-step, step)
+        y += rng.uniform(-step, step)
+        checker.track([x, y, 0.0])
+        bank["ball"].track([x, y, 0.0])
+
+        assert bank["ball"].is_progress() == checker.is_progress()
+        assert bank.sums[1] == pytest.approx(sum(checker.samples))
@@ -5,7 +5,14 @@ sys.modules["controller"] = MagicMock()
 
 import pytest
 
-from referee.consts import MAX_EVENT_MESSAGES_IN_QUEUE
+from referee.consts import (
+    MAX_EVENT_MESSAGES_IN_QUEUE,
+    SUPERVISOR_PACKET,
+    SUPERVISOR_PACKET_HEARTBEAT,
+    SUPERVISOR_PACKET_VERSION,
+    WAITING_FOR_KICKOFF_FLAG,
+)
+from referee.enums import SupervisorPacketMode
 from referee.referee import RCJSoccerReferee
 
 
@@ -32,7 +39,48 @@ def referee() -> RCJSoccerReferee:
 
 
 def test_pack_packet(referee: RCJSoccerReferee):
-    assert referee._pack_data() == '{"waiting_for_kickoff": false}'
+    assert SUPERVISOR_PACKET.unpack(referee._pack_data()) == (
+        SUPERVISOR_PACKET_VERSION,
+        0,
+        0,
+    )
+
+    referee.ball_reset_timer = 3
+    referee.packet_sequence = 7
+    assert SUPERVISOR_PACKET.unpack(referee._pack_data()) == (
+        SUPERVISOR_PACKET_VERSION,
+        WAITING_FOR_KICKOFF_FLAG,
+        7,
+    )
+
+
+def test_emit_data_on_every_tick(referee: RCJSoccerReferee):
+    for _ in range(3):
+        referee.emit_data()
+
+    packets = [c.args[0] for c in referee.sv.emit_data.call_args_list]
+    sequences = [SUPERVISOR_PACKET.unpack(p)[2] for p in packets]
+    assert sequences == [0, 1, 2]
+
+
+def test_emit_data_changes_only(referee: RCJSoccerReferee):
+    referee.supervisor_packets = SupervisorPacketMode.CHANGES.value
+    emit = referee.sv.emit_data
+
+    # The first packet, then only the heartbeat
+    for _ in range(SUPERVISOR_PACKET_HEARTBEAT):
+        referee.emit_data()
+    assert emit.call_count == 1
+    referee.emit_data()
+    assert emit.call_count == 2
+
+    # The change is sent right away
+    referee.ball_reset_timer = 3
+    referee.emit_data()
+    assert emit.call_count == 3
+    version, flags, sequence = SUPERVISOR_PACKET.unpack(emit.call_args.args[0])
+    assert flags == WAITING_FOR_KICKOFF_FLAG
+    assert sequence == 2
 
 
 def test_add_initial_position_noise(referee: RCJSoccerReferee):
@@ -59,3 +107,16 @@ def test_add_event_message_to_queue(referee: RCJSoccerReferee):
         str(MAX_EVENT_MESSAGES_IN_QUEUE + 1),
     )
     assert referee.event_messages_to_draw[0] == (referee.time, "2")
+
+
+def test_event_messages_drawn_when_changed(referee: RCJSoccerReferee):
+    draw = referee.sv.draw_event_messages
+    draw.reset_mock()
+
+    referee.process_and_draw_event_messages()
+    draw.assert_not_called()
+
+    referee.add_event_message_to_queue("Ball: Lack of progress.")
+    referee.process_and_draw_event_messages()
+    referee.process_and_draw_event_messages()
+    draw.assert_called_once_with(["10:00 - Ball: Lack of progress."])
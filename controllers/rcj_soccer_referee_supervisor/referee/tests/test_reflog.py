@@ -0,0 +1,136 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from referee.consts import TIME_STEP
+from referee.enums import GameEvents
+from referee.reflog import (
+    BinaryLoggerHandler,
+    HEADER,
+    RECORD,
+    ReflogReader,
+    TRAILER,
+)
+
+EVENTS = [
+    (0, GameEvents.KICKOFF.value, {"robot_name": "B3", "team_name": "B"}),
+    (0, GameEvents.MATCH_START.value, {"total_match_time": 600}),
+    (100, GameEvents.LACK_OF_PROGRESS.value, {"type": "ball"}),
+    (250, GameEvents.GOAL.value, {"team_name": "Blues"}),
+    (250, GameEvents.LACK_OF_PROGRESS.value, {"type": "ball"}),
+    (400, "CUSTOM", None),
+    (18751, GameEvents.MATCH_FINISH.value, {"score_blue": 1}),
+]
+
+
+@pytest.fixture
+def reflog(tmp_path):
+    logfile = tmp_path / "reflog.rlog"
+    handler = BinaryLoggerHandler(logfile)
+    referee = SimpleNamespace(match_time=600, time=600)
+    for tick, type, payload in EVENTS:
+        referee.time = 600 - tick * TIME_STEP / 1000
+        handler.handle(referee, type, payload)
+    return logfile
+
+
+def test_records(reflog):
+    with ReflogReader(reflog) as reader:
+        records = list(reader)
+        assert len(reader) == len(EVENTS)
+        assert reader[3] == records[3]
+        # The same payloads are only stored once
+        assert len(reader.payloads) == 5
+
+    assert [(r.tick, r.event, r.payload) for r in records] == EVENTS
+
+
+def test_seek_time(reflog):
+    with ReflogReader(reflog) as reader:
+        assert reader.seek_time(0) == 0
+        assert reader.seek_time(3.2) == 2
+        assert reader.seek_time(3.3) == 3
+        assert reader.seek_time(8) == 3
+        assert reader.seek_time(1000) == len(EVENTS)
+
+        events = [record.event for record in reader.iter_from_time(8)]
+        assert events == ["GOAL", "LACK_OF_PROGRESS", "CUSTOM", "MATCH_FINISH"]
+
+
+def test_iter_events(reflog):
+    with ReflogReader(reflog) as reader:
+        ticks = [r.tick for r in reader.iter_events("LACK_OF_PROGRESS")]
+        assert ticks == [100, 250]
+        assert list(reader.iter_events("INSIDE_PENALTY_FOR_TOO_LONG")) == []
+
+
+def test_write_jsonl(reflog, tmp_path):
+    path = tmp_path / "reflog.jsonl"
+    with ReflogReader(reflog) as reader:
+        reader.write_jsonl(path)
+
+    with path.open() as f:
+        events = [json.loads(line) for line in f]
+
+    assert events[2]["matchtime"] == 3.2
+    assert events[2]["event"] == "LACK_OF_PROGRESS"
+    assert events[2]["payload"] == {"type": "ball"}
+    assert "payload" not in events[5]
+    assert events[0]["datetime"].endswith("Z")
+
+
+def test_truncated_reflog(tmp_path):
+    logfile = tmp_path / "reflog.rlog"
+    handler = BinaryLoggerHandler(logfile)
+    handler.handle(
+        SimpleNamespace(match_time=600, time=599),
+        GameEvents.GOAL.value,
+        {"team_name": "Blues"},
+    )
+
+    # Flushed as a durable event, but without the footer yet
+    with ReflogReader(logfile) as reader:
+        assert reader.recovered
+        assert [(r.tick, r.event, r.payload) for r in reader] == [
+            (31, "GOAL", None)
+        ]
+
+    handler.close()
+    with ReflogReader(logfile) as reader:
+        assert not reader.recovered
+        assert reader[0].payload == {"team_name": "Blues"}
+
+
+@pytest.mark.parametrize("cut", [1, TRAILER.size, TRAILER.size + 20])
+def test_recover_reflog(reflog, cut):
+    # Cut off in the middle of the trailer or of the footer
+    with reflog.open("r+b") as f:
+        f.truncate(reflog.stat().st_size - cut)
+
+    with ReflogReader(reflog) as reader:
+        assert reader.recovered
+        assert [(r.tick, r.event) for r in reader] == [
+            (tick, event.replace("CUSTOM", f"UNKNOWN_{len(GameEvents)}"))
+            for tick, event, _ in EVENTS
+        ]
+        ticks = [r.tick for r in reader.iter_events("LACK_OF_PROGRESS")]
+        assert ticks == [100, 250]
+        assert reader.seek_time(8) == 3
+
+
+def test_recover_reflog_cut_record(reflog):
+    # Cut off in the middle of the third record
+    with reflog.open("r+b") as f:
+        f.truncate(HEADER.size + 3 * RECORD.size - 1)
+
+    with ReflogReader(reflog) as reader:
+        assert len(reader) == 2
+        assert list(reader.index) == ["KICKOFF", "MATCH_START"]
+
+
+def test_not_reflog(tmp_path):
+    logfile = tmp_path / "reflog.rlog"
+    logfile.write_bytes(b"RCJ")
+    with pytest.raises(ValueError):
+        ReflogReader(logfile)
@@ -0,0 +1,84 @@
+from headless import install
+
+install()
+
+import pytest
+
+from headless.controller import use_world
+from headless.match import create_referee
+from headless.world import idle, World
+from referee.consts import N_OBJECTS, ROBOT_NAMES, TIME_STEP
+from referee.enums import RefereePhase
+from referee.snapshot import TickSubscriber, WorldSnapshot
+from referee.supervisor import RCJSoccerSupervisor
+
+
+class Collector(TickSubscriber):
+    def __init__(self):
+        self.snapshots = []
+        self.ticks = []
+
+    def handle_tick(self, snapshot: WorldSnapshot):
+        self.snapshots.append(snapshot)
+        self.ticks.append(
+            (
+                snapshot.sequence,
+                round(snapshot.time, 3),
+                snapshot.score_blue,
+                snapshot.score_yellow,
+                snapshot.waiting_for_kickoff,
+            )
+        )
+
+
+@pytest.fixture
+def supervisor() -> RCJSoccerSupervisor:
+    use_world(World({robot: idle() for robot in ROBOT_NAMES}))
+    return RCJSoccerSupervisor()
+
+
+def test_snapshot_is_read_only(supervisor):
+    snapshot = WorldSnapshot(supervisor)
+    snapshot.update(10.0, 1, 2, True)
+
+    assert (snapshot.sequence, snapshot.time) == (0, 10.0)
+    assert (snapshot.score_blue, snapshot.score_yellow) == (1, 2)
+    assert snapshot.phase == RefereePhase.GOAL_SCORED.value
+    assert snapshot.translations.shape == (N_OBJECTS, 3)
+    assert snapshot.translations.readonly
+    assert snapshot.rotations.readonly
+    with pytest.raises(AttributeError):
+        snapshot.score_blue = 3
+    with pytest.raises(AttributeError):
+        snapshot.extra = None
+
+
+def test_tick_subscribers(supervisor):
+    referee = create_referee(supervisor, match_time=10, seed=1)
+    first, second = Collector(), Collector()
+    referee.add_tick_subscriber(first)
+    referee.add_tick_subscriber(second)
+    referee.kickoff()
+
+    for _ in range(2):
+        supervisor.step(TIME_STEP)
+        referee.tick()
+    referee.score_blue = 1
+    referee.ball_reset_timer = 3
+    supervisor.step(TIME_STEP)
+    referee.tick()
+
+    # The very same snapshot, moved on from tick to tick
+    assert all(s is referee.snapshot for s in first.snapshots)
+    assert first.ticks == second.ticks
+    assert first.ticks == [
+        (0, 10.0, 0, 0, False),
+        (1, 9.968, 0, 0, False),
+        (2, 9.936, 1, 0, True),
+    ]
+
+    referee.remove_tick_subscriber(second)
+    supervisor.step(TIME_STEP)
+    referee.tick()
+    assert len(first.ticks) == 4
+    assert len(second.ticks) == 3
@@ -0,0 +1,151 @@
+from headless import install
+
+install()
+
+import pytest
+
+from headless.controller import use_world
+from headless.world import World
+from referee.consts import (
+    BALL_ID,
+    N_OBJECTS,
+    N_ROBOTS,
+    OBJECT_IDS,
+    ROBOT_INITIAL_TRANSLATION,
+)
+from referee.supervisor import RCJSoccerSupervisor
+
+
+@pytest.fixture
+def world() -> World:
+    world = World()
+    use_world(world)
+    return world
+
+
+@pytest.fixture
+def supervisor(world: World) -> RCJSoccerSupervisor:
+    return RCJSoccerSupervisor()
+
+
+def test_pose_buffers_shape(supervisor: RCJSoccerSupervisor):
+    assert supervisor.translations.shape == (N_OBJECTS, 3)
+    assert supervisor.rotations.shape == (N_ROBOTS, 4)
+    assert supervisor.translations.readonly
+    assert supervisor.rotations.readonly
+
+
+def test_initial_positions(supervisor: RCJSoccerSupervisor):
+    assert list(supervisor.get_robot_translation("B1")) == (
+        ROBOT_INITIAL_TRANSLATION["B1"]
+    )
+    assert list(supervisor.get_ball_translation()) == [0.0, 0.0, 0.0]
+
+
+def test_update_positions_in_place(
+    world: World, supervisor: RCJSoccerSupervisor
+):
+    translation = supervisor.get_robot_translation("Y2")
+    world.bodies["Y2"].translation = [0.1, 0.2, 0.3]
+    world.bodies["BALL"].translation = [0.4, 0.5, 0.6]
+    supervisor.update_positions()
+
+    assert list(translation) == [0.1, 0.2, 0.3]
+    assert supervisor.translations[OBJECT_IDS["Y2"], 1] == 0.2
+    assert supervisor.translations[BALL_ID, 0] == 0.4
+
+
+def test_views_are_read_only(supervisor: RCJSoccerSupervisor):
+    with pytest.raises(TypeError):
+        supervisor.get_robot_translation("B1")[0] = 1.0
+
+
+def test_set_robot_position(world: World, supervisor: RCJSoccerSupervisor):
+    supervisor.set_robot_position("B2", [0.1, 0.1, 0.042])
+    supervisor.set_robot_rotation("B2", [0, 0, 1, 0.5])
+
+    assert list(supervisor.get_robot_translation("B2")) == [0.1, 0.1, 0.042]
+    assert list(supervisor.get_robot_rotation("B2")) == [0, 0, 1, 0.5]
+
+    # Webots only gets the commands right before the next step
+    assert world.bodies["B2"].translation != [0.1, 0.1, 0.042]
+    supervisor.flush_commands()
+    assert world.bodies["B2"].translation == [0.1, 0.1, 0.042]
+    assert world.bodies["B2"].rotation == [0, 0, 1, 0.5]
+
+
+def test_commands_are_coalesced(
+    world: World, supervisor: RCJSoccerSupervisor, monkeypatch
+):
+    calls = []
+    body = world.bodies["B1"]
+    monkeypatch.setattr(body, "stop", lambda: calls.append("resetPhysics"))
+
+    supervisor.set_robot_position("B1", [0.1, 0.1, 0.042])
+    supervisor.set_robot_position("B1", [0.2, 0.2, 0.042])
+    supervisor.reset_robot_velocity("B1")
+    supervisor.reset_robot_velocity("B1")
+    supervisor.update_positions()
+    assert list(supervisor.get_robot_translation("B1")) == [0.2, 0.2, 0.042]
+
+    body.velocity = [1.0] * 6
+    supervisor.step(32)
+    assert calls == ["resetPhysics"]
+    assert body.velocity == [0.0] * 6
+
+    # The moved robot gets its physics reset once more after the step
+    supervisor.step(32)
+    assert calls == ["resetPhysics", "resetPhysics"]
+    supervisor.step(32)
+    assert len(calls) == 2
+
+
+def test_neutral_spot_occupied(supervisor: RCJSoccerSupervisor):
+    # The ball lies on the center spot at the beginning
+    assert supervisor.is_neutral_spot_occupied(0, 0)
+    assert not supervisor.is_neutral_spot_occupied(0, 0.2)
+
+    supervisor.set_robot_position("B1", [0.01, 0.2, 0.042])
+    assert supervisor.is_neutral_spot_occupied(0, 0.2)
+
+
+def test_unoccupied_neutral_spots_sorted(supervisor: RCJSoccerSupervisor):
+    supervisor.set_robot_position("B1", [0.0, 0.18, 0.042])
+    nearest = supervisor.get_unoccupied_neutral_spots_sorted("NEAREST", "B1")
+    spots = [spot for spot, _ in nearest]
+
+    assert "center_ns" not in spots
+    assert "blue_middle_ns" not in spots
+    assert "blue_right_ns" not in spots  # B2 stands there
+    assert spots[0] == "blue_left_ns"
+    assert [d for _, d in nearest] == sorted(d for _, d in nearest)
+
+
+def test_labels_are_only_sent_when_changed(
+    supervisor: RCJSoccerSupervisor, monkeypatch
+):
+    calls = []
+    monkeypatch.setattr(
+        supervisor, "setLabel", lambda id, *args: calls.append((id, args[0]))
+    )
+
+    for time in (600, 599.99, 599.5, 599.01):
+        supervisor.draw_time(time)
+    supervisor.draw_time(598.97)
+    assert calls == [(2, "10:00"), (2, "09:59"), (2, "09:58")]
+
+    calls.clear()
+    for _ in range(3):
+        supervisor.draw_goal_sign()
+        supervisor.draw_scores(1, 0)
+    supervisor.hide_goal_sign()
+    assert calls == [(4, "GOAL!"), (0, "1"), (1, "0"), (4, "")]
+
+
+def test_labels_not_rendered(world: World):
+    supervisor = RCJSoccerSupervisor(render_labels=False)
+    supervisor.draw_time(600)
+    supervisor.draw_scores(1, 0)
+    supervisor.draw_event_messages(["Ball: Lack of progress."])
+
+    assert supervisor.labels == {}
@@ -0,0 +1,46 @@
+from array import array
+
+from referee.consts import BALL_ID, N_OBJECTS, OBJECT_IDS
+from referee.enums import Zone
+from referee.penalty_area_checker import PenaltyAreaChecker
+from referee.utils import is_in_blue_goal, is_in_yellow_goal, is_outside
+from referee.zones import zone_mask, ZoneClassifier
+
+
+def positions(**objects) -> array:
+    """Flat translations with all the objects far from any neutral spot,
+    apart from the ones specified."""
+    translations = array("d", [0.6, 0.7, 0.0]) * N_OBJECTS
+    for name, (x, y) in objects.items():
+        offset = OBJECT_IDS[name] * 3
+        translations[offset], translations[offset + 1] = x, y
+    return translations
+
+
+def test_zone_mask_matches_scalar_checks():
+    checker = PenaltyAreaChecker(time_allowed=15, reset_after=2)
+    xs = [i / 1000 for i in range(-700, 701, 10)]
+    ys = [i / 1000 for i in range(-900, 901, 10)]
+    for x in xs:
+        for y in ys:
+            mask = zone_mask(x, y)
+            expected = [
+                is_outside(x, y),
+                is_in_blue_goal(x, y),
+                is_in_yellow_goal(x, y),
+                checker.is_in_blue_penalty(x, y),
+                checker.is_in_yellow_penalty(x, y),
+            ]
+            assert [bool(mask & zone.value) for zone in Zone] == expected
+
+
+def test_classify():
+    classifier = ZoneClassifier()
+    classifier.classify(positions(ball=(0.0, 0.8), B1=(0.0, -0.7), Y1=(1, 0)))
+
+    assert classifier.masks[BALL_ID] == (
+        Zone.BLUE_GOAL.value | Zone.BLUE_PENALTY.value
+    )
+    assert classifier.masks[OBJECT_IDS["B1"]] == Zone.YELLOW_PENALTY.value
+    assert classifier.masks[OBJECT_IDS["Y1"]] == Zone.OUTSIDE.value
+    assert classifier.masks[OBJECT_IDS["Y2"]] == 0
@@ -0,0 +1,94 @@
+from array import array
+from typing import Sequence
+
+from referee.consts import (
+    BLUE_PENALTY_AREA,
+    FIELD_X_LOWER_LIMIT,
+    FIELD_X_UPPER_LIMIT,
+    FIELD_Y_LOWER_LIMIT,
+    FIELD_Y_UPPER_LIMIT,
+    GOAL_BLUE_BACK_WALL_Y_LIMIT,
+    GOAL_BLUE_Y_LIMIT,
+    GOAL_X_LOWER_LIMIT,
+    GOAL_X_UPPER_LIMIT,
+    GOAL_YELLOW_BACK_WALL_Y_LIMIT,
+    GOAL_YELLOW_Y_LIMIT,
+    N_OBJECTS,
+    YELLOW_PENALTY_AREA,
+)
+from referee.enums import Zone
+
+OUTSIDE = Zone.OUTSIDE.value
+BLUE_GOAL = Zone.BLUE_GOAL.value
+YELLOW_GOAL = Zone.YELLOW_GOAL.value
+BLUE_PENALTY = Zone.BLUE_PENALTY.value
+YELLOW_PENALTY = Zone.YELLOW_PENALTY.value
+
+IN_GOAL = BLUE_GOAL | YELLOW_GOAL
+IN_PENALTY = BLUE_PENALTY | YELLOW_PENALTY
+
+Y_VERTICAL, Y_LOWER, Y_UPPER = YELLOW_PENALTY_AREA
+B_VERTICAL, B_LOWER, B_UPPER = BLUE_PENALTY_AREA
+
+
+def _goal_mask(x: float, y: float) -> int:
+    if GOAL_X_LOWER_LIMIT < x < GOAL_X_UPPER_LIMIT:
+        if GOAL_BLUE_Y_LIMIT < y < GOAL_BLUE_BACK_WALL_Y_LIMIT:
+            return BLUE_GOAL
+        if GOAL_YELLOW_BACK_WALL_Y_LIMIT < y < GOAL_YELLOW_Y_LIMIT:
+            return YELLOW_GOAL
+    return 0
+
+
+def zone_mask(x: float, y: float) -> int:
+    """Return the zones the object at the given position is located in.
+
+    The limits are the same as the ones used by is_outside,
+    is_in_blue_goal, is_in_yellow_goal and PenaltyAreaChecker.
+
+    Args:
+        x (float): X position
+        y (float): Y position
+
+    Returns:
+        int: Bitmask of Zone values
+    """
+    mask = _goal_mask(x, y)
+
+    if not FIELD_X_LOWER_LIMIT <= x <= FIELD_X_UPPER_LIMIT:
+        mask |= OUTSIDE
+    elif not FIELD_Y_LOWER_LIMIT <= y <= FIELD_Y_UPPER_LIMIT and not mask:
+        mask |= OUTSIDE
+
+    if y > B_VERTICAL and B_LOWER < x < B_UPPER:
+        mask |= BLUE_PENALTY
+    elif y < Y_VERTICAL and Y_LOWER < x < Y_UPPER:
+        mask |= YELLOW_PENALTY
+
+    return mask
+
+
+class ZoneClassifier:
+    """Compute the zones (goals, outside, penalty areas) all the objects are
+    located in, in a single pass over their positions.
+
+    The results are kept in a preallocated buffer: ``masks`` holds a bitmask
+    of Zone values for each object ID.
+    """
+
+    def __init__(self):
+        self.masks = array("B", bytes(N_OBJECTS))
+
+    def classify(self, translations: Sequence[float]):
+        """Classify all the objects into zones.
+
+        Args:
+            translations (Sequence[float]): Flat N_OBJECTS x 3 block of
+                positions, indexed by object ID
+        """
+        masks = self.masks
+        for object_id in range(N_OBJECTS):
+            offset = object_id * 3
+            masks[object_id] = zone_mask(
+                translations[offset], translations[offset + 1]
+            )
@@ -0,0 +1,35 @@
+import argparse
+import time
+
+from referee.utils import time_to_string
+from telemetry.reader import TelemetryReader
+
+parser = argparse.ArgumentParser(
+    prog="python -m telemetry",
+    description="Follow the score and the events of a match being played.",
+)
+parser.add_argument("name", help="Name of the telemetry (RCJ_SIM_TELEMETRY)")
+parser.add_argument(
+    "--interval",
+    type=float,
+    default=1.0,
+    help="Seconds between the updates",
+)
+args = parser.parse_args()
+
+with TelemetryReader(args.name) as reader:
+    while True:
+        finished = reader.finished
+        for event in reader.poll_events():
+            payload = "" if event.payload is None else f" {event.payload}"
+            print(f"[{event.matchtime:7.2f}] {event.type}{payload}")
+
+        frame = reader.latest()
+        if frame is not None:
+            print(
+                f"{time_to_string(max(frame.time, 0))} "
+                f"{frame.score_blue}:{frame.score_yellow}"
+            )
+        if finished:
+            break
+        time.sleep(args.interval)
@@ -0,0 +1,89 @@
+"""Layout of the shared memory block of the live telemetry.
+
+The block starts with a fixed-size header, followed by two rings:
+
+    frames: frame capacity x FRAME_SIZE, the state of the match on a tick
+            (time, scores, RefereePhase value, then the N_OBJECTS x 3
+            translations and the N_ROBOTS x 4 rotations as float64)
+    events: event capacity x EVENT_SIZE, the events of the referee as
+            JSON of at most EVENT_DATA_SIZE bytes, with the strings of the
+            payloads cut short (and "truncated" set) if they do not fit
+
+Tick (event) n goes to the slot n % capacity of its ring. Every slot starts
+with a seqlock word, which the publisher sets to 2n + 1 before writing the
+slot and to 2n + 2 once it is written. A reader copies the slot out and
+keeps the copy only if the word was 2n + 2 both before and after, so it
+never waits for the publisher nor gets in its way. The counters of the
+published ticks and events in the header are updated after their slots.
+
+The seqlock relies on the stores to the block becoming visible in the
+order they were made, which holds on x86-64.
+"""
+
+import struct
+from typing import Tuple
+
+MAGIC = b"RCJTLM"
+VERSION = 1
+
+# magic, version, time step, objects, robots, frame capacity,
+# event capacity, process ID of the publisher
+HEADER = struct.Struct("<6sHHBBIII")
+# Published ticks, published events, whether the match is finished and
+# whether any reader has attached, 8-byte aligned
+COUNTER = struct.Struct("<Q")
+TICKS_OFFSET = 24
+EVENTS_OFFSET = 32
+FINISHED_OFFSET = 40
+READERS_OFFSET = 48
+# The rings start 8-byte aligned
+HEADER_SIZE = 64
+
+SEQUENCE = struct.Struct("<Q")
+
+# time, score blue, score yellow, phase, after the seqlock word
+FRAME = struct.Struct("<diiB")
+POSES_OFFSET = 32
+
+# tick, match time, length of the JSON, after the seqlock word
+EVENT = struct.Struct("<QdH")
+EVENT_DATA_OFFSET = 32
+# Room for the events with team names of several hundred characters
+EVENT_SIZE = 1024
+EVENT_DATA_SIZE = EVENT_SIZE - EVENT_DATA_OFFSET
+
+DEFAULT_FRAME_CAPACITY = 256  # about 8 seconds of the match
+DEFAULT_EVENT_CAPACITY = 64
+
+
+def frame_size(n_objects: int, n_robots: int) -> int:
+    return POSES_OFFSET + (n_objects * 3 + n_robots * 4) * 8
+
+
+def layout(
+    frame_capacity: int, event_capacity: int, slot_size: int
+) -> Tuple[int, int, int]:
+    """Return the offsets of the rings and the size of the block.
+
+    Args:
+        frame_capacity (int): Number of the slots of the frames
+        event_capacity (int): Number of the slots of the events
+        slot_size (int): Size of a frame, see frame_size
+    """
+    frames_offset = HEADER_SIZE
+    events_offset = frames_offset + frame_capacity * slot_size
+    return (
+        frames_offset,
+        events_offset,
+        events_offset + event_capacity * EVENT_SIZE,
+    )
+
+
+def begin_sequence(n: int) -> int:
+    """Return the seqlock word of the slot of n while it is written."""
+    return 2 * n + 1
+
+
+def end_sequence(n: int) -> int:
+    """Return the seqlock word of the slot of n once it is written."""
+    return 2 * n + 2
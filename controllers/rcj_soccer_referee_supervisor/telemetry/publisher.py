@@ -0,0 +1,238 @@
+"""Publisher of the live telemetry of the match, see telemetry.layout.
+
+The referee hands the publisher the snapshot of every tick and its events,
+which get written into a shared memory block for the readers of
+telemetry.reader to follow. Publishing a tick takes a few stores and a copy
+of the poses into the block, whatever the number of the readers.
+"""
+
+import json
+import logging
+import os
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+from referee.consts import N_OBJECTS, N_ROBOTS, TIME_STEP
+from referee.enums import GameEvents
+from referee.event_handlers import EventHandler
+from referee.events import Event
+from referee.snapshot import TickSubscriber, WorldSnapshot
+from telemetry.layout import (
+    begin_sequence,
+    COUNTER,
+    DEFAULT_EVENT_CAPACITY,
+    DEFAULT_FRAME_CAPACITY,
+    end_sequence,
+    EVENT,
+    EVENT_DATA_OFFSET,
+    EVENT_DATA_SIZE,
+    EVENT_SIZE,
+    EVENTS_OFFSET,
+    FINISHED_OFFSET,
+    FRAME,
+    frame_size,
+    HEADER,
+    layout,
+    MAGIC,
+    POSES_OFFSET,
+    READERS_OFFSET,
+    SEQUENCE,
+    TICKS_OFFSET,
+    VERSION,
+)
+
+# Seconds the block is kept for once the match is finished, so that the
+# readers polling it every few seconds get to see the final score
+DEFAULT_FINISH_GRACE = 10.0
+
+FRAME_SIZE = frame_size(N_OBJECTS, N_ROBOTS)
+TRANSLATIONS_SIZE = N_OBJECTS * 3 * 8
+ROTATIONS_SIZE = N_ROBOTS * 4 * 8
+
+
+def encode_event(
+    event_type: str, payload: Optional[dict], size: int = EVENT_DATA_SIZE
+) -> bytes:
+    """Return the JSON of the event, of at most the given size.
+
+    If it does not fit, the longest strings of the payload (such as the
+    team names) are cut short until it does and "truncated" is set.
+    """
+    data = {"event": event_type}
+    if payload is not None:
+        data["payload"] = payload
+    encoded = json.dumps(data).encode()
+    if len(encoded) <= size:
+        return encoded
+
+    logging.warning(f"{event_type} cut short for the telemetry")
+    payload = dict(payload)
+    data = {"event": event_type, "payload": payload, "truncated": True}
+    encoded = json.dumps(data).encode()
+    while len(encoded) > size:
+        strings = [
+            key
+            for key, value in payload.items()
+            if isinstance(value, str) and value
+        ]
+        if not strings:
+            # Nothing left to cut, only the type is kept
+            return json.dumps(
+                {"event": event_type, "truncated": True}
+            ).encode()
+        longest = max(strings, key=lambda key: len(payload[key]))
+        end = max(0, len(payload[longest]) - (len(encoded) - size))
+        payload[longest] = payload[longest][:end]
+        encoded = json.dumps(data).encode()
+    return encoded
+
+
+class TelemetryPublisher(EventHandler, TickSubscriber):
+    """Subscriber publishing the ticks and the events of the match.
+
+    It is to be added as both a tick subscriber and an event subscriber.
+    The shared memory block is created along with the publisher, under a
+    name which must not be taken, and removed by `close`. If any reader has
+    attached, that is no sooner than `finish_grace` seconds after the match
+    is finished. The readers attached by then keep reading it until they
+    close.
+    """
+
+    # The stats of the profiler do not fit into an event slot
+    event_types = tuple(
+        event.value for event in GameEvents if event is not GameEvents.STATS
+    )
+
+    def __init__(
+        self,
+        name: str,
+        frame_capacity: int = DEFAULT_FRAME_CAPACITY,
+        event_capacity: int = DEFAULT_EVENT_CAPACITY,
+        finish_grace: float = DEFAULT_FINISH_GRACE,
+    ):
+        """
+        Args:
+            name (str): Name of the shared memory block
+            frame_capacity (int): Number of the latest ticks kept
+            event_capacity (int): Number of the latest events kept
+            finish_grace (float): Seconds the block is kept for once the
+                match is finished
+        """
+        super().__init__()
+        if frame_capacity < 1 or event_capacity < 1:
+            raise ValueError(
+                f"Unexpected capacities {frame_capacity}, {event_capacity}"
+            )
+        self.name = name
+        self.frame_capacity = frame_capacity
+        self.event_capacity = event_capacity
+        self.finish_grace = finish_grace
+        self.n_ticks = 0
+        self.n_events = 0
+        # time.monotonic() of the end of the match
+        self.finished_at: Optional[float] = None
+
+        self._frames_offset, self._events_offset, size = layout(
+            frame_capacity, event_capacity, FRAME_SIZE
+        )
+        self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self._buffer = self._shm.buf
+        HEADER.pack_into(
+            self._buffer,
+            0,
+            MAGIC,
+            VERSION,
+            TIME_STEP,
+            N_OBJECTS,
+            N_ROBOTS,
+            frame_capacity,
+            event_capacity,
+            os.getpid(),
+        )
+
+        # Byte views of the poses of the snapshot, set on the first tick
+        self._translations = None
+        self._rotations = None
+
+    def handle_tick(self, snapshot: WorldSnapshot):
+        """Publish the state of the match on the tick."""
+        if self._translations is None:
+            self._translations = snapshot.translations.cast("B")
+            self._rotations = snapshot.rotations.cast("B")
+
+        n, buffer = self.n_ticks, self._buffer
+        offset = self._frames_offset + (n % self.frame_capacity) * FRAME_SIZE
+        SEQUENCE.pack_into(buffer, offset, begin_sequence(n))
+        FRAME.pack_into(
+            buffer,
+            offset + SEQUENCE.size,
+            snapshot.time,
+            snapshot.score_blue,
+            snapshot.score_yellow,
+            snapshot.phase,
+        )
+        start = offset + POSES_OFFSET
+        end = start + TRANSLATIONS_SIZE
+        buffer[start:end] = self._translations
+        start, end = end, end + ROTATIONS_SIZE
+        buffer[start:end] = self._rotations
+        SEQUENCE.pack_into(buffer, offset, end_sequence(n))
+
+        self.n_ticks = n + 1
+        COUNTER.pack_into(buffer, TICKS_OFFSET, self.n_ticks)
+
+    def handle_event(self, referee, event: Event):
+        """Publish the event, then mark the match as finished once it is."""
+        encoded = encode_event(event.event_type, event.payload())
+        self._publish_event(referee.match_time - referee.time, encoded)
+
+        if event.event_type == GameEvents.MATCH_FINISH.value:
+            referee.remove_tick_subscriber(self)
+            self.finish()
+
+    def _publish_event(self, matchtime: float, encoded: bytes):
+        n, buffer = self.n_events, self._buffer
+        offset = self._events_offset + (n % self.event_capacity) * EVENT_SIZE
+        SEQUENCE.pack_into(buffer, offset, begin_sequence(n))
+        EVENT.pack_into(
+            buffer,
+            offset + SEQUENCE.size,
+            self.n_ticks,
+            matchtime,
+            len(encoded),
+        )
+        start = offset + EVENT_DATA_OFFSET
+        end = start + len(encoded)
+        buffer[start:end] = encoded
+        SEQUENCE.pack_into(buffer, offset, end_sequence(n))
+
+        self.n_events = n + 1
+        COUNTER.pack_into(buffer, EVENTS_OFFSET, self.n_events)
+
+    def finish(self):
+        """Mark the match as finished, nothing more gets published."""
+        if self.finished_at is not None:
+            return
+        COUNTER.pack_into(self._buffer, FINISHED_OFFSET, 1)
+        self.finished_at = time.monotonic()
+
+    @property
+    def has_readers(self) -> bool:
+        """Whether any reader has attached to the block so far."""
+        return COUNTER.unpack_from(self._buffer, READERS_OFFSET)[0] != 0
+
+    def close(self):
+        """Remove the block, once `finish_grace` seconds passed since the
+        end of the match. Right away if the match did not finish or no
+        reader has attached."""
+        if self._buffer is None:
+            return
+        if self.finished_at is None:
+            self.finish()
+        elif self.has_readers:
+            remaining = self.finished_at + self.finish_grace
+            time.sleep(max(0.0, remaining - time.monotonic()))
+        self._buffer = None
+        self._shm.close()
+        self._shm.unlink()
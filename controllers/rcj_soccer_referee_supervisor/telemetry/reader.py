@@ -0,0 +1,253 @@
+"""Reader of the live telemetry of the match, see telemetry.layout.
+
+Any number of readers can follow a match from other processes on the same
+machine, without locks and without slowing the referee down. A reader
+which falls behind by more than the capacity of a ring misses the oldest
+entries, counted in `missed_ticks` and `missed_events`.
+
+Only the Python standard library is needed, so the reader can be used
+without Webots.
+"""
+
+import json
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, NamedTuple, Optional
+
+from telemetry.layout import (
+    COUNTER,
+    end_sequence,
+    EVENT,
+    EVENT_DATA_OFFSET,
+    EVENT_SIZE,
+    EVENTS_OFFSET,
+    FINISHED_OFFSET,
+    FRAME,
+    frame_size,
+    HEADER,
+    HEADER_SIZE,
+    layout,
+    MAGIC,
+    POSES_OFFSET,
+    READERS_OFFSET,
+    SEQUENCE,
+    TICKS_OFFSET,
+    VERSION,
+)
+
+
+def attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to the shared memory block, see `untrack`."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+def untrack(name: str):
+    """Keep the resource tracker from removing the block once this process
+    exits, as it is owned by the publisher. Before Python 3.13, attaching
+    to a block registers it."""
+    if sys.version_info < (3, 13) and os.name == "posix":
+        # The POSIX names of the blocks start with a slash
+        resource_tracker.unregister(f"/{name}", "shared_memory")
+
+
+class TelemetryFrame(NamedTuple):
+    # Number of the tick, starting with 0
+    tick: int
+    # Remaining time of the match in seconds
+    time: float
+    score_blue: int
+    score_yellow: int
+    # RefereePhase value
+    phase: int
+    # Read-only N_OBJECTS x 3 translations, indexed by OBJECT_IDS
+    translations: memoryview
+    # Read-only N_ROBOTS x 4 rotations
+    rotations: memoryview
+
+
+class TelemetryEvent(NamedTuple):
+    # Number of the ticks published before the event
+    tick: int
+    # Match time in seconds, as in the reflogs
+    matchtime: float
+    type: str
+    payload: Optional[dict]
+    # Whether the strings of the payload were cut short to fit the slot
+    truncated: bool = False
+
+
+class TelemetryReader:
+    """Lock-free reader of the telemetry published under the name.
+
+    `poll` and `poll_events` return what has been published since their
+    previous call, starting with the oldest entries still in the rings, and
+    `latest` the most recent frame.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._shm = attach(name)
+        self._buffer = self._shm.buf
+
+        header = None
+        if len(self._buffer) >= HEADER_SIZE:
+            header = HEADER.unpack_from(self._buffer)
+        # Unless the block is published by this very process, whose
+        # registration it is
+        if header is None or header[-1] != os.getpid():
+            untrack(name)
+        if header is None or header[0] != MAGIC:
+            self.close()
+            raise ValueError(f"{name} is not a telemetry block")
+        (
+            _,
+            version,
+            self.time_step,
+            self.n_objects,
+            self.n_robots,
+            self.frame_capacity,
+            self.event_capacity,
+            _,
+        ) = header
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported telemetry version {version}")
+
+        self.frame_size = frame_size(self.n_objects, self.n_robots)
+        self._frames_offset, self._events_offset, _ = layout(
+            self.frame_capacity, self.event_capacity, self.frame_size
+        )
+
+        # Lets the publisher know there is someone to keep the block for
+        COUNTER.pack_into(self._buffer, READERS_OFFSET, 1)
+
+        self.next_tick = max(0, self.n_ticks - self.frame_capacity)
+        self.next_event = max(0, self.n_events - self.event_capacity)
+        self.missed_ticks = 0
+        self.missed_events = 0
+
+    def __enter__(self) -> "TelemetryReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def n_ticks(self) -> int:
+        """Number of the ticks published so far."""
+        return COUNTER.unpack_from(self._buffer, TICKS_OFFSET)[0]
+
+    @property
+    def n_events(self) -> int:
+        """Number of the events published so far."""
+        return COUNTER.unpack_from(self._buffer, EVENTS_OFFSET)[0]
+
+    @property
+    def finished(self) -> bool:
+        """Whether the match is finished, nothing more gets published."""
+        return COUNTER.unpack_from(self._buffer, FINISHED_OFFSET)[0] != 0
+
+    def _copy_slot(self, offset: int, size: int, n: int) -> Optional[bytes]:
+        """Return a copy of the slot of n, None if it is being written or
+        holds another entry."""
+        expected = end_sequence(n)
+        if SEQUENCE.unpack_from(self._buffer, offset)[0] != expected:
+            return None
+        end = offset + size
+        data = bytes(self._buffer[offset:end])
+        if SEQUENCE.unpack_from(self._buffer, offset)[0] != expected:
+            return None
+        return data
+
+    def frame(self, tick: int) -> Optional[TelemetryFrame]:
+        """Return the frame of the tick, None if it is not in the ring."""
+        slot = tick % self.frame_capacity
+        offset = self._frames_offset + slot * self.frame_size
+        data = self._copy_slot(offset, self.frame_size, tick)
+        if data is None:
+            return None
+
+        time, score_blue, score_yellow, phase = FRAME.unpack_from(
+            data, SEQUENCE.size
+        )
+        poses = memoryview(data)
+        end = POSES_OFFSET + self.n_objects * 3 * 8
+        translations = poses[POSES_OFFSET:end].cast("d", [self.n_objects, 3])
+        rotations = poses[end:].cast("d", [self.n_robots, 4])
+        return TelemetryFrame(
+            tick,
+            time,
+            score_blue,
+            score_yellow,
+            phase,
+            translations,
+            rotations,
+        )
+
+    def event(self, n: int) -> Optional[TelemetryEvent]:
+        """Return the n-th event, None if it is not in the ring."""
+        slot = n % self.event_capacity
+        offset = self._events_offset + slot * EVENT_SIZE
+        data = self._copy_slot(offset, EVENT_SIZE, n)
+        if data is None:
+            return None
+
+        tick, matchtime, length = EVENT.unpack_from(data, SEQUENCE.size)
+        end = EVENT_DATA_OFFSET + length
+        decoded = json.loads(data[EVENT_DATA_OFFSET:end])
+        return TelemetryEvent(
+            tick,
+            matchtime,
+            decoded["event"],
+            decoded.get("payload"),
+            decoded.get("truncated", False),
+        )
+
+    def latest(self) -> Optional[TelemetryFrame]:
+        """Return the most recent frame, None if there is none yet."""
+        n_ticks = self.n_ticks
+        if n_ticks == 0:
+            return None
+        # Overwritten only if the reader got preempted for a whole ring
+        return self.frame(n_ticks - 1)
+
+    def poll(self) -> List[TelemetryFrame]:
+        """Return the frames published since the previous poll."""
+        n_ticks = self.n_ticks
+        start = max(self.next_tick, n_ticks - self.frame_capacity)
+        self.missed_ticks += start - self.next_tick
+
+        frames = []
+        for tick in range(start, n_ticks):
+            frame = self.frame(tick)
+            if frame is None:
+                # Overwritten while it was being read
+                self.missed_ticks += 1
+            else:
+                frames.append(frame)
+        self.next_tick = n_ticks
+        return frames
+
+    def poll_events(self) -> List[TelemetryEvent]:
+        """Return the events published since the previous poll."""
+        n_events = self.n_events
+        start = max(self.next_event, n_events - self.event_capacity)
+        self.missed_events += start - self.next_event
+
+        events = []
+        for n in range(start, n_events):
+            event = self.event(n)
+            if event is None:
+                self.missed_events += 1
+            else:
+                events.append(event)
+        self.next_event = n_events
+        return events
+
+    def close(self):
+        """Detach from the block, without removing it."""
+        self._buffer = None
+        self._shm.close()
@@ -0,0 +1,218 @@
+from headless import install
+
+install()
+
+import json
+import subprocess
+import sys
+import time
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import pytest
+
+from headless.controller import use_world
+from headless.match import attacking_drivers, create_referee, play
+from headless.world import World
+from referee.consts import BALL_ID, N_OBJECTS, N_ROBOTS
+from referee.enums import GameEvents
+from referee.snapshot import WorldSnapshot
+from referee.supervisor import RCJSoccerSupervisor
+from telemetry.layout import (
+    begin_sequence,
+    COUNTER,
+    EVENT_DATA_SIZE,
+    SEQUENCE,
+    TICKS_OFFSET,
+)
+from telemetry.publisher import encode_event, FRAME_SIZE, TelemetryPublisher
+from telemetry.reader import TelemetryReader
+
+SUPERVISOR_DIR = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def name() -> str:
+    return f"rcj-test-{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def supervisor() -> RCJSoccerSupervisor:
+    use_world(World(attacking_drivers()))
+    return RCJSoccerSupervisor()
+
+
+def test_follow_match(name, supervisor):
+    referee = create_referee(supervisor, match_time=20, seed=1)
+    publisher = TelemetryPublisher(name, frame_capacity=64, finish_grace=0)
+    referee.add_tick_subscriber(publisher)
+    referee.add_event_subscriber(publisher)
+
+    with TelemetryReader(name) as reader:
+        assert (reader.n_objects, reader.n_robots) == (N_OBJECTS, N_ROBOTS)
+        assert reader.latest() is None
+        play(supervisor, referee)
+        assert reader.finished
+
+        publisher.close()
+        # Removed by the publisher, but still mapped by the reader
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
+
+        frames = reader.poll()
+        assert len(frames) == 64
+        assert reader.missed_ticks == publisher.n_ticks - 64
+        assert frames[-1] == reader.latest()
+        assert frames[-1].tick == publisher.n_ticks - 1
+        assert (frames[-1].score_blue, frames[-1].score_yellow) == (
+            referee.score_blue,
+            referee.score_yellow,
+        )
+        assert frames[-1].translations.readonly
+        assert frames[-1].translations[BALL_ID, 0] == pytest.approx(
+            referee.sv.get_ball_translation()[0]
+        )
+        assert reader.poll() == []
+
+        events = reader.poll_events()
+        assert events[0].type == GameEvents.KICKOFF.value
+        assert events[-1].type == GameEvents.MATCH_FINISH.value
+        assert events[-1].payload["score_blue"] == referee.score_blue
+        assert events[-1].tick == publisher.n_ticks
+
+
+def test_long_team_names(name, supervisor):
+    referee = create_referee(
+        supervisor,
+        match_time=1,
+        seed=1,
+        team_name_blue="Blue " * 40,
+        team_name_yellow="Yellow " * 40,
+    )
+    publisher = TelemetryPublisher(name, finish_grace=0)
+    referee.add_event_subscriber(publisher)
+
+    with TelemetryReader(name) as reader:
+        play(supervisor, referee)
+        events = reader.poll_events()
+    publisher.close()
+
+    # Longer than 256 bytes
+    (start,) = [e for e in events if e.type == GameEvents.MATCH_START.value]
+    assert start.payload["team_name_blue"] == "Blue " * 40
+    assert not start.truncated
+    assert events[-1].type == GameEvents.MATCH_FINISH.value
+
+
+def test_encode_event_cuts_strings_short():
+    payload = {"team_name_blue": "B" * 2000, "team_name_yellow": "Y" * 100}
+    encoded = encode_event(GameEvents.MATCH_FINISH.value, payload)
+    assert len(encoded) <= EVENT_DATA_SIZE
+
+    decoded = json.loads(encoded)
+    assert decoded["truncated"]
+    assert decoded["payload"]["team_name_yellow"] == "Y" * 100
+    assert decoded["payload"]["team_name_blue"].startswith("BBB")
+    # The payload of the event is left as it is
+    assert len(payload["team_name_blue"]) == 2000
+
+    assert encode_event("GOAL", {"score": 10**2000}, size=64) == (
+        b'{"event": "GOAL", "truncated": true}'
+    )
+
+
+def test_kept_after_match_finish(name, supervisor):
+    referee = create_referee(supervisor, match_time=1, seed=1)
+    publisher = TelemetryPublisher(name, finish_grace=0.5)
+    referee.add_tick_subscriber(publisher)
+    referee.add_event_subscriber(publisher)
+    play(supervisor, referee)
+
+    # A reader attached after the end of the match still gets the results
+    with TelemetryReader(name) as reader:
+        assert reader.finished
+        assert reader.latest().tick == publisher.n_ticks - 1
+        final = reader.poll_events()[-1]
+        assert final.type == GameEvents.MATCH_FINISH.value
+        assert final.payload["score_blue"] == referee.score_blue
+
+    publisher.close()
+    assert time.monotonic() - publisher.finished_at >= 0.5
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def test_removed_right_away_without_readers(name, supervisor):
+    referee = create_referee(supervisor, match_time=1, seed=1)
+    publisher = TelemetryPublisher(name, finish_grace=60)
+    referee.add_tick_subscriber(publisher)
+    referee.add_event_subscriber(publisher)
+    play(supervisor, referee)
+
+    assert not publisher.has_readers
+    publisher.close()
+    assert time.monotonic() - publisher.finished_at < 60
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def test_torn_and_overwritten_frames(name, supervisor):
+    snapshot = WorldSnapshot(supervisor)
+    publisher = TelemetryPublisher(name, frame_capacity=4)
+    try:
+        with TelemetryReader(name) as reader:
+            for _ in range(6):
+                snapshot.update(10.0, 1, 0, False)
+                publisher.handle_tick(snapshot)
+
+            assert reader.frame(1) is None
+            assert reader.frame(5).tick == 5
+
+            # The publisher is writing the slot of tick 6
+            offset = reader._frames_offset + (6 % 4) * FRAME_SIZE
+            SEQUENCE.pack_into(publisher._buffer, offset, begin_sequence(6))
+            publisher.n_ticks += 1
+            COUNTER.pack_into(publisher._buffer, TICKS_OFFSET, 7)
+            assert reader.frame(6) is None
+
+            assert [frame.tick for frame in reader.poll()] == [3, 4, 5]
+            assert reader.missed_ticks == 4
+    finally:
+        publisher.close()
+
+
+def test_reader_keeps_block(name, supervisor):
+    publisher = TelemetryPublisher(name)
+    try:
+        # The block outlives a reader in another process
+        code = (
+            "from telemetry.reader import TelemetryReader; "
+            f"TelemetryReader({name!r}).close()"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=SUPERVISOR_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert "leaked" not in result.stderr
+
+        shared_memory.SharedMemory(name).close()
+    finally:
+        publisher.close()
+
+
+def test_not_telemetry(name):
+    block = shared_memory.SharedMemory(name, create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            TelemetryReader(name)
+    finally:
+        # The reader cannot tell the block was created by this process,
+        # so it stopped the resource tracker from removing it
+        if sys.version_info < (3, 13):
+            resource_tracker.register(f"/{name}", "shared_memory")
+        block.close()
+        block.unlink()
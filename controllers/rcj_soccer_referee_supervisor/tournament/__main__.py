@@ -0,0 +1,111 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from tournament.fixtures import load_fixtures
+from tournament.runner import (
+    DEFAULT_CORES_PER_MATCH,
+    DEFAULT_HALVES,
+    DEFAULT_MEMORY_PER_MATCH,
+    DEFAULT_RETRIES,
+    DEFAULT_SIMULATOR,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WORLD,
+    jobs_for_budget,
+    TournamentRunner,
+)
+
+parser = argparse.ArgumentParser(
+    prog="python -m tournament",
+    description="Run the matches of a fixture list in parallel.",
+)
+parser.add_argument("fixtures", type=Path, help="Fixture list (JSON)")
+parser.add_argument(
+    "output", type=Path, help="Directory of the outputs of the matches"
+)
+parser.add_argument(
+    "--simulator",
+    default=DEFAULT_SIMULATOR,
+    help="Command running the simulator, the world is appended to it",
+)
+parser.add_argument(
+    "--world",
+    type=Path,
+    default=DEFAULT_WORLD,
+    help="World of the matches without their own",
+)
+parser.add_argument("--halves", type=int, default=DEFAULT_HALVES)
+parser.add_argument(
+    "--timeout",
+    type=float,
+    default=DEFAULT_TIMEOUT,
+    help="Longest time of a half in seconds",
+)
+parser.add_argument(
+    "--retries",
+    type=int,
+    default=DEFAULT_RETRIES,
+    help="How many times a half is run again if it does not finish",
+)
+parser.add_argument(
+    "--jobs",
+    type=int,
+    help="Matches run at once, derived from the cores and the memory "
+    "by default",
+)
+parser.add_argument("--cores", type=int, help="Cores to use, all by default")
+parser.add_argument(
+    "--memory", type=int, help="Memory to use in MiB, all by default"
+)
+parser.add_argument(
+    "--cores-per-match", type=float, default=DEFAULT_CORES_PER_MATCH
+)
+parser.add_argument(
+    "--memory-per-match",
+    type=int,
+    default=DEFAULT_MEMORY_PER_MATCH,
+    help="Memory taken by one match in MiB",
+)
+parser.add_argument(
+    "-e",
+    "--env",
+    action="append",
+    default=[],
+    metavar="NAME=VALUE",
+    help="Environment variable of the simulator, e.g. RCJ_SIM_REC_FORMATS=mp4",
+)
+args = parser.parse_args()
+
+env = {}
+for variable in args.env:
+    name, sep, value = variable.partition("=")
+    if not sep:
+        parser.error(f"Expected NAME=VALUE, got {variable}")
+    env[name] = value
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+fixtures = load_fixtures(args.fixtures)
+jobs = args.jobs or jobs_for_budget(
+    args.cores, args.memory, args.cores_per_match, args.memory_per_match
+)
+runner = TournamentRunner(
+    output=args.output,
+    simulator=args.simulator,
+    world=args.world,
+    halves=args.halves,
+    timeout=args.timeout,
+    retries=args.retries,
+    jobs=jobs,
+    env=env,
+)
+logging.info(f"Running {len(fixtures)} matches, {jobs} at once")
+results = runner.run(fixtures)
+
+unfinished = [
+    result["match_id"] for result in results if not result["finished"]
+]
+if unfinished:
+    print(f"Unfinished matches: {', '.join(unfinished)}")
+sys.exit(1 if unfinished else 0)
@@ -0,0 +1,92 @@
+"""Fixture lists of the tournaments.
+
+A fixture list is a JSON list of the matches, for example:
+
+    [
+        {"match_id": "1", "blue": "team-a", "yellow": "team-b"},
+        {
+            "match_id": "2",
+            "blue": "team-c",
+            "blue_name": "Team C",
+            "yellow": "team-d",
+            "yellow_name": "Team D",
+            "worlds": ["worlds/2-first.wbt", "worlds/2-second.wbt"]
+        }
+    ]
+
+The blue and yellow teams are the sides in the first half. The names default
+to the team IDs and the worlds (relative to the fixture list) to the world
+given to the runner, for all the halves.
+
+The teams switch the sides in every other half only if the match has a
+world per half: a world sets the controllers of each side, so in a world
+shared by all the halves the teams keep playing the same side.
+"""
+
+import json
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from referee.enums import Team
+
+
+class Fixture(NamedTuple):
+    match_id: str
+    blue_id: str
+    yellow_id: str
+    blue_name: str
+    yellow_name: str
+    # World file of each half, none for the default one
+    worlds: Tuple[Path, ...] = ()
+
+    def world(self, half_id: int) -> Optional[Path]:
+        if half_id > len(self.worlds):
+            return None
+        return self.worlds[half_id - 1]
+
+    def sides(self, half_id: int) -> dict:
+        """Return the ID and the name of the team playing each side in the
+        given half."""
+        blue = (self.blue_id, self.blue_name)
+        yellow = (self.yellow_id, self.yellow_name)
+        if self.worlds and half_id % 2 == 0:
+            blue, yellow = yellow, blue
+        return {Team.BLUE.value: blue, Team.YELLOW.value: yellow}
+
+
+def load_fixtures(path: Path) -> List[Fixture]:
+    """Load the fixture list.
+
+    Raises:
+        ValueError: If a match misses a required field, its teams are the
+            same or its match ID is used twice
+    """
+    with path.open() as f:
+        matches = json.load(f)
+
+    fixtures = []
+    for match in matches:
+        for field in ("match_id", "blue", "yellow"):
+            if field not in match:
+                raise ValueError(f"Match {match} misses the {field} field")
+        if match["blue"] == match["yellow"]:
+            raise ValueError(f"Team {match['blue']} cannot play itself")
+
+        fixtures.append(
+            Fixture(
+                match_id=str(match["match_id"]),
+                blue_id=match["blue"],
+                yellow_id=match["yellow"],
+                blue_name=match.get("blue_name", match["blue"]),
+                yellow_name=match.get("yellow_name", match["yellow"]),
+                worlds=tuple(
+                    path.parent / world for world in match.get("worlds", ())
+                ),
+            )
+        )
+
+    match_ids = [fixture.match_id for fixture in fixtures]
+    for match_id in match_ids:
+        if match_ids.count(match_id) > 1:
+            raise ValueError(f"Match ID {match_id} is used twice")
+    return fixtures
@@ -0,0 +1,361 @@
+"""Running of the matches of a tournament.
+
+Every half is a run of the simulator, configured by the RCJ_SIM_*
+environment variables just like a single match. The matches are run
+concurrently, as many at once as the cores and the memory allow, while the
+halves of a match are run one after another, the later ones starting from
+the score of the previous one.
+
+The reflogs are the record of what has been played: a half is finished
+once its reflog holds the MATCH_FINISH event. A half without it (crashed,
+killed after the timeout...) is moved aside to the `failed` directory of
+the match and run again, and a tournament interrupted for any reason can be
+resumed by running it again with the same output directory.
+"""
+
+import json
+import logging
+import os
+import shlex
+import signal
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from referee.enums import GameEvents, ReflogFileSuffix, Team
+from referee.reflog import ReflogReader
+from tournament.fixtures import Fixture
+
+DEFAULT_SIMULATOR = "webots --stdout --stderr --batch --mode=fast"
+DEFAULT_WORLD = Path(__file__).resolve().parents[3] / "worlds" / "soccer.wbt"
+DEFAULT_HALVES = 2
+# Longest time of a half in seconds, including the start of the simulator
+DEFAULT_TIMEOUT = 1800
+DEFAULT_RETRIES = 2
+
+# Resources taken by one simulator with its six robot controllers
+DEFAULT_CORES_PER_MATCH = 2
+DEFAULT_MEMORY_PER_MATCH = 2048  # in MiB
+
+FAILED_DIR = "failed"
+RESULTS_FILE = "results.json"
+
+# The matches played at once need telemetry blocks of their own, so the
+# name is suffixed with the match
+TELEMETRY_ENV = "RCJ_SIM_TELEMETRY"
+
+REFLOG_SUFFIXES = {f".{suffix.value}" for suffix in ReflogFileSuffix}
+
+
+class HalfResult(NamedTuple):
+    # The scores at the end of the half, including the previous halves
+    score_blue: int
+    score_yellow: int
+    reflog: Path
+
+
+def total_memory() -> Optional[int]:
+    """Return the physical memory in MiB, None if it is not known."""
+    try:
+        pages = os.sysconf("SC_PHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+    return pages * page_size // 2**20
+
+
+def jobs_for_budget(
+    cores: Optional[int] = None,
+    memory: Optional[int] = None,
+    cores_per_match: float = DEFAULT_CORES_PER_MATCH,
+    memory_per_match: int = DEFAULT_MEMORY_PER_MATCH,
+) -> int:
+    """Return how many matches can run at once.
+
+    Args:
+        cores (int): Cores to use, all of them by default
+        memory (int): Memory to use in MiB, all of it by default
+        cores_per_match (float): Cores taken by one match
+        memory_per_match (int): Memory taken by one match in MiB
+
+    Returns:
+        int: Number of the matches, at least one
+    """
+    cores = cores or os.cpu_count() or 1
+    memory = memory or total_memory()
+    jobs = int(cores // cores_per_match)
+    if memory is not None:
+        jobs = min(jobs, memory // memory_per_match)
+    return max(1, jobs)
+
+
+def reflog_prefix(match_id: str, half_id: int) -> str:
+    """Return the start of the names of the outputs of the half, as named
+    by output_path of rcj_soccer_referee_supervisor.py."""
+    return f"{match_id}_-_{half_id}_-_"
+
+
+def read_match_finish(path: Path) -> Optional[dict]:
+    """Return the payload of the MATCH_FINISH event of the reflog, None if
+    there is none or the reflog is truncated."""
+    if path.suffix == f".{ReflogFileSuffix.BINARY.value}":
+        return _read_binary_match_finish(path)
+
+    payload = None
+    with path.open() as f:
+        for line in f:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                # The last line of a crashed half may be cut off
+                continue
+            if data.get("event") == GameEvents.MATCH_FINISH.value:
+                payload = data.get("payload")
+    return payload
+
+
+def _read_binary_match_finish(path: Path) -> Optional[dict]:
+    try:
+        with ReflogReader(path) as reader:
+            # The payloads of a reflog recovered after a crash are lost, so
+            # the half is not known to be finished
+            for record in reader.iter_events(GameEvents.MATCH_FINISH.value):
+                return record.payload
+    except ValueError:
+        # Not even the header was written
+        pass
+    return None
+
+
+def find_finished_half(
+    match_dir: Path, match_id: str, half_id: int
+) -> Optional[HalfResult]:
+    """Return the result of the half if any of its reflogs is finished."""
+    for path in sorted(match_dir.glob(f"{reflog_prefix(match_id, half_id)}*")):
+        if path.suffix not in REFLOG_SUFFIXES:
+            continue
+        payload = read_match_finish(path)
+        if payload is not None:
+            return HalfResult(
+                payload["score_blue"], payload["score_yellow"], path
+            )
+    return None
+
+
+def discard_unfinished_half(match_dir: Path, match_id: str, half_id: int):
+    """Move the outputs of the half aside, so that they do not get mixed up
+    with the ones of the next attempt."""
+    failed_dir = match_dir / FAILED_DIR
+    for path in match_dir.glob(f"{reflog_prefix(match_id, half_id)}*"):
+        failed_dir.mkdir(exist_ok=True)
+        os.replace(path, failed_dir / path.name)
+
+
+class TournamentRunner:
+    def __init__(
+        self,
+        output: Path,
+        simulator: str = DEFAULT_SIMULATOR,
+        world: Path = DEFAULT_WORLD,
+        halves: int = DEFAULT_HALVES,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        jobs: int = 1,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            output (Path): Directory of the outputs, with a subdirectory for
+                each match
+            simulator (str): Command running the simulator, the world is
+                appended to it
+            world (Path): World of the matches without their own
+            halves (int): Number of the halves of each match
+            timeout (float): Longest time of a half in seconds
+            retries (int): How many times a half is run again if it does
+                not finish
+            jobs (int): Number of the matches run at once
+            env (dict): Additional environment variables of the simulator,
+                such as RCJ_SIM_REC_FORMATS
+        """
+        self.output = output
+        self.simulator = shlex.split(simulator)
+        self.world = world
+        self.halves = halves
+        self.timeout = timeout
+        self.retries = retries
+        self.jobs = jobs
+        self.env = env or {}
+
+        self._processes: Set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def match_dir(self, fixture: Fixture) -> Path:
+        return self.output / fixture.match_id.replace(" ", "_")
+
+    def half_env(
+        self, fixture: Fixture, half_id: int, initial_scores: Dict[str, int]
+    ) -> Dict[str, str]:
+        """Return the environment of the simulator for the half.
+
+        Args:
+            fixture (Fixture): The match
+            half_id (int): The half, starting with 1
+            initial_scores (dict): Team ID -> score before the half
+        """
+        env = dict(os.environ)
+        env.update(self.env)
+        env.update(
+            {
+                "RCJ_SIM_AUTO_MODE": "True",
+                "RCJ_SIM_OUTPUT_PATH": str(self.match_dir(fixture)),
+                "RCJ_SIM_MATCH_ID": fixture.match_id,
+                "RCJ_SIM_HALF_ID": str(half_id),
+            }
+        )
+        if env.get(TELEMETRY_ENV):
+            match = self.match_dir(fixture).name
+            env[TELEMETRY_ENV] = f"{env[TELEMETRY_ENV]}-{match}"
+
+        sides = fixture.sides(half_id)
+        for side, color in ((Team.BLUE, "BLUE"), (Team.YELLOW, "YELLOW")):
+            team_id, name = sides[side.value]
+            env[f"RCJ_SIM_TEAM_{color}_ID"] = team_id
+            env[f"RCJ_SIM_TEAM_{color}_NAME"] = name
+            env[f"RCJ_SIM_TEAM_{side.value}_INITIAL_SCORE"] = str(
+                initial_scores[team_id]
+            )
+        return env
+
+    def launch(self, command: List[str], env: Dict[str, str], log: Path):
+        """Run the simulator until it exits or the timeout runs out.
+
+        The simulator gets a session of its own, so that the robot
+        controllers and anything else it starts get killed with it.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            with log.open("a") as output:
+                process = subprocess.Popen(
+                    command,
+                    env=env,
+                    stdout=output,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+            self._processes.add(process)
+
+        try:
+            process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            logging.warning(f"Killing {' '.join(command)} after the timeout")
+            self._kill(process)
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+    def _kill(self, process: subprocess.Popen):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
+    def stop(self):
+        """Kill the running simulators and do not start any new ones."""
+        with self._lock:
+            self._stopped = True
+            processes = list(self._processes)
+        for process in processes:
+            self._kill(process)
+
+    def run_half(
+        self, fixture: Fixture, half_id: int, initial_scores: Dict[str, int]
+    ) -> Optional[HalfResult]:
+        """Run the half, unless it has been finished already.
+
+        Returns:
+            HalfResult: None if the half did not finish in any attempt
+        """
+        match_dir = self.match_dir(fixture)
+        match_dir.mkdir(parents=True, exist_ok=True)
+        world = fixture.world(half_id) or self.world
+        command = self.simulator + [str(world)]
+        env = self.half_env(fixture, half_id, initial_scores)
+        log = match_dir / f"{fixture.match_id}_-_{half_id}.log"
+
+        for attempt in range(self.retries + 2):
+            result = find_finished_half(match_dir, fixture.match_id, half_id)
+            if result is not None or attempt > self.retries or self._stopped:
+                return result
+            discard_unfinished_half(match_dir, fixture.match_id, half_id)
+            logging.info(
+                f"Match {fixture.match_id}, half {half_id}: attempt "
+                f"{attempt + 1}"
+            )
+            self.launch(command, env, log)
+        return None
+
+    def run_match(self, fixture: Fixture) -> dict:
+        """Run all the halves of the match.
+
+        Returns:
+            dict: The match ID, whether it finished, the team IDs with
+                their scores and the reflogs of the finished halves
+        """
+        scores = {fixture.blue_id: 0, fixture.yellow_id: 0}
+        reflogs = []
+        for half_id in range(1, self.halves + 1):
+            result = self.run_half(fixture, half_id, scores)
+            if result is None:
+                logging.error(
+                    f"Match {fixture.match_id}, half {half_id} did not finish"
+                )
+                break
+            sides = fixture.sides(half_id)
+            scores[sides[Team.BLUE.value][0]] = result.score_blue
+            scores[sides[Team.YELLOW.value][0]] = result.score_yellow
+            reflogs.append(str(result.reflog))
+
+        finished = len(reflogs) == self.halves
+        if finished:
+            logging.info(f"Match {fixture.match_id} finished: {scores}")
+        return {
+            "match_id": fixture.match_id,
+            "finished": finished,
+            "scores": scores,
+            "reflogs": reflogs,
+        }
+
+    def run(self, fixtures: List[Fixture]) -> List[dict]:
+        """Run the matches and write their results to the results file of
+        the output directory.
+
+        Returns:
+            list: Result of each match, see run_match
+
+        Raises:
+            ValueError: If a match has its own worlds, but not one for each
+                half
+        """
+        for fixture in fixtures:
+            if fixture.worlds and len(fixture.worlds) != self.halves:
+                raise ValueError(
+                    f"Match {fixture.match_id} has {len(fixture.worlds)} "
+                    f"worlds for {self.halves} halves"
+                )
+        self.output.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            try:
+                results = list(executor.map(self.run_match, fixtures))
+            except BaseException:
+                self.stop()
+                raise
+
+        with (self.output / RESULTS_FILE).open("w") as f:
+            json.dump(results, f, indent=4)
+        return results
@@ -0,0 +1,262 @@
+import json
+import sys
+import time
+
+import pytest
+
+from headless.match import run_match
+from referee.reflog import BinaryLoggerHandler
+from tournament.fixtures import Fixture, load_fixtures
+from tournament.runner import (
+    FAILED_DIR,
+    jobs_for_budget,
+    read_match_finish,
+    RESULTS_FILE,
+    TELEMETRY_ENV,
+    TournamentRunner,
+)
+
+# Stand-in for the simulator: plays a half in which the blue team scores
+# once and writes its reflog. It crashes in the first STUB_CRASHES attempts
+# and sleeps for STUB_SLEEP seconds before finishing.
+STUB = """
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+env = os.environ
+output = Path(env["RCJ_SIM_OUTPUT_PATH"])
+match_id, half_id = env["RCJ_SIM_MATCH_ID"], env["RCJ_SIM_HALF_ID"]
+blue, yellow = env["RCJ_SIM_TEAM_BLUE_ID"], env["RCJ_SIM_TEAM_YELLOW_ID"]
+score_blue = int(env["RCJ_SIM_TEAM_B_INITIAL_SCORE"])
+score_yellow = int(env["RCJ_SIM_TEAM_Y_INITIAL_SCORE"])
+
+with open(env["STUB_LAUNCHES"], "a") as f:
+    f.write(f"{match_id} {half_id} {sys.argv[1]}\\n")
+attempt = len(list(output.glob(f"failed/{match_id}_-_{half_id}_-_*")))
+
+name = f"{match_id}_-_{half_id}_-_{blue}_vs_{yellow}-{attempt}.jsonl"
+with open(output / name, "w") as f:
+    start = {
+        "score_blue": score_blue,
+        "score_yellow": score_yellow,
+        "team_name_blue": env["RCJ_SIM_TEAM_BLUE_NAME"],
+    }
+    f.write(json.dumps({"event": "MATCH_START", "payload": start}) + "\\n")
+    f.flush()
+    if attempt < int(env.get("STUB_CRASHES", 0)):
+        f.write('{"event": "GO')
+        sys.exit(1)
+    time.sleep(float(env.get("STUB_SLEEP", 0)))
+    finish = {"score_blue": score_blue + 1, "score_yellow": score_yellow}
+    f.write(json.dumps({"event": "MATCH_FINISH", "payload": finish}) + "\\n")
+"""
+
+
+@pytest.fixture
+def make_runner(tmp_path):
+    stub = tmp_path / "stub.py"
+    stub.write_text(STUB)
+    launches = tmp_path / "launches"
+    launches.touch()
+
+    def make_runner(**kwargs):
+        env = {"STUB_LAUNCHES": str(launches)}
+        env.update(kwargs.pop("env", {}))
+        return TournamentRunner(
+            output=tmp_path / "output",
+            simulator=f"{sys.executable} {stub}",
+            world=tmp_path / "soccer.wbt",
+            env=env,
+            **kwargs,
+        )
+
+    make_runner.launches = launches
+    return make_runner
+
+
+FIXTURES = [
+    Fixture("1", "a", "b", "Team A", "Team B"),
+    Fixture("2", "c", "d", "Team C", "Team D"),
+]
+
+
+def test_runs_halves(make_runner, tmp_path):
+    runner = make_runner(jobs=2)
+    results = runner.run(FIXTURES)
+
+    assert [result["finished"] for result in results] == [True, True]
+    # The controllers of the world do not switch sides, nor do the teams
+    assert results[0]["scores"] == {"a": 2, "b": 0}
+    assert results[1]["scores"] == {"c": 2, "d": 0}
+    assert json.loads((tmp_path / "output" / RESULTS_FILE).read_text()) == (
+        results
+    )
+
+    second_half = (tmp_path / "output" / "1").glob("1_-_2_-_a_vs_b-*.jsonl")
+    start = json.loads(next(second_half).read_text().splitlines()[0])
+    assert start["payload"] == {
+        "score_blue": 1,
+        "score_yellow": 0,
+        "team_name_blue": "Team A",
+    }
+
+
+def test_fixture_worlds_switch_sides(make_runner, tmp_path):
+    world = tmp_path / "second.wbt"
+    runner = make_runner()
+    fixture = Fixture("1", "a", "b", "Team A", "Team B", (runner.world, world))
+    (result,) = runner.run([fixture])
+
+    launched_worlds = [
+        line.split()[2]
+        for line in make_runner.launches.read_text().splitlines()
+    ]
+    assert launched_worlds == [str(runner.world), str(world)]
+
+    # Every team has been the blue one, scoring once, in one of the halves
+    assert result["scores"] == {"a": 1, "b": 1}
+    second_half = (tmp_path / "output" / "1").glob("1_-_2_-_b_vs_a-*.jsonl")
+    start = json.loads(next(second_half).read_text().splitlines()[0])
+    assert start["payload"] == {
+        "score_blue": 0,
+        "score_yellow": 1,
+        "team_name_blue": "Team B",
+    }
+
+
+def test_fixture_worlds_for_each_half(make_runner):
+    runner = make_runner(halves=3)
+    fixture = Fixture("1", "a", "b", "a", "b", (runner.world, runner.world))
+    with pytest.raises(ValueError):
+        runner.run([fixture])
+    assert make_runner.launches.read_text() == ""
+
+
+def test_retries_crashed_halves(make_runner, tmp_path):
+    runner = make_runner(retries=1, env={"STUB_CRASHES": "1"})
+    (result,) = runner.run(FIXTURES[:1])
+
+    assert result["finished"]
+    assert result["scores"] == {"a": 2, "b": 0}
+    failed = tmp_path / "output" / "1" / FAILED_DIR
+    assert len(list(failed.iterdir())) == 2
+    assert len(make_runner.launches.read_text().splitlines()) == 4
+
+
+def test_gives_up_after_retries(make_runner):
+    runner = make_runner(retries=1, env={"STUB_CRASHES": "5"})
+    (result,) = runner.run(FIXTURES[:1])
+
+    assert not result["finished"]
+    assert result["reflogs"] == []
+    assert len(make_runner.launches.read_text().splitlines()) == 2
+
+
+def test_kills_halves_after_timeout(make_runner):
+    runner = make_runner(retries=0, timeout=0.5, env={"STUB_SLEEP": "60"})
+    started = time.perf_counter()
+    (result,) = runner.run(FIXTURES[:1])
+
+    assert time.perf_counter() - started < 30
+    assert not result["finished"]
+
+
+def test_resumes_finished_halves(make_runner, tmp_path):
+    first_results = make_runner(halves=1).run(FIXTURES)
+    make_runner.launches.write_text("")
+
+    results = make_runner().run(FIXTURES)
+
+    assert results[0]["reflogs"][0] == first_results[0]["reflogs"][0]
+    # Only the second halves are played
+    world = tmp_path / "soccer.wbt"
+    assert make_runner.launches.read_text().splitlines() == [
+        f"1 2 {world}",
+        f"2 2 {world}",
+    ]
+
+
+def test_telemetry_of_each_match(tmp_path):
+    runner = TournamentRunner(tmp_path, env={TELEMETRY_ENV: "rcj"})
+    fixture = Fixture("final 1", "a", "b", "A", "B")
+
+    env = runner.half_env(fixture, 2, {"a": 1, "b": 0})
+    assert env[TELEMETRY_ENV] == "rcj-final_1"
+    assert env["RCJ_SIM_TEAM_BLUE_ID"] == "a"
+    assert env["RCJ_SIM_TEAM_B_INITIAL_SCORE"] == "1"
+
+
+def test_read_match_finish_of_binary_reflog(tmp_path):
+    reflog = tmp_path / "1_-_1_-_a_vs_b-0.rlog"
+    referee = run_match(
+        match_time=5, seed=1, subscribers=[BinaryLoggerHandler(reflog)]
+    )
+
+    assert read_match_finish(reflog) == {
+        "total_match_time": 5,
+        "score_yellow": referee.score_yellow,
+        "score_blue": referee.score_blue,
+        "team_name_yellow": referee.team_name_yellow,
+        "team_name_blue": referee.team_name_blue,
+    }
+
+    with reflog.open("r+b") as f:
+        f.truncate(reflog.stat().st_size - 1)
+    assert read_match_finish(reflog) is None
+
+
+def test_load_fixtures(tmp_path):
+    path = tmp_path / "fixtures.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"match_id": 1, "blue": "a", "yellow": "b"},
+                {
+                    "match_id": "2",
+                    "blue": "c",
+                    "blue_name": "Team C",
+                    "yellow": "d",
+                    "worlds": ["2-1.wbt", "2-2.wbt"],
+                },
+            ]
+        )
+    )
+
+    first, second = load_fixtures(path)
+
+    assert first == Fixture("1", "a", "b", "a", "b")
+    assert first.world(1) is None
+    assert first.sides(2) == {"B": ("a", "a"), "Y": ("b", "b")}
+    assert second.blue_name == "Team C"
+    assert second.world(2) == tmp_path / "2-2.wbt"
+    assert second.sides(1) == {"B": ("c", "Team C"), "Y": ("d", "d")}
+    assert second.sides(2) == {"B": ("d", "d"), "Y": ("c", "Team C")}
+
+
+@pytest.mark.parametrize(
+    "matches",
+    [
+        [{"match_id": 1, "blue": "a"}],
+        [{"match_id": 1, "blue": "a", "yellow": "a"}],
+        [
+            {"match_id": 1, "blue": "a", "yellow": "b"},
+            {"match_id": 1, "blue": "c", "yellow": "d"},
+        ],
+    ],
+)
+def test_load_invalid_fixtures(tmp_path, matches):
+    path = tmp_path / "fixtures.json"
+    path.write_text(json.dumps(matches))
+
+    with pytest.raises(ValueError):
+        load_fixtures(path)
+
+
+def test_jobs_for_budget():
+    assert jobs_for_budget(cores=16, memory=64 * 1024) == 8
+    assert jobs_for_budget(cores=16, memory=8 * 1024) == 4
+    assert jobs_for_budget(cores=1, memory=1024) == 1
+    assert jobs_for_budget(cores=8, memory=None, cores_per_match=1) >= 1
@@ -0,0 +1,93 @@
+"""Stand-in for the Webots robot and its devices, enough for the tests of
+RCJSoccerRobot."""
+
+from typing import Dict, List, Sequence
+
+
+class FakeDevice:
+    def enable(self, time_step: int):
+        pass
+
+    def setPosition(self, position: float):
+        pass
+
+    def setVelocity(self, velocity: float):
+        pass
+
+
+class FakeSensor(FakeDevice):
+    def __init__(self, values: Sequence[float] = (0.0, 0.0, 0.0)):
+        self.values = list(values)
+
+    def getValue(self) -> float:
+        return self.values[0]
+
+    def getValues(self) -> List[float]:
+        return self.values
+
+
+class FakeReceiver(FakeDevice):
+    """Queue of the packets, each with its data, emitter direction and
+    signal strength."""
+
+    def __init__(self):
+        self.queue: List[tuple] = []
+
+    def receive(
+        self,
+        data: bytes = b"",
+        direction: Sequence[float] = (1.0, 0.0, 0.0),
+        strength: float = 1.0,
+    ):
+        self.queue.append((data, list(direction), strength))
+
+    def getQueueLength(self) -> int:
+        return len(self.queue)
+
+    def getBytes(self) -> bytes:
+        return self.queue[0][0]
+
+    def getString(self) -> str:
+        return self.queue[0][0].decode()
+
+    def getEmitterDirection(self) -> List[float]:
+        return self.queue[0][1]
+
+    def getSignalStrength(self) -> float:
+        return self.queue[0][2]
+
+    def nextPacket(self):
+        self.queue.pop(0)
+
+
+class FakeEmitter(FakeDevice):
+    def __init__(self):
+        self.sent: List[bytes] = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+class FakeRobot:
+    def __init__(self, name: str = "B1"):
+        self.name = name
+        self.devices: Dict[str, FakeDevice] = {
+            "supervisor receiver": FakeReceiver(),
+            "team receiver": FakeReceiver(),
+            "ball receiver": FakeReceiver(),
+            "team emitter": FakeEmitter(),
+            "gps": FakeSensor(),
+            # Heading 0
+            "compass": FakeSensor((-1.0, 0.0, 0.0)),
+        }
+        for side in ("left", "right", "front", "back"):
+            self.devices[f"distancesensor {side}"] = FakeSensor()
+
+    def getName(self) -> str:
+        return self.name
+
+    def getDevice(self, name: str) -> FakeDevice:
+        return self.devices.setdefault(name, FakeDevice())
+
+    def step(self, time_step: int) -> int:
+        return 0
@@ -0,0 +1,147 @@
+import json
+import math
+
+import pytest
+from rcj_soccer_robot import RCJSoccerRobot, SensorSnapshot, SUPERVISOR_PACKET
+from team_codec import Field, TeamCodec
+from tests.fake_robot import FakeRobot
+
+
+@pytest.fixture
+def robot() -> RCJSoccerRobot:
+    return RCJSoccerRobot(FakeRobot())
+
+
+def test_read_sensors(robot):
+    robot.gps.values = [0.25, -0.5, 0.0]
+    robot.sonar_front.values = [0.75]
+    robot.ball_receiver.receive(direction=(0.6, 0.8, 0.0, 0.0), strength=2)
+
+    sensors = robot.read_sensors()
+    assert sensors is robot.sensors
+    assert (sensors.x, sensors.y) == (0.25, -0.5)
+    assert sensors.heading == pytest.approx(0.0)
+    assert sensors.sonar_front == 0.75
+    assert sensors.is_ball_detected
+    ball = SensorSnapshot.BALL_DIRECTION_X
+    assert list(sensors.values[ball:]) == [0.6, 0.8, 0.0, 2.0]
+    assert robot.ball_receiver.getQueueLength() == 0
+
+
+def test_read_sensors_in_place(robot):
+    sensors = robot.read_sensors()
+    values = sensors.values
+
+    robot.gps.values = [1.0, 2.0, 0.0]
+    # Facing the opposite way
+    robot.compass.values = [1.0, 0.0, 0.0]
+    assert robot.read_sensors() is sensors
+    assert sensors.values is values
+    assert (sensors.x, sensors.y) == (1.0, 2.0)
+    assert abs(sensors.heading) == pytest.approx(math.pi)
+
+
+def test_read_sensors_newest_ball_packet(robot):
+    robot.ball_receiver.receive(direction=(1, 0, 0), strength=1)
+    robot.ball_receiver.receive(direction=(0, 1, 0), strength=3)
+    robot.ball_receiver.receive(direction=(0, 0, 1), strength=4)
+
+    sensors = robot.read_sensors()
+    assert sensors.ball_strength == 4
+    assert sensors.values[SensorSnapshot.BALL_DIRECTION_Z] == 1
+    assert robot.dropped_packets["ball"] == 2
+    assert robot.ball_receiver.getQueueLength() == 0
+
+
+def test_read_sensors_ball_not_detected(robot):
+    robot.ball_receiver.receive(direction=(0, 1, 0), strength=3)
+    robot.read_sensors()
+
+    # The ball values are the ones of the last time it was detected
+    sensors = robot.read_sensors()
+    assert not sensors.is_ball_detected
+    assert sensors.values[SensorSnapshot.BALL_DIRECTION_Y] == 1
+    assert sensors.ball_strength == 3
+    assert robot.dropped_packets["ball"] == 0
+
+
+def test_drain_receivers(robot):
+    for sequence in (1, 2, 3):
+        robot.receiver.receive(SUPERVISOR_PACKET.pack(1, 1, sequence))
+    robot.ball_receiver.receive(direction=(0, 1, 0, 0), strength=3)
+    robot.ball_receiver.receive(direction=(1, 0, 0, 0), strength=5)
+    for robot_id, x in ((2, 0.1), (3, 0.2), (2, 0.3)):
+        message = json.dumps({"robot_id": robot_id, "x": x})
+        robot.team_receiver.receive(message.encode())
+
+    robot.drain_receivers()
+    assert robot.supervisor_data == {
+        "waiting_for_kickoff": True,
+        "sequence": 3,
+    }
+    assert robot.ball_data == {"direction": [1, 0, 0], "strength": 5}
+    assert robot.team_data == {
+        2: {"robot_id": 2, "x": 0.3},
+        3: {"robot_id": 3, "x": 0.2},
+    }
+    assert robot.dropped_packets == {"supervisor": 2, "ball": 1, "team": 1}
+    for receiver in (robot.receiver, robot.ball_receiver, robot.team_receiver):
+        assert receiver.getQueueLength() == 0
+
+
+def test_drain_receivers_nothing_received(robot):
+    robot.receiver.receive(SUPERVISOR_PACKET.pack(1, 0, 1))
+    robot.ball_receiver.receive()
+    robot.team_receiver.receive(b'{"robot_id": 2}')
+    robot.drain_receivers()
+
+    robot.drain_receivers()
+    # The state of the supervisor is kept until a new packet arrives
+    assert robot.supervisor_data == {
+        "waiting_for_kickoff": False,
+        "sequence": 1,
+    }
+    assert robot.ball_data is None
+    assert robot.team_data == {}
+    assert robot.dropped_packets == {"supervisor": 0, "ball": 0, "team": 0}
+
+
+def test_read_sensors_after_drain_receivers(robot):
+    robot.ball_receiver.receive(direction=(0, 1, 0, 0), strength=3)
+    robot.drain_receivers()
+
+    # The ball drained by drain_receivers
+    sensors = robot.read_sensors()
+    assert sensors.is_ball_detected
+    assert sensors.values[SensorSnapshot.BALL_DIRECTION_Y] == 1
+    assert sensors.ball_strength == 3
+
+    robot.drain_receivers()
+    assert not robot.read_sensors().is_ball_detected
+
+    # Without drain_receivers, the ball receiver is read again
+    robot.ball_receiver.receive(direction=(1, 0, 0, 0), strength=5)
+    assert robot.read_sensors().ball_strength == 5
+
+
+class CodecRobot(RCJSoccerRobot):
+    team_message_fields = [Field("x", "f"), Field("ball", "?")]
+
+
+def test_drain_receivers_team_codec():
+    robot = CodecRobot(FakeRobot())
+    # Each teammate encodes its own messages
+    senders = {
+        robot_id: TeamCodec(CodecRobot.team_message_fields)
+        for robot_id in (2, 3)
+    }
+    for robot_id, x, ball in ((2, 0.5, False), (2, 0.25, True), (3, 1, True)):
+        packet = senders[robot_id].encode(robot_id, {"x": x, "ball": ball})
+        robot.team_receiver.receive(packet)
+
+    robot.drain_receivers()
+    assert robot.team_data == {
+        2: {"robot_id": 2, "x": 0.25, "ball": True},
+        3: {"robot_id": 3, "x": 1.0, "ball": True},
+    }
+    assert robot.dropped_packets["team"] == 1
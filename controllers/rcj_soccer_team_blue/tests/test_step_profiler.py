@@ -0,0 +1,127 @@
+import ast
+import json
+from pathlib import Path
+
+import pytest
+import step_profiler
+from step_profiler import LogLinearHistogram, StepProfiler
+
+CONTROLLERS_DIR = Path(__file__).resolve().parents[2]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, microseconds: int):
+        self.now += microseconds * 1000
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(step_profiler.time, "perf_counter_ns", clock)
+    return clock
+
+
+@pytest.fixture
+def profiler(tmp_path, clock) -> StepProfiler:
+    profiler = StepProfiler(tmp_path / "profile" / "B1_steps.json", 32)
+    yield profiler
+    # Not left to atexit
+    profiler.write_report()
+
+
+def class_source(path: Path, name: str) -> str:
+    source = path.read_text()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.ClassDef) and node.name == name:
+            return ast.get_source_segment(source, node)
+    raise LookupError(name)
+
+
+def test_copies_are_the_same():
+    referee_profiler = (
+        CONTROLLERS_DIR / "rcj_soccer_referee_supervisor/referee/profiler.py"
+    )
+    assert class_source(
+        CONTROLLERS_DIR / "rcj_soccer_team_blue/step_profiler.py",
+        "LogLinearHistogram",
+    ) == class_source(referee_profiler, "LogLinearHistogram")
+
+    for module in ("step_profiler.py", "team_codec.py", "utils.py"):
+        blue = CONTROLLERS_DIR / "rcj_soccer_team_blue" / module
+        yellow = CONTROLLERS_DIR / "rcj_soccer_team_yellow" / module
+        assert blue.read_text() == yellow.read_text(), module
+
+
+def test_histogram_percentiles():
+    histogram = LogLinearHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert histogram.total == 500500
+    assert abs(histogram.percentile(50) - 500) <= 500 / 16
+    assert abs(histogram.percentile(99) - 990) <= 990 / 16
+    assert histogram.percentile(100) == 1000
+
+
+def test_steps_and_overruns(profiler, clock):
+    # Nothing to end before the first step
+    profiler.end_step()
+
+    for step_time in (10000, 40000, 20000, 33000):
+        profiler.start_step()
+        clock.advance(step_time // 4)
+        profiler.lap("sense")
+        clock.advance(step_time - step_time // 4)
+        profiler.lap("act")
+        profiler.end_step()
+        # The time in robot.step is not counted
+        clock.advance(32000)
+
+    assert profiler.steps.count == 4
+    assert profiler.steps.max == 40000
+    assert profiler.overruns == 2
+    assert profiler.sections["sense"].total == 25750
+    assert profiler.sections["act"].total == 77250
+
+
+def test_report(profiler, clock):
+    profiler.start_step()
+    clock.advance(500)
+    profiler.lap("receive")
+    clock.advance(1500)
+    profiler.end_step()
+
+    profiler.write_report()
+    with profiler.report_path.open() as f:
+        report = json.load(f)
+    assert report == {
+        "budget_ms": 32.0,
+        "overruns": 0,
+        "step": {
+            "count": 1,
+            "total_ms": 2.0,
+            "p50_ms": 2.0,
+            "p99_ms": 2.0,
+            "max_ms": 2.0,
+        },
+        "sections": {
+            "receive": {
+                "count": 1,
+                "total_ms": 0.5,
+                "p50_ms": pytest.approx(0.5, rel=1 / 16),
+                "p99_ms": pytest.approx(0.5, rel=1 / 16),
+                "max_ms": 0.5,
+            }
+        },
+    }
+
+    # Written only once
+    profiler.report_path.unlink()
+    profiler.write_report()
+    assert not profiler.report_path.exists()
@@ -0,0 +1,116 @@
+from enum import Enum
+
+import pytest
+from team_codec import DELTA, Field, HEADER, KEYFRAME, TeamCodec
+
+
+class Role(Enum):
+    GOALIE = "goalie"
+    DEFENDER = "defender"
+    STRIKER = "striker"
+
+
+FIELDS = [
+    Field("x", "f"),
+    Field("role", Role),
+    Field("ball", "h", 2),
+    Field("plan", Role, 3),
+]
+
+
+def message(x: float = 0.5, role: Role = Role.GOALIE) -> dict:
+    return {
+        "x": x,
+        "role": role,
+        "ball": [-3, 4],
+        "plan": [Role.STRIKER, Role.GOALIE, Role.DEFENDER],
+    }
+
+
+def kind(packet: bytes) -> int:
+    return HEADER.unpack_from(packet)[0]
+
+
+def test_round_trip():
+    sender, receiver = TeamCodec(FIELDS), TeamCodec(FIELDS)
+    packet = sender.encode(2, message())
+    assert kind(packet) == KEYFRAME
+    assert receiver.decode(packet) == {"robot_id": 2, **message()}
+
+
+def test_deltas():
+    sender, receiver = TeamCodec(FIELDS), TeamCodec(FIELDS)
+    keyframe = sender.encode(2, message())
+    unchanged = sender.encode(2, message())
+    changed = sender.encode(2, message(role=Role.STRIKER))
+    assert [kind(keyframe), kind(unchanged), kind(changed)] == [
+        KEYFRAME,
+        DELTA,
+        DELTA,
+    ]
+    # Only the header and the mask, then the single changed byte
+    assert len(unchanged) == HEADER.size + 4
+    assert len(changed) == len(unchanged) + 1
+
+    receiver.apply(keyframe)
+    receiver.apply(unchanged)
+    assert receiver.decode(changed) == {
+        "robot_id": 2,
+        **message(role=Role.STRIKER),
+    }
+
+
+def test_lost_packet():
+    sender, receiver = TeamCodec(FIELDS), TeamCodec(FIELDS)
+    receiver.apply(sender.encode(2, message()))
+    # Lost
+    sender.encode(2, message(x=1.0))
+    packet = sender.encode(2, message(x=1.0, role=Role.DEFENDER))
+
+    # The fields which are not in the delta are not known any more
+    assert receiver.decode(packet) == {
+        "robot_id": 2,
+        "x": None,
+        "role": Role.DEFENDER,
+        "ball": None,
+        "plan": None,
+    }
+
+
+def test_keyframe_resync():
+    sender = TeamCodec(FIELDS, keyframe_interval=4)
+    receiver = TeamCodec(FIELDS)
+    packets = [sender.encode(2, message(x=float(i))) for i in range(5)]
+    kinds = [KEYFRAME, DELTA, DELTA, DELTA, KEYFRAME]
+    assert [kind(packet) for packet in packets] == kinds
+
+    receiver.apply(packets[0])
+    receiver.apply(packets[2])
+    assert receiver.message(2)["role"] is None
+    assert receiver.decode(packets[4]) == {"robot_id": 2, **message(x=4.0)}
+
+
+def test_sequence_wrap():
+    sender, receiver = TeamCodec(FIELDS), TeamCodec(FIELDS)
+    sender.sequence = 0xFFFF - 1
+    packets = [sender.encode(2, message(x=float(i))) for i in range(3)]
+    # 0xFFFE, 0xFFFF, then a keyframe at 0, as every interval starts with one
+    assert [HEADER.unpack_from(packet)[2] for packet in packets] == [
+        0xFFFE,
+        0xFFFF,
+        0,
+    ]
+    assert [kind(packet) for packet in packets] == [KEYFRAME, DELTA, KEYFRAME]
+
+    delta = sender.encode(2, message(x=3.0))
+    assert HEADER.unpack_from(delta)[2] == 1
+    for packet in packets:
+        receiver.apply(packet)
+    assert receiver.decode(delta) == {"robot_id": 2, **message(x=3.0)}
+
+
+def test_invalid_fields():
+    with pytest.raises(ValueError):
+        TeamCodec([Field("robot_id", "B")])
+    with pytest.raises(ValueError):
+        TeamCodec([Field(f"f{i}", "B") for i in range(33)])
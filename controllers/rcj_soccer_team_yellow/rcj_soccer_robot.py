@@ -1,12 +1,108 @@
 import json
 import math
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from step_profiler import NullStepProfiler, StepProfiler
+from team_codec import Field, TeamCodec
 
 TIME_STEP = 32
 ROBOT_NAMES = ["B1", "B2", "B3", "Y1", "Y2", "Y3"]
 N_ROBOTS = len(ROBOT_NAMES)
 
+# Packet sent by the supervisor: version, flags, sequence number
+SUPERVISOR_PACKET = struct.Struct("<BBI")
+SUPERVISOR_PACKET_VERSION = 1
+WAITING_FOR_KICKOFF_FLAG = 1
+
+
+class SensorSnapshot:
+    """Values of all the sensors of the robot, see `read_sensors`.
+
+    The values are kept in a single array of floats, indexed by the
+    constants below. The same snapshot is filled in place on every
+    `read_sensors` call, so copy the values which should outlive the
+    time step.
+    """
+
+    X = 0
+    Y = 1
+    HEADING = 2
+    SONAR_LEFT = 3
+    SONAR_RIGHT = 4
+    SONAR_FRONT = 5
+    SONAR_BACK = 6
+    BALL_DIRECTION_X = 7
+    BALL_DIRECTION_Y = 8
+    BALL_DIRECTION_Z = 9
+    BALL_STRENGTH = 10
+    SIZE = 11
+
+    __slots__ = ("values", "is_ball_detected", "_array")
+
+    def __init__(self):
+        self.values = array("d", bytes(8 * self.SIZE))
+        # Whether the ball data were received on the last read. If not,
+        # the ball values are the ones of the last time it was detected.
+        self.is_ball_detected = False
+        self._array = None
+
+    @property
+    def x(self) -> float:
+        return self.values[self.X]
+
+    @property
+    def y(self) -> float:
+        return self.values[self.Y]
+
+    @property
+    def heading(self) -> float:
+        return self.values[self.HEADING]
+
+    @property
+    def sonar_left(self) -> float:
+        return self.values[self.SONAR_LEFT]
+
+    @property
+    def sonar_right(self) -> float:
+        return self.values[self.SONAR_RIGHT]
+
+    @property
+    def sonar_front(self) -> float:
+        return self.values[self.SONAR_FRONT]
+
+    @property
+    def sonar_back(self) -> float:
+        return self.values[self.SONAR_BACK]
+
+    @property
+    def ball_strength(self) -> float:
+        return self.values[self.BALL_STRENGTH]
+
+    def as_numpy(self):
+        """Return a numpy array sharing the memory with the snapshot.
+
+        The array is created on the first call only and reflects all the
+        later reads, e.g. `snapshot.as_numpy()[SensorSnapshot.X]`.
+        """
+        if self._array is None:
+            import numpy
+
+            self._array = numpy.frombuffer(self.values, dtype=numpy.float64)
+        return self._array
+
 
 class RCJSoccerRobot:
+    # Fields of the messages sent to the team, see team_codec. Unless they
+    # are declared, the messages are sent as JSON.
+    team_message_fields: Optional[List[Field]] = None
+    # Directory to write the timing report of the steps to, see `step`.
+    # Unless it is set, the steps are not timed.
+    step_profile_dir: Optional[str] = os.environ.get("RCJ_SIM_ROBOT_PROFILE")
+
     def __init__(self, robot):
         self.robot = robot
         self.name = self.robot.getName()
@@ -19,6 +115,9 @@ class RCJSoccerRobot:
         self.team_emitter = self.robot.getDevice("team emitter")
         self.team_receiver = self.robot.getDevice("team receiver")
         self.team_receiver.enable(TIME_STEP)
+        self.team_codec = None
+        if self.team_message_fields:
+            self.team_codec = TeamCodec(self.team_message_fields)
 
         self.ball_receiver = self.robot.getDevice("ball receiver")
         self.ball_receiver.enable(TIME_STEP)
@@ -47,20 +146,69 @@ class RCJSoccerRobot:
         self.left_motor.setVelocity(0.0)
         self.right_motor.setVelocity(0.0)
 
-    def parse_supervisor_msg(self, data: str) -> dict:
+        self.sensors = SensorSnapshot()
+
+        # The newest packets received by drain_receivers, the state of the
+        # supervisor is kept until a new packet replaces it
+        self.supervisor_data: Optional[dict] = None
+        self.ball_data: Optional[dict] = None
+        self.team_data: Dict[int, dict] = {}
+        # Whether ball_data has been drained since the last read_sensors
+        self._ball_drained = False
+        # Number of the stale packets dropped by drain_receivers
+        self.dropped_packets = {"supervisor": 0, "ball": 0, "team": 0}
+
+        self.profiler = NullStepProfiler()
+        if self.step_profile_dir:
+            self.profiler = StepProfiler(
+                Path(self.step_profile_dir) / f"{self.name}_steps.json",
+                TIME_STEP,
+            )
+
+    def step(self) -> int:
+        """Advance the simulation by a time step, like `robot.step`.
+
+        With `step_profile_dir` set, the time the controller takes between
+        the steps is recorded, along with the sections marked by
+        `self.profiler.lap(name)`. The report is written once the
+        simulation ends.
+
+        Returns:
+            int: -1 once the simulation ends, see `robot.step`
+        """
+        self.profiler.end_step()
+        result = self.robot.step(TIME_STEP)
+        if result == -1:
+            self.profiler.write_report()
+        else:
+            self.profiler.start_step()
+        return result
+
+    def parse_supervisor_msg(self, data: Union[bytes, str]) -> dict:
         """Parse message received from supervisor
 
         Args:
-            data: json data encoded into string
+            data: binary packet, or json data encoded into string as sent
+                by the older versions of the supervisor
 
         Returns:
             dict: data decoded into dictionary
             Example:
                 {
                     'waiting_for_kickoff': False,
+                    'sequence': 42,
                 }
         """
-        return json.loads(data)
+        if isinstance(data, str) or data[:1] == b"{":
+            return json.loads(data)
+
+        version, flags, sequence = SUPERVISOR_PACKET.unpack(data)
+        if version != SUPERVISOR_PACKET_VERSION:
+            raise ValueError(f"Unsupported supervisor packet {version}")
+        return {
+            "waiting_for_kickoff": bool(flags & WAITING_FOR_KICKOFF_FLAG),
+            "sequence": sequence,
+        }
 
     def get_new_data(self) -> dict:
         """Read new data from supervisor
@@ -68,7 +216,7 @@ class RCJSoccerRobot:
         Returns:
             dict: See `parse_supervisor_msg` method
         """
-        data = self.receiver.getString()
+        data = self.receiver.getBytes()
         self.receiver.nextPacket()
         return self.parse_supervisor_msg(data)
 
@@ -80,15 +228,18 @@ class RCJSoccerRobot:
         """
         return self.receiver.getQueueLength() > 0
 
-    def parse_team_msg(self, data: str) -> dict:
+    def parse_team_msg(self, data: Union[bytes, str]) -> dict:
         """Parse message received from team robot
 
         Args:
-            dict: json data encoded into string
+            data: packet encoded by the team codec, or json data encoded
+                into string if no team_message_fields are declared
 
         Returns:
             dict: data decoded into dictionary
         """
+        if self.team_codec is not None:
+            return self.team_codec.decode(data)
         return json.loads(data)
 
     def get_new_team_data(self) -> dict:
@@ -97,7 +248,7 @@ class RCJSoccerRobot:
         Returns:
             dict: See `parse_team_msg` method
         """
-        data = self.team_receiver.getString()
+        data = self.team_receiver.getBytes()
         self.team_receiver.nextPacket()
         return self.parse_team_msg(data)
 
@@ -109,13 +260,19 @@ class RCJSoccerRobot:
         """
         return self.team_receiver.getQueueLength() > 0
 
-    def send_data_to_team(self, robot_id: int) -> None:
+    def send_data_to_team(self, robot_id: int, **fields) -> None:
         """Send data to the team
 
         Args:
              robot_id (int): ID of the robot
+             fields: Values of the team_message_fields, if declared, or
+                any further data to be sent as JSON otherwise
         """
-        data = {"robot_id": robot_id}
+        if self.team_codec is not None:
+            self.team_emitter.send(self.team_codec.encode(robot_id, fields))
+            return
+
+        data = {"robot_id": robot_id, **fields}
         self.team_emitter.send(json.dumps(data))
 
     def get_new_ball_data(self) -> dict:
@@ -188,5 +345,119 @@ class RCJSoccerRobot:
             "back": self.sonar_back.getValue(),
         }
 
+    def _skip_stale_packets(self, receiver, name: str) -> bool:
+        """Drop all the queued packets but the newest one.
+
+        Returns:
+            bool: Whether there is a packet left to be read
+        """
+        queue_length = receiver.getQueueLength()
+        if queue_length > 1:
+            for _ in range(queue_length - 1):
+                receiver.nextPacket()
+            self.dropped_packets[name] += queue_length - 1
+        return queue_length > 0
+
+    def _drain_team_receiver(self) -> Dict[int, dict]:
+        receiver, codec = self.team_receiver, self.team_codec
+        latest = {}
+        received = 0
+        while receiver.getQueueLength() > 0:
+            data = receiver.getBytes()
+            receiver.nextPacket()
+            received += 1
+            # The deltas of the codec have to be applied in order, but the
+            # messages get built for the newest packets only
+            if codec is not None:
+                latest[codec.apply(data)] = None
+            else:
+                message = self.parse_team_msg(data)
+                latest[message.get("robot_id")] = message
+
+        self.dropped_packets["team"] += received - len(latest)
+        if codec is not None:
+            for robot_id in latest:
+                latest[robot_id] = codec.message(robot_id)
+        return latest
+
+    def drain_receivers(self) -> None:
+        """Empty the queues of all the receivers at once.
+
+        If the robot falls behind, e.g. because a step took too long, the
+        packets queue up and reading one of them per step means acting on
+        stale data. Instead, this keeps the newest packet from each sender,
+        decodes only those and counts the others in `dropped_packets`:
+
+            supervisor_data: See `parse_supervisor_msg`, kept until a new
+                packet arrives, None until the first one
+            ball_data: See `get_new_ball_data`, None if the ball is not
+                detected
+            team_data: Robot ID -> the newest message of each teammate
+        """
+        if self._skip_stale_packets(self.receiver, "supervisor"):
+            self.supervisor_data = self.get_new_data()
+
+        self.ball_data = None
+        if self._skip_stale_packets(self.ball_receiver, "ball"):
+            self.ball_data = self.get_new_ball_data()
+        self._ball_drained = True
+
+        self.team_data = self._drain_team_receiver()
+
+    def read_sensors(self) -> SensorSnapshot:
+        """Read all the sensors at once.
+
+        Unlike the `get_*` methods, this does not create any new lists or
+        dictionaries, it fills `self.sensors` in place. It also reads the
+        ball data, if there are any. If `drain_receivers` has emptied the
+        ball receiver since the last call, its `ball_data` is used instead.
+
+        Returns:
+            SensorSnapshot: `self.sensors`, filled with the new values
+        """
+        snapshot = self.sensors
+        values = snapshot.values
+
+        gps_values = self.gps.getValues()
+        values[SensorSnapshot.X] = gps_values[0]
+        values[SensorSnapshot.Y] = gps_values[1]
+        values[SensorSnapshot.HEADING] = self.get_compass_heading()
+
+        values[SensorSnapshot.SONAR_LEFT] = self.sonar_left.getValue()
+        values[SensorSnapshot.SONAR_RIGHT] = self.sonar_right.getValue()
+        values[SensorSnapshot.SONAR_FRONT] = self.sonar_front.getValue()
+        values[SensorSnapshot.SONAR_BACK] = self.sonar_back.getValue()
+
+        if self._ball_drained:
+            self._ball_drained = False
+            self._read_drained_ball(snapshot)
+            return snapshot
+
+        snapshot.is_ball_detected = self._skip_stale_packets(
+            self.ball_receiver, "ball"
+        )
+        if snapshot.is_ball_detected:
+            direction = self.ball_receiver.getEmitterDirection()
+            values[SensorSnapshot.BALL_DIRECTION_X] = direction[0]
+            values[SensorSnapshot.BALL_DIRECTION_Y] = direction[1]
+            values[SensorSnapshot.BALL_DIRECTION_Z] = direction[2]
+            values[SensorSnapshot.BALL_STRENGTH] = (
+                self.ball_receiver.getSignalStrength()
+            )
+            self.ball_receiver.nextPacket()
+
+        return snapshot
+
+    def _read_drained_ball(self, snapshot: SensorSnapshot):
+        ball_data = self.ball_data
+        snapshot.is_ball_detected = ball_data is not None
+        if ball_data is not None:
+            values = snapshot.values
+            direction = ball_data["direction"]
+            values[SensorSnapshot.BALL_DIRECTION_X] = direction[0]
+            values[SensorSnapshot.BALL_DIRECTION_Y] = direction[1]
+            values[SensorSnapshot.BALL_DIRECTION_Z] = direction[2]
+            values[SensorSnapshot.BALL_STRENGTH] = ball_data["strength"]
+
     def run(self):
         raise NotImplementedError
@@ -5,51 +5,63 @@ import math  # noqa: F401
 
 # You can also import scripts that you put into the folder with controller
 import utils
-from rcj_soccer_robot import RCJSoccerRobot, TIME_STEP
+from rcj_soccer_robot import RCJSoccerRobot
 
 
 class MyRobot2(RCJSoccerRobot):
     def run(self):
-        while self.robot.step(TIME_STEP) != -1:
-            if self.is_new_data():
-                data = self.get_new_data()  # noqa: F841
-
-                while self.is_new_team_data():
-                    team_data = self.get_new_team_data()  # noqa: F841
-                    # Do something with team data
-
-                if self.is_new_ball_data():
-                    ball_data = self.get_new_ball_data()
-                else:
-                    # If the robot does not see the ball, stop motors
-                    self.left_motor.setVelocity(0)
-                    self.right_motor.setVelocity(0)
-                    continue
-
-                # Get data from compass
-                heading = self.get_compass_heading()  # noqa: F841
-
-                # Get GPS coordinates of the robot
-                robot_pos = self.get_gps_coordinates()  # noqa: F841
-
-                # Get data from sonars
-                sonar_values = self.get_sonar_values()  # noqa: F841
-
-                # Compute the speed for motors
-                direction = utils.get_direction(ball_data["direction"])
-
-                # If the robot has the ball right in front of it, go forward,
-                # rotate otherwise
-                if direction == 0:
-                    left_speed = 7
-                    right_speed = 7
-                else:
-                    left_speed = direction * 4
-                    right_speed = direction * -4
-
-                # Set the speed to motors
-                self.left_motor.setVelocity(left_speed)
-                self.right_motor.setVelocity(right_speed)
-
-                # Send message to team robots
-                self.send_data_to_team(self.player_id)
+        while self.step() != -1:
+            # Read the newest packets of the supervisor, the ball and the
+            # team robots, dropping the stale ones
+            self.drain_receivers()
+            self.profiler.lap("receive")
+            # The state of the supervisor, kept until a new packet arrives,
+            # which may be only once in a while
+            data = self.supervisor_data  # noqa: F841
+
+            # The newest message of each team robot, by robot_id
+            team_data = self.team_data  # noqa: F841
+            # Do something with team data
+
+            if self.ball_data is not None:
+                ball_data = self.ball_data
+            else:
+                # If the robot does not see the ball, stop motors
+                self.left_motor.setVelocity(0)
+                self.right_motor.setVelocity(0)
+                continue
+
+            # Get data from compass
+            heading = self.get_compass_heading()  # noqa: F841
+
+            # Get GPS coordinates of the robot
+            robot_pos = self.get_gps_coordinates()  # noqa: F841
+
+            # Get data from sonars
+            sonar_values = self.get_sonar_values()  # noqa: F841
+
+            self.profiler.lap("sensors")
+
+            # Compute the speed for motors
+            direction = utils.get_direction(ball_data["direction"])
+
+            # If the robot has the ball right in front of it, go forward,
+            # rotate otherwise
+            if direction == 0:
+                left_speed = 7
+                right_speed = 7
+            else:
+                left_speed = direction * 4
+                right_speed = direction * -4
+
+            self.profiler.lap("strategy")
+
+            # Set the speed to motors
+            self.left_motor.setVelocity(left_speed)
+            self.right_motor.setVelocity(right_speed)
+
+            self.profiler.lap("motors")
+
+            # Send message to team robots
+            self.send_data_to_team(self.player_id)
+            self.profiler.lap("team")
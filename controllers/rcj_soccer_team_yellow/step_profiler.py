@@ -0,0 +1,178 @@
+"""Timing of the steps of the robot controllers.
+
+The time between two `robot.step` calls is the time the controller takes to
+compute a step. In the fast mode, Webots waits for the slowest controller,
+so a controller taking longer than the time step slows the whole
+simulation down.
+
+The times are kept in log-linear histograms (in the manner of HDR
+histograms): exact below 16 microseconds and within about 6 % above, in a
+fixed amount of memory, however long the match is.
+
+LogLinearHistogram is a copy of the one of referee/profiler.py. Webots lets
+a controller import only from its own directory, which the teams copy as
+it is, so the robots cannot share the module of the referee. The tests of
+the blue team check that the copies stay the same.
+"""
+
+import atexit
+import json
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+# Number of the linear sub-buckets of each power of two, as bits
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Enough for the times up to about 2^40 microseconds (12 days)
+N_BUCKETS = (40 - SUB_BUCKET_BITS + 2) * SUB_BUCKETS
+
+
+class LogLinearHistogram:
+    """Histogram of the times in microseconds.
+
+    The buckets are exact below 16 microseconds and split each power of two
+    into 16 linear sub-buckets above, i.e. they are within about 6 %.
+    """
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * N_BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 1 - SUB_BUCKET_BITS
+        return min(
+            (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS,
+            N_BUCKETS - 1,
+        )
+
+    @staticmethod
+    def bucket_range(bucket: int) -> tuple:
+        """Return the lowest and the highest value of the bucket."""
+        if bucket < SUB_BUCKETS:
+            return bucket, bucket
+        shift = bucket // SUB_BUCKETS - 1
+        low = (bucket % SUB_BUCKETS + SUB_BUCKETS) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value: int):
+        self.counts[self.bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> int:
+        """Return the value below which the given percentage of the values
+        fall, to the precision of the buckets."""
+        if not self.count:
+            return 0
+        rank = max(1, round(self.count * percentile / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = self.bucket_range(bucket)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Return the count, the total, p50, p99 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1000,
+            "p50_ms": self.percentile(50) / 1000,
+            "p99_ms": self.percentile(99) / 1000,
+            "max_ms": self.max / 1000,
+        }
+
+
+class NullStepProfiler:
+    """Profiler doing nothing, used unless the profiling is turned on."""
+
+    def start_step(self):
+        pass
+
+    def lap(self, section: str):
+        pass
+
+    def end_step(self):
+        pass
+
+    def write_report(self):
+        pass
+
+
+class StepProfiler(NullStepProfiler):
+    """Timing of the steps of a controller and their sections.
+
+    Call `start_step` right after `robot.step` returns, `lap` after each
+    section of the step and `end_step` right before calling `robot.step`
+    again. `RCJSoccerRobot.step` takes care of the steps.
+    """
+
+    def __init__(self, report_path: Path, budget: int):
+        """
+        Args:
+            report_path (Path): Where to write the report to
+            budget (int): Time of a step in milliseconds, the steps taking
+                longer are counted as overruns
+        """
+        self.report_path = report_path
+        self.budget_us = budget * 1000
+        self.steps = LogLinearHistogram()
+        self.sections: Dict[str, LogLinearHistogram] = {}
+        self.overruns = 0
+
+        self._step_start: Optional[int] = None
+        self._lap_start = 0
+        self._written = False
+        atexit.register(self.write_report)
+
+    def start_step(self):
+        self._step_start = self._lap_start = time.perf_counter_ns()
+
+    def lap(self, section: str):
+        """Record the time since the previous lap as the given section."""
+        now = time.perf_counter_ns()
+        histogram = self.sections.get(section)
+        if histogram is None:
+            histogram = self.sections[section] = LogLinearHistogram()
+        histogram.record((now - self._lap_start) // 1000)
+        self._lap_start = now
+
+    def end_step(self):
+        if self._step_start is None:
+            return
+        elapsed = (time.perf_counter_ns() - self._step_start) // 1000
+        self._step_start = None
+        self.steps.record(elapsed)
+        if elapsed > self.budget_us:
+            self.overruns += 1
+
+    def report(self) -> dict:
+        return {
+            "budget_ms": self.budget_us / 1000,
+            "overruns": self.overruns,
+            "step": self.steps.summary(),
+            "sections": {
+                section: histogram.summary()
+                for section, histogram in self.sections.items()
+            },
+        }
+
+    def write_report(self):
+        """Write the report, only once, when the controller finishes."""
+        if self._written:
+            return
+        self._written = True
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.report_path.open("w") as f:
+            json.dump(self.report(), f, indent=4)
+        atexit.unregister(self.write_report)
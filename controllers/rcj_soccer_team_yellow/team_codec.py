@@ -0,0 +1,205 @@
+"""Compact binary messages between the robots of a team.
+
+The team declares the fields of its messages once, e.g.
+
+    TeamCodec([
+        Field("x", "f"),
+        Field("y", "f"),
+        Field("role", Role),
+        Field("ball", "f", 2),
+    ])
+
+where the type is either a `struct` format character or an Enum, whose
+members are sent as their positions. Each message starts with a header
+(kind, robot ID of the sender, sequence number), followed by either
+
+    keyframe: the values of all the fields
+    delta:    a bit mask of the fields which changed since the previous
+              message of the sender, followed by their values
+
+Every `keyframe_interval`-th message is a keyframe. Since the messages may
+get lost or reordered, the receiver only applies a delta to the message
+preceding it. Otherwise the fields missing from the delta are None until
+the next keyframe arrives.
+"""
+
+import struct
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Sequence, Type, Union
+
+KEYFRAME = 0
+DELTA = 1
+
+# kind, robot ID of the sender, sequence number
+HEADER = struct.Struct("<BBH")
+# Bit mask of the fields present in a delta
+MASK = struct.Struct("<I")
+MAX_FIELDS = MASK.size * 8
+
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+
+class Field(NamedTuple):
+    name: str
+    # struct format character (e.g. "f", "h", "B", "?") or an Enum
+    type: Union[str, Type[Enum]]
+    # Number of the values, the field is a list if more than one
+    count: int = 1
+
+
+class TeamCodec:
+    def __init__(
+        self,
+        fields: Sequence[Field],
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ):
+        """
+        Args:
+            fields (list): Fields of the messages
+            keyframe_interval (int): Number of the messages after which all
+                the fields are sent again. 1 turns the delta encoding off.
+        """
+        if len(fields) > MAX_FIELDS:
+            raise ValueError(f"At most {MAX_FIELDS} fields are supported")
+        if any(field.name == "robot_id" for field in fields):
+            raise ValueError("robot_id is reserved for the sender")
+
+        self.fields = list(fields)
+        self.keyframe_interval = keyframe_interval
+
+        # Per field: the struct of its values and the members of its Enum
+        self._structs: List[struct.Struct] = []
+        self._members: List[Optional[list]] = []
+        self._member_ids: List[Optional[dict]] = []
+        formats = []
+        for field in self.fields:
+            if isinstance(field.type, str):
+                fmt, members = field.type, None
+            else:
+                fmt, members = "B", list(field.type)
+            formats.append(f"{field.count}{fmt}")
+            self._structs.append(struct.Struct(f"<{field.count}{fmt}"))
+            self._members.append(members)
+            self._member_ids.append(
+                None
+                if members is None
+                else {member: i for i, member in enumerate(members)}
+            )
+        self._keyframe = struct.Struct("<" + "".join(formats))
+
+        self.sequence = 0
+        self._last_sent: Optional[List[tuple]] = None
+        # Robot ID -> sequence number and raw values of its last message
+        self._received: Dict[int, tuple] = {}
+
+    def _to_raw(self, field: int, value) -> tuple:
+        values = (value,) if self.fields[field].count == 1 else tuple(value)
+        member_ids = self._member_ids[field]
+        if member_ids is not None:
+            return tuple(member_ids[member] for member in values)
+        return values
+
+    def _to_value(self, field: int, raw: Optional[tuple]):
+        if raw is None:
+            return None
+        members = self._members[field]
+        if members is not None:
+            raw = [members[i] for i in raw]
+        if self.fields[field].count == 1:
+            return raw[0]
+        return list(raw)
+
+    def encode(self, robot_id: int, message: dict) -> bytes:
+        """Encode the message of the robot.
+
+        Args:
+            robot_id (int): ID of the sending robot
+            message (dict): Values of all the fields
+
+        Returns:
+            bytes: The packet to be sent to the team
+        """
+        raw = [
+            self._to_raw(i, message[field.name])
+            for i, field in enumerate(self.fields)
+        ]
+        last_sent, sequence = self._last_sent, self.sequence
+        self._last_sent = raw
+        self.sequence = (sequence + 1) & 0xFFFF
+
+        if last_sent is None or sequence % self.keyframe_interval == 0:
+            values = [value for values in raw for value in values]
+            return HEADER.pack(
+                KEYFRAME, robot_id, sequence
+            ) + self._keyframe.pack(*values)
+
+        mask = 0
+        parts = []
+        for i, values in enumerate(raw):
+            if values != last_sent[i]:
+                mask |= 1 << i
+                parts.append(self._structs[i].pack(*values))
+        return b"".join(
+            [HEADER.pack(DELTA, robot_id, sequence), MASK.pack(mask)] + parts
+        )
+
+    def apply(self, data: bytes) -> int:
+        """Update the state of the sender with the packet, without building
+        the message.
+
+        Args:
+            data (bytes): The packet received from a teammate
+
+        Returns:
+            int: Robot ID of the sender, see `message`
+        """
+        kind, robot_id, sequence = HEADER.unpack_from(data)
+        offset = HEADER.size
+
+        if kind == KEYFRAME:
+            values = self._keyframe.unpack_from(data, offset)
+            raw = []
+            start = 0
+            for field in self.fields:
+                end = start + field.count
+                raw.append(values[start:end])
+                start = end
+        else:
+            last_sequence, raw = self._received.get(robot_id, (None, None))
+            if raw is None or sequence != (last_sequence + 1) & 0xFFFF:
+                raw = [None] * len(self.fields)
+            else:
+                raw = list(raw)
+
+            (mask,) = MASK.unpack_from(data, offset)
+            offset += MASK.size
+            for i, field_struct in enumerate(self._structs):
+                if mask & (1 << i):
+                    raw[i] = field_struct.unpack_from(data, offset)
+                    offset += field_struct.size
+
+        self._received[robot_id] = (sequence, raw)
+        return robot_id
+
+    def message(self, robot_id: int) -> dict:
+        """Return the last message received from the teammate.
+
+        Returns:
+            dict: The values of the fields and the robot_id of the sender
+        """
+        _, raw = self._received[robot_id]
+        message = {"robot_id": robot_id}
+        for i, field in enumerate(self.fields):
+            message[field.name] = self._to_value(i, raw[i])
+        return message
+
+    def decode(self, data: bytes) -> dict:
+        """Decode the packet received from a teammate.
+
+        Args:
+            data (bytes): The packet
+
+        Returns:
+            dict: See `message`
+        """
+        return self.message(self.apply(data))